@@ -0,0 +1,266 @@
+# benchmarks/bench_hot_paths.py
+"""
+Timing and peak-memory benchmarks for the backtester hot paths, on synthetic
+offline data:
+
+    backtester_loop / backtester_vectorized   Backtester.run (→ _apply_trades)
+    portfolio_record                          Portfolio.snapshot (→ _record) once per bar
+    momentum_signals                          MomentumStrategy.generate_signals
+    compare_strategies                        simulate_portfolios + portfolio_metrics
+
+    python benchmarks/bench_hot_paths.py --preset quick
+    python benchmarks/bench_hot_paths.py --preset full --save-baseline
+    python benchmarks/bench_hot_paths.py --baseline benchmarks/results/baseline.json --threshold 0.25
+
+Results are written as JSON (machine info + one record per case and size).
+With --baseline, any case whose median time exceeds the baseline by more
+than --threshold makes the script exit with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for path in (ROOT, HERE):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_prices, make_signals, as_multi_data
+
+RESULTS_DIR = os.path.join(HERE, "results")
+
+# symbols × bars per preset; cases drop sizes above their own cell budget
+PRESETS = {
+    "quick": {"symbols": (1, 10, 50),               "bars": (1_000, 2_000)},
+    "full":  {"symbols": (1, 10, 100, 1_000, 5_000), "bars": (1_000, 10_000, 100_000, 1_000_000)},
+}
+
+
+# ─── Cases ────────────────────────────────────────────────────────────────────
+# Each case builds its inputs untimed and returns the zero-argument callable to time.
+
+class _FixedSignals:
+    def __init__(self, signals):
+        self.signals = signals
+
+    def generate_signals(self, multi_data):
+        return self.signals
+
+
+def _backtester(mode):
+    def setup(n_symbols, n_bars):
+        from engine.execution_handler import ExecutionHandler
+        from engine.portfolio import Portfolio
+        from utils.backtester import Backtester
+
+        prices   = make_prices(n_symbols, n_bars)
+        signals  = make_signals(prices.index, prices.columns)
+        data     = as_multi_data(prices)
+        strategy = _FixedSignals(signals)
+
+        def run():
+            bt = Backtester(strategy, ExecutionHandler(), Portfolio(1_000_000),
+                            stop_loss_pct=0.02, execution_mode=mode)
+            return bt.run(data)
+        return run
+    return setup
+
+
+def _portfolio_record(n_symbols, n_bars):
+    from engine.portfolio import Portfolio
+
+    prices = make_prices(n_symbols, n_bars)
+    rows   = prices.to_dict("records")
+    dates  = list(prices.index)
+    held   = {sym: 10 for sym in prices.columns}
+
+    def run():
+        port = Portfolio(1_000_000)
+        port.positions.update(held)
+        for date, row in zip(dates, rows):
+            port.snapshot(date, row)
+        return port
+    return run
+
+
+def _momentum_signals(n_symbols, n_bars):
+    from strategies.momentum_strategy import MomentumStrategy
+    from utils import indicators
+
+    data     = as_multi_data(make_prices(n_symbols, n_bars))
+    strategy = MomentumStrategy(lookback=20, top_k=max(1, n_symbols // 10), bottom_k=max(1, n_symbols // 10))
+
+    def run():
+        indicators.get_default_cache().clear()   # time the computation, not a cache hit
+        return strategy.generate_signals(data)
+    return run
+
+
+def _compare_strategies(n_symbols, n_bars):
+    from utils.benchmark import simulate_portfolios, portfolio_metrics
+
+    # one price series, n_symbols signal variants
+    prices  = make_prices(1, n_bars).iloc[:, 0]
+    signals = make_signals(prices.index, [f"v{i}" for i in range(n_symbols)])
+
+    def run():
+        return portfolio_metrics(simulate_portfolios(prices, signals))
+    return run
+
+
+# name -> (setup, max symbols × bars cells it is run with)
+CASES = {
+    "backtester_loop":       (_backtester("loop"),       200_000),
+    "backtester_vectorized": (_backtester("vectorized"), 5_000_000),
+    "portfolio_record":      (_portfolio_record,         2_000_000),
+    "momentum_signals":      (_momentum_signals,         20_000_000),
+    "compare_strategies":    (_compare_strategies,       50_000_000),
+}
+
+
+# ─── Measurement ──────────────────────────────────────────────────────────────
+
+def measure(fn, repeat: int = 3) -> dict:
+    """Median/min wall time over `repeat` calls, then peak traced memory of one more call."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "median_s": statistics.median(times),
+        "min_s":    min(times),
+        "peak_mb":  peak / 2**20,
+    }
+
+
+def run_suite(cases=None, symbols=(1, 10), bars=(1_000,), repeat: int = 3, log=print) -> list:
+    results = []
+    for name in cases or CASES:
+        setup, max_cells = CASES[name]
+        for n_symbols in symbols:
+            for n_bars in bars:
+                if n_symbols * n_bars > max_cells:
+                    continue
+                stats = measure(setup(n_symbols, n_bars), repeat)
+                results.append({"case": name, "n_symbols": n_symbols, "n_bars": n_bars, **stats})
+                log(f"{name:<22} {n_symbols:>6} sym {n_bars:>9} bars  "
+                    f"{stats['median_s']:>9.4f}s  {stats['peak_mb']:>8.1f} MB")
+    return results
+
+
+def scaling(results: list) -> dict:
+    """
+    Log-log slope of time against bars (per symbol count) and against symbols
+    (per bar count): ~1 is linear scaling, ~2 quadratic.
+    """
+    curves = {}
+    frame  = pd.DataFrame(results)
+    if frame.empty:
+        return curves
+    for name, group in frame.groupby("case"):
+        for fixed, axis in (("n_symbols", "n_bars"), ("n_bars", "n_symbols")):
+            for value, curve in group.groupby(fixed):
+                if curve[axis].nunique() < 2:
+                    continue
+                slope = np.polyfit(np.log(curve[axis]), np.log(curve["median_s"]), 1)[0]
+                curves[f"{name} vs {axis} @ {fixed}={value}"] = float(slope)
+    return curves
+
+
+def _key(record) -> tuple:
+    return record["case"], record["n_symbols"], record["n_bars"]
+
+
+def compare_to_baseline(results: list, baseline: list, threshold: float = 0.25,
+                        min_seconds: float = 1e-3) -> list:
+    """
+    Regressions: records whose median time exceeds the baseline's by more
+    than `threshold` (fraction). Timings under `min_seconds` are treated as noise.
+    """
+    reference   = {_key(r): r for r in baseline}
+    regressions = []
+    for record in results:
+        base = reference.get(_key(record))
+        if base is None or max(record["median_s"], base["median_s"]) < min_seconds:
+            continue
+        ratio = record["median_s"] / base["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append({**record, "baseline_s": base["median_s"], "ratio": ratio})
+    return regressions
+
+
+def machine_info() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "numpy":     np.__version__,
+        "pandas":    pd.__version__,
+        "platform":  platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the backtester hot paths.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES))
+    parser.add_argument("--symbols", nargs="+", type=int, help="override the preset's symbol counts")
+    parser.add_argument("--bars", nargs="+", type=int, help="override the preset's bar counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", help="results JSON to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown vs the baseline, as a fraction (default 0.25)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"also write the results to {os.path.join(RESULTS_DIR, 'baseline.json')}")
+    args = parser.parse_args(argv)
+
+    preset  = PRESETS[args.preset]
+    results = run_suite(args.cases, args.symbols or preset["symbols"], args.bars or preset["bars"], args.repeat)
+    curves  = scaling(results)
+    report  = {"machine": machine_info(), "preset": args.preset, "results": results, "scaling": curves}
+
+    print("\nscaling exponents (log-log slope of time):")
+    for label, slope in curves.items():
+        print(f"  {label:<50} {slope:5.2f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+    if args.save_baseline:
+        with open(os.path.join(RESULTS_DIR, "baseline.json"), "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f)["results"], args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} {r['n_symbols']} sym {r['n_bars']} bars: "
+                  f"{r['median_s']:.4f}s vs {r['baseline_s']:.4f}s ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
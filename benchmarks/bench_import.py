@@ -0,0 +1,54 @@
+# benchmarks/bench_import.py
+"""
+Cold-import benchmark: how long a fresh interpreter takes to `import utils.backtester`
+(what every short-lived batch worker pays), and which heavy optional
+dependencies got pulled in along the way.
+
+    python benchmarks/bench_import.py [--module utils.backtester] [--repeat 7]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = ("matplotlib", "scipy", "statsmodels", "yfinance")
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def cold_import(module: str = "utils.backtester") -> dict:
+    """Import `module` in a fresh interpreter; returns {"seconds": ..., "heavy": [...]}."""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_import(module: str = "utils.backtester", repeat: int = 7) -> dict:
+    runs = [cold_import(module) for _ in range(repeat)]
+    times = [r["seconds"] for r in runs]
+    return {
+        "module":         module,
+        "repeat":         repeat,
+        "median_seconds": statistics.median(times),
+        "min_seconds":    min(times),
+        "heavy_modules":  runs[-1]["heavy"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="utils.backtester")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(bench_import(args.module, args.repeat), indent=2))
@@ -0,0 +1,32 @@
+# benchmarks/synthetic.py
+"""
+Offline synthetic inputs for the benchmarks: geometric-Brownian price panels
+and sticky random signals, reproducible from a seed.
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_prices(n_symbols: int, n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """Close-price panel (n_bars × n_symbols) of independent GBM paths."""
+    rng   = np.random.default_rng(seed)
+    index = pd.date_range("2000-01-03", periods=n_bars, freq="min")
+    steps = rng.normal(0.0, 0.01, size=(n_bars, n_symbols))
+    steps[0] = 0.0
+    return pd.DataFrame(100.0 * np.exp(np.cumsum(steps, axis=0)), index=index,
+                        columns=[f"S{i:04d}" for i in range(n_symbols)])
+
+
+def make_signals(index, columns, seed: int = 0, stickiness: float = 0.9) -> pd.DataFrame:
+    """+1/0/−1 signals that hold their value with probability `stickiness` each bar."""
+    rng  = np.random.default_rng(seed + 1)
+    raw  = rng.integers(-1, 2, size=(len(index), len(columns))).astype(float)
+    keep = rng.random(raw.shape) < stickiness
+    raw[keep] = np.nan
+    raw[0] = np.nan_to_num(raw[0])
+    return pd.DataFrame(raw, index=index, columns=columns).ffill().astype(int)
+
+
+def as_multi_data(prices: pd.DataFrame) -> dict:
+    """{ symbol: DataFrame with 'Close' } as the engine's data handlers return."""
+    return {sym: prices[[sym]].rename(columns={sym: "Close"}) for sym in prices.columns}
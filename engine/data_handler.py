@@ -1,14 +1,37 @@
 # engine/data_handler.py
 
-import yfinance as yf
+from utils.lazy import LazyModule
+
+yf = LazyModule("yfinance")   # imported on first download, not at engine import
+
+def failed_tickers() -> set:
+    """Tickers the last yf.download() failed on; yfinance logs these instead of raising."""
+    return set(getattr(getattr(yf, "shared", None), "_ERRORS", None) or ())
 
 class DataHandler:
-    def __init__(self, symbol, start_date, end_date):
+    def __init__(self, symbol, start_date, end_date, store=None):
+        """
+        store: optional PriceStore. When given, data is read from the local store
+               and only date ranges it doesn't cover yet are downloaded.
+        """
         self.symbol = symbol
         self.start_date = start_date
         self.end_date = end_date
+        self.store = store
 
     def load_data(self):
+        if self.store is not None:
+            self.store.update([self.symbol], self.start_date, self.end_date, self._download)
+            return self.store.read(self.symbol, self.start_date, self.end_date)
+
         data = yf.download(self.symbol, start=self.start_date, end=self.end_date)
         data.dropna(inplace=True)
-        return data
\ No newline at end of file
+        return data
+
+    def _download(self, symbols, start, end):
+        data = yf.download(symbols[0], start=start, end=end)
+        data.dropna(inplace=True)
+        # leave a failed symbol out, so the store retries its range next time
+        if symbols[0].upper() in failed_tickers():
+            return {}
+        return {symbols[0]: data}
@@ -0,0 +1,260 @@
+# engine/event_engine.py
+
+import asyncio
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from engine.events import BarClose, FillEvent, MarketEvent, OrderEvent, SignalEvent
+from engine.price_panel import PricePanel
+
+class LatencyStats:
+    """Tick-to-event latencies per event kind, in nanoseconds."""
+    def __init__(self):
+        self._samples = defaultdict(list)
+
+    def add(self, kind: str, tick_ns: int):
+        self._samples[kind].append(time.perf_counter_ns() - tick_ns)
+
+    def samples(self, kind: str) -> np.ndarray:
+        return np.asarray(self._samples.get(kind, ()), dtype=np.int64)
+
+    def report(self) -> pd.DataFrame:
+        """One row per event kind: count, then mean / percentiles / max in microseconds."""
+        rows = {}
+        for kind, values in self._samples.items():
+            us = np.asarray(values, dtype=float) / 1e3
+            rows[kind] = {
+                "count":   len(us),
+                "mean_us": us.mean(),
+                "p50_us":  np.percentile(us, 50),
+                "p90_us":  np.percentile(us, 90),
+                "p99_us":  np.percentile(us, 99),
+                "max_us":  us.max(),
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+class _BarWindow:
+    """The last `size` bars (all bars when size is None) as a PricePanel, grown in place."""
+    def __init__(self, symbols, size=None):
+        self.symbols = list(symbols)
+        self.size    = size
+        self._values = np.empty((2 * (size or 128), len(self.symbols)))
+        self._times  = []
+
+    def push(self, timestamp, prices: dict):
+        end = len(self._times)
+        if end == len(self._values):
+            if self.size:
+                # slide the bars still in the window back to the front of the buffer
+                keep = self.size - 1
+                self._values[:keep] = self._values[end - keep:end].copy()
+                del self._times[:end - keep]
+            else:
+                self._values = np.concatenate([self._values, np.empty_like(self._values)])
+            end = len(self._times)
+        self._values[end] = [prices[sym] for sym in self.symbols]
+        self._times.append(timestamp)
+
+    def panel(self) -> PricePanel:
+        end   = len(self._times)
+        start = max(0, end - self.size) if self.size else 0
+        return PricePanel(self._values[start:end], pd.Index(self._times[start:end]), self.symbols)
+
+
+class EventEngine:
+    """
+    Asyncio, event-driven run of a Backtester's strategy, ExecutionHandler and
+    Portfolio on a bar feed (engine.feeds), e.g. for paper trading:
+
+        feed ─MarketEvent→ strategy ─SignalEvent→ broker ─OrderEvent→ execution ─FillEvent→ monitor
+
+    Every stage is a task and the stages are linked by bounded queues of
+    `queue_size`, so a slow stage holds back everything upstream, down to the
+    feed. The strategy stage can run ahead; the broker waits until a bar's
+    fills are booked before deciding the next bar, since stops depend on them.
+
+    Strategies with an on_bar({symbol: close}) -> {symbol: signal} method
+    (all the bundled ones) are stepped bar by bar in O(1) after reset().
+    Others, or any with online=False, get generate_signals on the last
+    warmup_bars + 1 bars (all of them without `warmup_bars`) and the bar's
+    signal is the last row. Order rules are
+    those of Backtester.run's loop (stops first, then BUY/SELL on signal
+    changes), so replaying stored data gives the same history.
+    `latency` records tick-to-signal/order/fill/bar times; see latency_report().
+    """
+    def __init__(self, backtester, feed, queue_size: int = 256, on_fill=None, online: bool = None):
+        self.bt         = backtester
+        self.feed       = feed
+        self.queue_size = queue_size
+        self.on_fill    = on_fill      # optional callable(FillEvent), called by the monitor stage
+        self.online     = online       # None: use strategy.on_bar when it has one
+        self.latency    = LatencyStats()
+
+    # ─── Driver ───────────────────────────────────────────────────────────────
+
+    async def run(self) -> pd.DataFrame:
+        """Run until the feed is exhausted; returns the history Backtester.run would build."""
+        self._market_q = asyncio.Queue(self.queue_size)
+        self._signal_q = asyncio.Queue(self.queue_size)
+        self._order_q  = asyncio.Queue(self.queue_size)
+        self._fill_q   = asyncio.Queue(self.queue_size)
+        self._signal_cols = None
+        self._bars = {"timestamp": [], "cash": [], "equity": [], "positions": [], "signals": [], "prices": []}
+
+        tasks = [asyncio.ensure_future(stage) for stage in (
+            self._feed_stage(), self._strategy_stage(), self._broker_stage(),
+            self._execution_stage(), self._monitor_stage(),
+        )]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return self.history()
+
+    def run_sync(self) -> pd.DataFrame:
+        """run() on a fresh event loop (asyncio.run), for scripts and tests."""
+        return asyncio.run(self.run())
+
+    def latency_report(self) -> pd.DataFrame:
+        return self.latency.report()
+
+    # ─── Stages ───────────────────────────────────────────────────────────────
+
+    async def _feed_stage(self):
+        async for timestamp, prices in self.feed:
+            await self._market_q.put(MarketEvent(timestamp, prices, time.perf_counter_ns()))
+        await self._market_q.put(None)
+
+    async def _strategy_stage(self):
+        strategy = self.bt.strategy
+        online   = self.online if self.online is not None else hasattr(strategy, "on_bar")
+        if online and hasattr(strategy, "reset"):
+            strategy.reset()
+        warmup = getattr(strategy, "warmup_bars", None)
+        window = _BarWindow(self.feed.symbols, None if warmup is None else warmup + 1)
+        while (event := await self._market_q.get()) is not None:
+            if online:
+                signals = self._online_signals(event.prices)
+            else:
+                window.push(event.timestamp, event.prices)
+                signals = self._bar_signals(window.panel(), event.timestamp)
+            self.latency.add("signal", event.tick_ns)
+            await self._signal_q.put(SignalEvent(event.timestamp, event.prices, signals, event.tick_ns))
+        await self._signal_q.put(None)
+
+    async def _broker_stage(self):
+        loop = asyncio.get_running_loop()
+        prev_signals = {}
+        while (event := await self._signal_q.get()) is not None:
+            for order in self._orders_for(event, prev_signals):
+                self.latency.add("order", order.tick_ns)
+                await self._order_q.put(order)
+            settled = loop.create_future()
+            await self._order_q.put(BarClose(event, settled))
+            await settled
+        await self._order_q.put(None)
+
+    async def _execution_stage(self):
+        while (item := await self._order_q.get()) is not None:
+            if isinstance(item, OrderEvent):
+                fill = self._execute(item)
+                self.latency.add("fill", item.tick_ns)
+                await self._fill_q.put(fill)
+            else:
+                self._record_bar(item.signal)
+                self.latency.add("bar", item.signal.tick_ns)
+                item.settled.set_result(None)
+        await self._fill_q.put(None)
+
+    async def _monitor_stage(self):
+        while (fill := await self._fill_q.get()) is not None:
+            if self.on_fill is not None:
+                self.on_fill(fill)
+
+    # ─── Bar logic (as in Backtester._apply_trades_loop) ──────────────────────
+
+    def _online_signals(self, prices) -> dict:
+        signals = self.bt.strategy.on_bar(prices)
+        if self._signal_cols is None:
+            self._signal_cols = list(signals)
+        return {sym: int(signals.get(sym, 0)) for sym in self._signal_cols}
+
+    def _bar_signals(self, panel, timestamp) -> dict:
+        signals_df = self.bt.signals_for(panel)
+        if self._signal_cols is None:
+            self._signal_cols = list(signals_df.columns)
+        if len(signals_df) == 0 or signals_df.index[-1] != timestamp:
+            # no signal for this bar: treat as 0, like the loop
+            return {sym: 0 for sym in self._signal_cols}
+        last = signals_df.iloc[-1]
+        return {sym: int(last[sym]) if sym in last.index else 0 for sym in self._signal_cols}
+
+    def _orders_for(self, event, prev_signals) -> list:
+        bt, orders = self.bt, []
+        prices = event.prices
+        if bt.stop_loss_pct or bt.take_profit_pct:
+            for sym in self._signal_cols:
+                if bt.portfolio.positions.get(sym, 0) != 0:
+                    entry_price = bt.exec_h.last_trade_price(sym) or np.nan
+                    if not np.isnan(entry_price):
+                        pnl_pct = (prices[sym] - entry_price) / entry_price
+                        if bt.stop_loss_pct and pnl_pct <= -bt.stop_loss_pct:
+                            reason = "stop_loss"
+                        elif bt.take_profit_pct and pnl_pct >= bt.take_profit_pct:
+                            reason = "take_profit"
+                        else:
+                            continue
+                        orders.append(OrderEvent(event.timestamp, sym, "SELL", bt.qty_per_trade,
+                                                 prices[sym], reason, event.tick_ns))
+        for sym in self._signal_cols:
+            sig, prev = event.signals[sym], prev_signals.get(sym, 0)
+            if sig == 1 and prev != 1:
+                orders.append(OrderEvent(event.timestamp, sym, "BUY", bt.qty_per_trade,
+                                         prices[sym], "signal", event.tick_ns))
+            elif sig == -1 and prev != -1:
+                orders.append(OrderEvent(event.timestamp, sym, "SELL", bt.qty_per_trade,
+                                         prices[sym], "signal", event.tick_ns))
+            prev_signals[sym] = sig
+        return orders
+
+    def _execute(self, order) -> FillEvent:
+        bt = self.bt
+        bt.exec_h.execute_order(order.order_type, order.symbol, order.quantity, order.price, order.timestamp)
+        if order.order_type == "BUY":
+            bt.portfolio.buy(order.symbol, order.quantity, order.price, commission=bt.exec_h.commission)
+        else:
+            bt.portfolio.sell(order.symbol, order.quantity, order.price, commission=bt.exec_h.commission)
+        trade = bt.exec_h.trades[-1]
+        return FillEvent(order.timestamp, order.symbol, order.order_type, order.quantity,
+                         trade.price, trade.commission, trade.slippage, order.tick_ns)
+
+    def _record_bar(self, event):
+        bars, port = self._bars, self.bt.portfolio
+        bars["timestamp"].append(event.timestamp)
+        bars["cash"].append(port.cash)
+        bars["equity"].append(port.value(event.prices))
+        bars["positions"].append(port.positions.copy())
+        bars["signals"].append([event.signals[sym] for sym in self._signal_cols])
+        bars["prices"].append([event.prices[sym] for sym in self._signal_cols])
+
+    def history(self) -> pd.DataFrame:
+        """The bars recorded so far, in Backtester.run's history layout."""
+        bars = self._bars
+        cols = self._signal_cols or []
+        n    = len(bars["timestamp"])
+        signals = np.array(bars["signals"], dtype=np.int64).reshape(n, len(cols))
+        prices  = np.array(bars["prices"], dtype=float).reshape(n, len(cols))
+        positions = bars["positions"]
+        if self.bt.positions_format == "wide":
+            positions = np.array([[p.get(sym, 0) for sym in cols] for p in positions],
+                                 dtype=np.int64).reshape(n, len(cols))
+        return self.bt._history_frame(pd.Index(bars["timestamp"]), np.array(bars["cash"], dtype=float),
+                                      positions, np.array(bars["equity"], dtype=float),
+                                      signals, prices, cols)
@@ -0,0 +1,51 @@
+# engine/events.py
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# Events passed between the EventEngine stages. `tick_ns` is the
+# time.perf_counter_ns() at which the bar reached the engine; every event of
+# that bar carries it, so each stage can measure tick-to-event latency.
+
+@dataclass(slots=True)
+class MarketEvent:
+    timestamp: datetime
+    prices: dict                # {symbol: close}
+    tick_ns: int
+
+
+@dataclass(slots=True)
+class SignalEvent:
+    timestamp: datetime
+    prices: dict
+    signals: dict               # {symbol: +1 / 0 / -1}
+    tick_ns: int
+
+
+@dataclass(slots=True)
+class OrderEvent:
+    timestamp: datetime
+    symbol: str
+    order_type: str             # "BUY" or "SELL"
+    quantity: int
+    price: float                # bar close the order is sent at
+    reason: str                 # "signal", "stop_loss" or "take_profit"
+    tick_ns: int
+
+
+@dataclass(slots=True)
+class FillEvent:
+    timestamp: datetime
+    symbol: str
+    order_type: str
+    quantity: int
+    price: float                # execution price, after slippage
+    commission: float
+    slippage: float
+    tick_ns: int
+
+
+@dataclass(slots=True)
+class BarClose:
+    """Marks the end of a bar's orders; the execution stage records the bar and settles it."""
+    signal: SignalEvent
+    settled: object = field(repr=False)   # asyncio.Future the broker waits on
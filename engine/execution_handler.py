@@ -1,19 +1,23 @@
 # engine/execution_handler.py
 
-from .trade import Trade
+from .trade import TradeLog
+from .ledger import PositionLedger
 from datetime import datetime
 
 class ExecutionHandler:
-    def __init__(self, commission_per_trade=1.0, slippage_pct=0.0):
+    def __init__(self, commission_per_trade=1.0, slippage_pct=0.0, trade_sink=None):
         """
         commission_per_trade: fixed cost per order
         slippage_pct: fraction of price lost on each trade
+        trade_sink: optional engine.sinks.ReportSink; fills then stream to it in
+                    batches and self.trades keeps only the latest (see TradeLog)
         """
         self.commission = commission_per_trade
         self.total_commission = 0.0
         self.slippage_pct = slippage_pct
         self.total_slippage = 0.0
-        self.trades = []  # will store Trade objects
+        self.trades = TradeLog(sink=trade_sink)  # columnar log; iterates as Trade objects
+        self.ledger = PositionLedger()  # per-symbol fills, avg entry, realized P&L
 
     def execute_order(self, order_type, symbol, quantity, price, timestamp):
         # 1. Calculate slippage impact
@@ -22,21 +26,13 @@ class ExecutionHandler:
         self.total_commission += self.commission
         exec_price = price + slippage if order_type == "BUY" else price - slippage
 
-        # 2. Build a Trade record
-        trade = Trade(
-            timestamp=timestamp,
-            symbol=symbol,
-            order_type=order_type,
-            quantity=quantity,
-            price=exec_price,
-            commission=self.commission,
-            slippage=slippage
-        )
+        # 2. Record the fill in the trade log and the per-symbol ledger
+        self.trades.record(timestamp, symbol, order_type, quantity, exec_price,
+                           self.commission, slippage)
+        self.ledger.record(symbol, order_type, quantity, exec_price,
+                           self.commission, slippage, timestamp)
 
-        # 3. Store it
-        self.trades.append(trade)
-
-        # 4. (Optional) Print to console for live visibility
+        # 3. (Optional) Print to console for live visibility
         # print(f"{order_type} {quantity} {symbol} @ {exec_price:.2f} "
         #       f"(comm: {self.commission:.2f}, slip: {slippage:.2f})")
         return True
@@ -46,7 +42,11 @@ class ExecutionHandler:
         Get the last executed trade price for a given symbol.
         Returns None if no trades were executed for that symbol.
         """
-        for trade in reversed(self.trades):
-            if trade.symbol == symbol:
-                return trade.price
-        return None
\ No newline at end of file
+        return self.ledger.last_price(symbol)
+
+    def position(self, symbol):
+        """
+        Ledger entry for `symbol` (net quantity, last fill, average entry price,
+        realized P&L), or None if it was never traded.
+        """
+        return self.ledger.get(symbol)
\ No newline at end of file
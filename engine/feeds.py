@@ -0,0 +1,72 @@
+# engine/feeds.py
+
+import abc
+import asyncio
+
+from engine.price_panel import PricePanel
+
+class BarFeed(abc.ABC):
+    """
+    Source of bars for the EventEngine: an async iterator of
+    (timestamp, {symbol: close}) in time order, over a fixed list of `symbols`.
+    Live feeds (broker or exchange websockets, ...) subclass this and
+    implement __aiter__; ReplayFeed plays stored data back.
+    """
+    symbols: list = []
+
+    @abc.abstractmethod
+    def __aiter__(self):
+        ...
+
+
+class ReplayFeed(BarFeed):
+    """
+    Replays stored bars as if they were arriving live.
+
+    source:          a PriceStore, read from disk one `freq` chunk of
+                     [start, end) at a time (PriceStore.iter_chunks), or
+                     anything PricePanel.from_data accepts (with `symbol` for
+                     a single Series/DataFrame)
+    bars_per_second: pace of the replay; None replays as fast as the engine
+                     takes the bars (the queues still apply backpressure)
+
+    Only bars where every symbol has a close are emitted, like Backtester.run.
+    """
+    def __init__(self, source, symbols=None, start=None, end=None, symbol=None,
+                 bars_per_second: float = None, freq: str = "MS"):
+        if hasattr(source, "iter_chunks"):
+            if not symbols:
+                raise ValueError("Pass `symbols` to replay from a PriceStore.")
+            self._panel = None
+        else:
+            self._panel = PricePanel.from_data(source, symbol)
+            symbols     = symbols or self._panel.symbols
+        self.source  = source
+        self.symbols = list(symbols)
+        self.start   = start
+        self.end     = end
+        self.freq    = freq
+        self.bars_per_second = bars_per_second
+
+    def _panels(self):
+        if self._panel is not None:
+            yield self._panel
+            return
+        for chunk in self.source.iter_chunks(self.symbols, self.start, self.end, self.freq):
+            if all(len(chunk.get(sym, ())) for sym in self.symbols):
+                yield PricePanel.from_data({sym: chunk[sym] for sym in self.symbols})
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        t0, n = loop.time(), 0
+        for panel in self._panels():
+            cols  = [panel.symbols.index(sym) for sym in self.symbols]
+            rows  = panel.array[panel.common_rows()][:, cols]
+            for timestamp, closes in zip(panel.common_index, rows.tolist()):
+                if self.bars_per_second:
+                    # keep to the schedule rather than sleeping a fixed gap per bar
+                    delay = t0 + n / self.bars_per_second - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                n += 1
+                yield timestamp, dict(zip(self.symbols, closes))
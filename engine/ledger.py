@@ -0,0 +1,119 @@
+# engine/ledger.py
+from dataclasses import dataclass, asdict
+from datetime import datetime
+
+import pandas as pd
+
+@dataclass
+class LedgerEntry:
+    symbol: str
+    quantity: int = 0              # signed net quantity from fills (BUY +, SELL −)
+    avg_price: float = float("nan")  # average entry price of the open quantity
+    last_price: float = None       # price of the most recent fill
+    last_timestamp: datetime = None
+    realized_pnl: float = 0.0      # price P&L of closed quantity, before costs
+    commission: float = 0.0
+    slippage: float = 0.0
+    fills: int = 0
+
+
+class PositionLedger:
+    """
+    Per-symbol position book, updated fill by fill so every lookup is O(1).
+    Average price follows the usual rule: adding to a position re-weights it,
+    reducing realizes (price − avg) × closed qty, and crossing through flat
+    opens the remainder at the fill price.
+
+    allow_short: False (default) books positions the way Portfolio holds them:
+    a SELL closes at most the quantity held and a SELL while flat leaves the
+    position at 0 (the fill still counts for last price, costs and `fills`).
+    True lets sells open and add to short positions.
+    """
+    def __init__(self, allow_short: bool = False):
+        self.allow_short = allow_short
+        self._entries    = {}
+
+    def update(self, trade) -> LedgerEntry:
+        """Apply one Trade (or anything with the same fields)."""
+        return self.record(trade.symbol, trade.order_type, trade.quantity, trade.price,
+                           trade.commission, trade.slippage, trade.timestamp)
+
+    def record(self, symbol, order_type, quantity, price, commission=0.0, slippage=0.0,
+               timestamp=None) -> LedgerEntry:
+        """Apply one fill given by its fields."""
+        entry = self._entries.get(symbol)
+        if entry is None:
+            entry = self._entries[symbol] = LedgerEntry(symbol)
+
+        held = entry.quantity
+        if order_type == "BUY":
+            signed = quantity
+        elif self.allow_short:
+            signed = -quantity
+        else:
+            # like Portfolio.sell: never below flat
+            signed = -min(quantity, max(held, 0))
+        if signed == 0:
+            new_qty = held
+        elif held == 0 or (held > 0) == (signed > 0):
+            # opening or adding in the same direction
+            new_qty = held + signed
+            entry.avg_price = (
+                price if held == 0
+                else (entry.avg_price * abs(held) + price * abs(signed)) / abs(new_qty)
+            )
+        else:
+            # reducing, closing or flipping
+            closed = min(abs(signed), abs(held))
+            direction = 1 if held > 0 else -1
+            entry.realized_pnl += (price - entry.avg_price) * closed * direction
+            new_qty = held + signed
+            if new_qty == 0:
+                entry.avg_price = float("nan")
+            elif (new_qty > 0) != (held > 0):
+                entry.avg_price = price
+
+        entry.quantity       = new_qty
+        entry.last_price     = price
+        entry.last_timestamp = timestamp
+        entry.commission    += commission
+        entry.slippage      += slippage
+        entry.fills         += 1
+        return entry
+
+    def get(self, symbol) -> LedgerEntry:
+        """Entry for `symbol`, or None if it was never traded."""
+        return self._entries.get(symbol)
+
+    def last_price(self, symbol):
+        entry = self._entries.get(symbol)
+        return entry.last_price if entry is not None else None
+
+    def avg_price(self, symbol):
+        entry = self._entries.get(symbol)
+        return entry.avg_price if entry is not None else None
+
+    def realized_pnl(self, symbol=None) -> float:
+        """Realized P&L for one symbol, or summed over all symbols."""
+        if symbol is None:
+            return sum(e.realized_pnl for e in self._entries.values())
+        entry = self._entries.get(symbol)
+        return entry.realized_pnl if entry is not None else 0.0
+
+    def symbols(self) -> list:
+        return list(self._entries)
+
+    def __contains__(self, symbol):
+        return symbol in self._entries
+
+    def __getitem__(self, symbol) -> LedgerEntry:
+        return self._entries[symbol]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per traded symbol, for reporting."""
+        if not self._entries:
+            return pd.DataFrame(columns=[f for f in LedgerEntry.__dataclass_fields__ if f != "symbol"])
+        return pd.DataFrame([asdict(e) for e in self._entries.values()]).set_index("symbol")
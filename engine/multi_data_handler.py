@@ -1,32 +1,53 @@
 # engine/multi_data_handler.py
 
-import yfinance as yf
 import pandas as pd
 
+from engine.data_handler import failed_tickers
+from utils.lazy import LazyModule
+
+yf = LazyModule("yfinance")   # imported on first download, not at engine import
+
 class MultiDataHandler:
     """
     Fetches and organizes OHLC data for multiple symbols.
     Returns a dict of DataFrames or a single DataFrame with MultiIndex.
     """
-    def __init__(self, symbols, start_date, end_date):
+    def __init__(self, symbols, start_date, end_date, store=None):
+        """
+        store: optional PriceStore. When given, all symbols are read from the
+               local store and only the date ranges it is missing are downloaded.
+        """
         self.symbols    = symbols
         self.start_date = start_date
         self.end_date   = end_date
+        self.store      = store
 
     def load_data(self):
+        if self.store is not None:
+            self.store.update(self.symbols, self.start_date, self.end_date, self._store_download)
+            return self.store.read_many(self.symbols, self.start_date, self.end_date)
+        return self._download(self.symbols, self.start_date, self.end_date)
+
+    def _download(self, symbols, start, end):
         # group_by='ticker' gives a dict-like structure
         raw = yf.download(
-            tickers=self.symbols,
-            start=self.start_date,
-            end=self.end_date,
+            tickers=symbols,
+            start=start,
+            end=end,
             group_by='ticker',
             auto_adjust=True,
             progress=False
         )
         # Convert into a dict: { symbol: DataFrame }
         data = {}
-        for sym in self.symbols:
+        for sym in symbols:
             df = raw[sym].copy()
             df.dropna(inplace=True)
             data[sym] = df
-        return data
\ No newline at end of file
+        return data
+
+    def _store_download(self, symbols, start, end):
+        # leave failed symbols out, so the store retries their range next time
+        data   = self._download(symbols, start, end)
+        failed = failed_tickers()
+        return {sym: df for sym, df in data.items() if sym.upper() not in failed}
\ No newline at end of file
@@ -1,18 +1,26 @@
 # engine/portfolio.py
+import numpy as np
 import pandas as pd
 import datetime
 from typing import Dict
 
 class Portfolio:
-    def __init__(self, initial_capital: float):
+    def __init__(self, initial_capital: float, capacity: int = 256):
         # 1) Basic state
         self.initial_capital = initial_capital
         self.cash            = initial_capital
         self.positions       = {}      # e.g. {"AAPL": 10, "MSFT": 5}
 
-        # 2) Internal history list. We'll append one tuple per “snapshot call.”
-        #    Format per entry: (timestamp, cash, positions_copy, total_value)
-        self._history = []
+        # 2) History buffers, one row per “snapshot call”, grown by doubling:
+        #    timestamps, cash and equity vectors plus a dense (rows × symbols)
+        #    positions matrix whose columns follow self._symbols.
+        self._n          = 0
+        self._timestamps = np.empty(capacity, dtype=object)
+        self._cash       = np.empty(capacity, dtype=float)
+        self._equity     = np.empty(capacity, dtype=float)
+        self._pos        = np.zeros((capacity, 0), dtype=float)
+        self._symbols    = []
+        self._sym_col    = {}
 
     def buy(self, symbol: str, quantity: int, price: float, commission: float, timestamp=None):
         """
@@ -57,15 +65,63 @@ class Portfolio:
             pos_value += qty * price
         return self.cash + pos_value
 
+    def __getstate__(self):
+        # pickle (e.g. for checkpoints) only the filled part of the history buffers
+        state = self.__dict__.copy()
+        for name in ("_timestamps", "_cash", "_equity"):
+            state[name] = state[name][:self._n].copy()
+        state["_pos"] = self._pos[:self._n, :len(self._symbols)].copy()
+        return state
+
+    def reserve(self, rows: int, symbols=()):
+        """
+        Pre-size the history buffers for `rows` more snapshots and the given
+        symbols, so a backtest of known length never reallocates.
+        """
+        self._ensure_rows(self._n + rows)
+        for sym in symbols:
+            self._symbol_col(sym)
+
+    def _ensure_rows(self, rows: int):
+        capacity = len(self._cash)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity)
+        for name in ("_timestamps", "_cash", "_equity"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+        pos = np.zeros((capacity, self._pos.shape[1]), dtype=float)
+        pos[:self._n] = self._pos[:self._n]
+        self._pos = pos
+
+    def _symbol_col(self, symbol) -> int:
+        col = self._sym_col.get(symbol)
+        if col is None:
+            col = self._sym_col[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            if col >= self._pos.shape[1]:
+                pos = np.zeros((self._pos.shape[0], max(2 * self._pos.shape[1], 8)), dtype=float)
+                pos[:, :self._pos.shape[1]] = self._pos
+                self._pos = pos
+        return col
+
     def _record(self, timestamp, current_prices: dict):
         """
-        Internal: append a snapshot of (timestamp, cash, positions_dict, total_value).
-        We'll store a shallow copy of positions so that later changes don't mutate old history.
+        Internal: write a snapshot of (timestamp, cash, positions, total_value) into
+        the next history row. Positions go into the dense matrix, so no per-row dict is kept.
         """
         total = self.value(current_prices)
-        # Make a copy of positions so that future modifications don’t retroactively change history.
-        positions_copy = self.positions.copy()
-        self._history.append((timestamp, self.cash, positions_copy, total))
+        i = self._n
+        self._ensure_rows(i + 1)
+        self._timestamps[i] = timestamp
+        self._cash[i]       = self.cash
+        self._equity[i]     = total
+        if self.positions:
+            cols = [self._symbol_col(sym) for sym in self.positions]
+            self._pos[i, cols] = list(self.positions.values())
+        self._n += 1
 
     def snapshot(self, timestamp, current_prices: dict):
         """
@@ -74,26 +130,59 @@ class Portfolio:
         """
         self._record(timestamp, current_prices)
 
-    def history(self) -> pd.DataFrame:
+    def positions_history(self) -> pd.DataFrame:
+        """
+        Wide view of the positions matrix: index `timestamp`, one column per symbol
+        ever held (quantity, 0 when flat).
+        """
+        return pd.DataFrame(
+            self._pos[:self._n, :len(self._symbols)],
+            index=pd.Index(list(self._timestamps[:self._n]), name="timestamp"),
+            columns=list(self._symbols),
+        )
+
+    def history(self, positions: str = "wide") -> pd.DataFrame:
         """
         Return a DataFrame showing historical snapshots. The DataFrame’s index is `timestamp`,
         and columns are:
             • cash           (float)
-            • positions      (dict of symbol→quantity)
             • total_equity   (float)
+            • position_<sym> (quantity per symbol)      when positions="wide" (default)
+            • positions      (dict of symbol→quantity)  when positions="dict"
         If no history exists yet, returns an empty DataFrame with those columns.
         """
-        if not self._history:
-            return pd.DataFrame(columns=["cash", "positions", "total_equity"])
+        if positions not in ("wide", "dict"):
+            raise ValueError("positions must be 'wide' or 'dict'.")
+        if self._n == 0:
+            cols = ["cash", "positions", "total_equity"] if positions == "dict" else ["cash", "total_equity"]
+            return pd.DataFrame(columns=cols)
 
-        df = pd.DataFrame(self._history, columns=["timestamp", "cash", "positions", "total_equity"])
-        df.set_index("timestamp", inplace=True)
+        index = pd.Index(list(self._timestamps[:self._n]), name="timestamp")
+        df = pd.DataFrame({"cash": self._cash[:self._n], "total_equity": self._equity[:self._n]}, index=index)
+        if positions == "dict":
+            df.insert(1, "positions", self.positions_dicts())
+        else:
+            wide = self.positions_history()
+            for sym in wide.columns:
+                df[f"position_{sym}"] = wide[sym].to_numpy()
         return df
 
+    def positions_dicts(self) -> list:
+        """
+        On-demand dict view of the positions history: one {symbol: quantity} per
+        snapshot, holding only non-zero positions (as stored by buy/sell).
+        """
+        syms = self._symbols
+        out  = []
+        for row in self._pos[:self._n, :len(syms)]:
+            held = np.flatnonzero(row)
+            out.append({syms[j]: int(q) if q.is_integer() else q for j, q in zip(held, row[held].tolist())})
+        return out
+
     def cash_history(self) -> pd.DataFrame:
         """
-        If you only care about cash vs total_equity (and not the raw positions dict),
-        you can drop the 'positions' column here and see just cash/total:
+        If you only care about cash vs total_equity (and not the positions),
+        you can drop the position columns here and see just cash/total:
         """
         df = self.history()[["cash", "total_equity"]]
         return df
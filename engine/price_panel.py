@@ -0,0 +1,272 @@
+# engine/price_panel.py
+
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+# On-disk layout written by PricePanel.save and mapped by PricePanel.open
+FORMAT_VERSION = 1
+META_FILE      = "panel.json"
+CLOSES_FILE    = "closes.f64"     # raw float64, column-major: one symbol's bars are contiguous
+INDEX_FILE     = "index.npy"
+PRESENT_FILE   = "present.npy"    # only for misaligned panels
+
+class PricePanel(Mapping):
+    """
+    Read-only closes of several symbols: one float64 (bars × symbols) array on
+    a sorted, unique index, validated once and shared as views.
+
+    `array` holds the closes. The panel is also a Mapping { symbol: DataFrame
+    with a 'Close' column }, so strategies use it like the dict Backtester used
+    to pass; the frames, to_frame() and close() all wrap that read-only buffer
+    instead of copying it.
+    When the symbols don't share every bar, the panel covers the union of
+    their dates (NaN where a symbol has no bar) and `present` marks which
+    rows each symbol really has; its frame then keeps only its own rows.
+
+    save() writes the panel to a directory that open() maps back read-only
+    with np.memmap: processes that open the same file share its pages through
+    the OS page cache, and pickling an opened panel only sends its path.
+    """
+    def __init__(self, values, index, symbols, present=None):
+        values = np.asarray(values, dtype=float)
+        if values.ndim != 2:
+            raise ValueError("values must be a (bars × symbols) array.")
+        index   = pd.Index(index)
+        symbols = list(symbols)
+        if values.shape != (len(index), len(symbols)):
+            raise ValueError(f"values has shape {values.shape}, expected "
+                             f"({len(index)}, {len(symbols)}) from index and symbols.")
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("Duplicate symbols in price panel.")
+        # monotonic first: pandas then knows uniqueness without building a hash table
+        if not index.is_monotonic_increasing:
+            raise ValueError("Price panel index must be sorted.")
+        if not index.is_unique:
+            raise ValueError("Duplicate timestamps in price data.")
+
+        # a read-only view: the caller's array keeps its own flags
+        self.array   = values.view()
+        self.array.flags.writeable = False
+        self.index   = index
+        self.symbols = symbols
+        self.present = None
+        if present is not None and not np.all(present):
+            self.present = np.asarray(present, dtype=bool).view()
+            self.present.flags.writeable = False
+        self.path    = None        # set by open(): the panel is that file, mapped
+        self._frames = {}
+
+    # ─── Construction ─────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_frame(cls, closes: pd.DataFrame) -> "PricePanel":
+        """Wrap a wide (dates × symbols) frame of closes; no copy when it is one float64 block."""
+        if not closes.index.is_monotonic_increasing:
+            closes = closes.sort_index()
+        return cls(closes.to_numpy(dtype=float), closes.index, closes.columns)
+
+    @classmethod
+    def from_data(cls, price_data, symbol=None) -> "PricePanel":
+        """
+        Build a panel from what Backtester.run accepts: a Series or DataFrame
+        (with `symbol`), a dict { symbol: Series/DataFrame with 'Close' }, or a
+        PricePanel (returned as is). Only 'Close' is kept.
+        """
+        if isinstance(price_data, PricePanel):
+            return price_data
+        closes = {sym: cls._close_of(sym, obj) for sym, obj in cls._items(price_data, symbol)}
+
+        # 1) One symbol, or all on the same index: stack the closes once
+        indexes = [s.index for s in closes.values()]
+        first   = indexes[0] if indexes else pd.Index([])
+        if all(idx.equals(first) for idx in indexes[1:]):
+            if len(closes) == 1:
+                # a (bars × 1) view of the caller's column, when it is sorted
+                s = next(iter(closes.values()))
+                if not s.index.is_monotonic_increasing:
+                    s = s.sort_index()
+                return cls(s.to_numpy(dtype=float)[:, None], s.index, closes)
+            order  = None if first.is_monotonic_increasing else first.argsort(kind="stable")
+            index  = first if order is None else first[order]
+            values = np.empty((len(index), len(closes)), dtype=float, order="F")
+            for j, s in enumerate(closes.values()):
+                col = s.to_numpy(dtype=float)
+                values[:, j] = col if order is None else col[order]
+            return cls(values, index, closes)
+
+        # 2) Otherwise lay them out on the union of their dates
+        index = indexes[0]
+        for idx in indexes[1:]:
+            index = index.union(idx)
+        index   = index.sort_values()
+        values  = np.full((len(index), len(closes)), np.nan, order="F")
+        present = np.zeros((len(index), len(closes)), dtype=bool, order="F")
+        for j, s in enumerate(closes.values()):
+            if not s.index.is_unique:
+                raise ValueError("Duplicate timestamps in price data.")
+            rows = index.get_indexer(s.index)
+            values[rows, j]  = s.to_numpy(dtype=float)
+            present[rows, j] = True
+        return cls(values, index, closes, present)
+
+    @staticmethod
+    def _items(price_data, symbol):
+        if isinstance(price_data, (pd.Series, pd.DataFrame)):
+            if symbol is None:
+                kind = "Series" if isinstance(price_data, pd.Series) else "DataFrame"
+                raise ValueError(f"Must pass `symbol` when giving a {kind}.")
+            return [(symbol, price_data)]
+        if isinstance(price_data, dict):
+            return list(price_data.items())
+        raise TypeError("price_data must be Series, DataFrame, or dict thereof.")
+
+    @staticmethod
+    def _close_of(sym, obj) -> pd.Series:
+        if isinstance(obj, pd.Series):
+            close = obj
+        elif isinstance(obj, pd.DataFrame):
+            if "Close" not in obj.columns:
+                raise KeyError(f"DataFrame for '{sym}' must have a 'Close' column.")
+            close = obj["Close"]
+        else:
+            raise TypeError(f"Expected Series or DataFrame for '{sym}'.")
+        if not pd.api.types.is_numeric_dtype(close.dtype):
+            raise TypeError(f"Closes for '{sym}' must be numeric, got {close.dtype}.")
+        return close
+
+    # ─── Files ────────────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> str:
+        """
+        Write the panel to directory `path` (closes, index and symbols) for
+        open(). The closes go out one symbol at a time, so saving needs no
+        second copy of the panel. Returns `path`.
+        """
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, CLOSES_FILE), "wb") as f:
+            for j in range(self.shape[1]):
+                np.ascontiguousarray(self.array[:, j]).tofile(f)
+
+        index, tz = self.index, None
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            tz, index = str(index.tz), index.tz_convert("UTC").tz_localize(None)
+        np.save(os.path.join(path, INDEX_FILE), index.to_numpy(), allow_pickle=False)
+        if self.present is not None:
+            np.save(os.path.join(path, PRESENT_FILE), np.asfortranarray(self.present))
+
+        # the metadata goes last, atomically: a directory without it is not a panel
+        meta = {
+            "format":     FORMAT_VERSION,
+            "shape":      list(self.shape),
+            "symbols":    self.symbols,
+            "tz":         tz,
+            "index_name": self.index.name,
+        }
+        tmp = os.path.join(path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, META_FILE))
+        return path
+
+    @classmethod
+    def open(cls, path: str) -> "PricePanel":
+        """
+        Map a panel written by save() read-only. The closes stay on disk and are
+        paged in as they are read, so memory does not grow with the universe.
+        """
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported price panel format {meta.get('format')!r} in {path}.")
+        shape  = tuple(meta["shape"])
+        values = (np.memmap(os.path.join(path, CLOSES_FILE), dtype=float, mode="r", shape=shape, order="F")
+                  if shape[0] * shape[1] else np.empty(shape))
+        index  = pd.Index(np.load(os.path.join(path, INDEX_FILE), allow_pickle=False), name=meta["index_name"])
+        if meta["tz"] is not None:
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        present_path = os.path.join(path, PRESENT_FILE)
+        present = np.load(present_path, mmap_mode="r") if os.path.exists(present_path) else None
+
+        panel      = cls(values, index, meta["symbols"], present)
+        panel.path = os.path.abspath(path)
+        return panel
+
+    def __reduce_ex__(self, protocol):
+        if self.path is not None:
+            # another process maps the same file instead of receiving a copy
+            return type(self).open, (self.path,)
+        return super().__reduce_ex__(protocol)
+
+    # ─── Views ────────────────────────────────────────────────────────────────
+
+    @property
+    def shape(self) -> tuple:
+        return self.array.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes
+
+    @property
+    def aligned(self) -> bool:
+        """True when every symbol has a bar at every row."""
+        return self.present is None
+
+    def common_rows(self):
+        """Row positions where every symbol has a bar (a slice when aligned)."""
+        if self.present is None:
+            return slice(None)
+        return np.flatnonzero(self.present.all(axis=1))
+
+    @property
+    def common_index(self) -> pd.Index:
+        """Dates shared by all symbols, i.e. what Backtester trades on."""
+        return self.index[self.common_rows()]
+
+    def window(self, start: int, stop: int) -> "PricePanel":
+        """Read-only view of rows [start, stop), e.g. one walk-forward segment."""
+        present = None if self.present is None else self.present[start:stop]
+        return PricePanel(self.array[start:stop], self.index[start:stop], self.symbols, present)
+
+    def close(self, sym) -> pd.Series:
+        """The symbol's closes on its own dates (a view when it has every bar)."""
+        j = self.symbols.index(sym)
+        if self.present is None or self.present[:, j].all():
+            return pd.Series(self.array[:, j], index=self.index, name=sym, copy=False)
+        keep = self.present[:, j]
+        col  = self.array[keep, j]
+        col.flags.writeable = False
+        return pd.Series(col, index=self.index[keep], name=sym, copy=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide (dates × symbols) DataFrame over the read-only buffer."""
+        return pd.DataFrame(self.array, index=self.index, columns=self.symbols, copy=False)
+
+    def __getitem__(self, sym) -> pd.DataFrame:
+        if sym not in self._frames:
+            if sym not in self.symbols:
+                raise KeyError(sym)
+            j = self.symbols.index(sym)
+            if self.present is None or self.present[:, j].all():
+                frame = pd.DataFrame(self.array[:, j:j + 1], index=self.index, columns=["Close"], copy=False)
+            else:
+                frame = self.close(sym).to_frame(name="Close")
+            self._frames[sym] = frame
+        return self._frames[sym]
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, sym):
+        return sym in self.symbols
+
+    def __repr__(self):
+        n_bars, n_syms = self.shape
+        return f"PricePanel({n_bars} bars × {n_syms} symbols)"
@@ -0,0 +1,262 @@
+# engine/price_store.py
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+def _naive_utc(ts) -> pd.Timestamp:
+    # Arrow stores timestamps as UTC; tz-aware bounds are converted, naive ones taken as is
+    ts = pd.Timestamp(ts)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def _utc64(ts: pd.Timestamp):
+    return _naive_utc(ts).to_datetime64()
+
+
+class PriceStore:
+    """
+    Local on-disk OHLCV store, one Feather (Arrow IPC) file per symbol and year:
+
+        root/
+          AAPL/
+            2019.feather
+            2020.feather
+            _coverage.json    # [start, end) ranges already fetched/imported
+
+    Partitions are uncompressed by default so reads are memory-mapped; loading a
+    symbol is a concat of a few Arrow tables plus one conversion to pandas.
+
+    The coverage file records which date ranges have been fetched, so a range
+    with no bars (weekends, holidays, pre-IPO) is not downloaded again; a
+    failed download, and anything from today on, is left uncovered.
+    With offline=True the store never asks the downloader for anything and just
+    serves what is on disk.
+    """
+    COVERAGE_FILE = "_coverage.json"
+
+    def __init__(self, root="data/prices", offline: bool = False,
+                 compression: str = "uncompressed", max_workers: int = 8):
+        self.root        = root
+        self.offline     = offline
+        self.compression = compression
+        self.max_workers = max_workers
+        os.makedirs(self.root, exist_ok=True)
+
+    # ─── Paths & coverage ─────────────────────────────────────────────────────
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol)
+
+    def _partition_path(self, symbol, year):
+        return os.path.join(self._symbol_dir(symbol), f"{year}.feather")
+
+    def symbols(self) -> list:
+        """All symbols with at least one stored partition."""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(self._symbol_dir(name)) and self._years(name)
+        )
+
+    def _years(self, symbol) -> list:
+        sym_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(sym_dir):
+            return []
+        return sorted(int(f[:-len(".feather")]) for f in os.listdir(sym_dir) if f.endswith(".feather"))
+
+    def coverage(self, symbol) -> list:
+        """Merged list of (start, end) Timestamps (naive UTC, end exclusive) already in the store."""
+        path = os.path.join(self._symbol_dir(symbol), self.COVERAGE_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [(_naive_utc(s), _naive_utc(e)) for s, e in json.load(f)]
+
+    def _add_coverage(self, symbol, start, end):
+        # stored naive UTC, so tz-aware data and naive requests compare
+        start, end = _naive_utc(start), _naive_utc(end)
+        if end <= start:
+            return
+        ranges = self.coverage(symbol) + [(start, end)]
+        merged = []
+        for s, e in sorted(ranges):
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        with open(os.path.join(self._symbol_dir(symbol), self.COVERAGE_FILE), "w") as f:
+            json.dump([[s.isoformat(), e.isoformat()] for s, e in merged], f)
+
+    def missing(self, symbol, start, end) -> list:
+        """
+        Sub-ranges of [start, end) not yet covered for `symbol`.
+        Returns a list of (start, end) Timestamps, naive UTC; empty if everything is on disk.
+        """
+        start, end = _naive_utc(start), _naive_utc(end)
+        gaps, cursor = [], start
+        for s, e in self.coverage(symbol):
+            if e <= cursor or s >= end:
+                continue
+            if s > cursor:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    # ─── Writing ──────────────────────────────────────────────────────────────
+
+    def write(self, symbol, df: pd.DataFrame, start=None, end=None):
+        """
+        Merge `df` (DatetimeIndex, OHLCV columns) into the symbol's yearly partitions.
+        Rows already stored for the same timestamp are replaced. If `start`/`end`
+        are given, [start, end) is marked as covered even where `df` has no rows.
+        """
+        if df is not None and not df.empty:
+            df = df.copy()
+            if isinstance(df.columns, pd.MultiIndex):
+                # yfinance returns (Price, Ticker) columns even for a single ticker
+                df.columns = df.columns.get_level_values(0)
+            df.columns = [str(c) for c in df.columns]
+            df.index   = pd.DatetimeIndex(df.index, name="Date")
+            df = df.dropna(how="all")
+
+            os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+            for year, part in df.groupby(df.index.year):
+                path = self._partition_path(symbol, year)
+                if os.path.exists(path):
+                    part = pd.concat([self._read_partitions([path]), part])
+                    part = part[~part.index.duplicated(keep="last")]
+                table = pa.Table.from_pandas(part.sort_index().reset_index(), preserve_index=False)
+                feather.write_feather(table, path, compression=self.compression)
+
+            if start is None:
+                start = df.index.min()
+            if end is None:
+                end = df.index.max() + pd.Timedelta(days=1)
+
+        if start is not None and end is not None:
+            self._add_coverage(symbol, start, end)
+
+    def import_csv(self, path, symbol=None, **read_csv_kwargs) -> list:
+        """
+        Bulk import CSV files into the store.
+        `path` is a single CSV file or a directory of <SYMBOL>.csv files; the symbol
+        defaults to the file name. The first column is parsed as the date index.
+        Returns the list of imported symbols.
+        """
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(".csv")
+            )
+        else:
+            files = [path]
+
+        read_csv_kwargs.setdefault("index_col", 0)
+        read_csv_kwargs.setdefault("parse_dates", True)
+        imported = []
+        for file in files:
+            sym = symbol if symbol is not None and len(files) == 1 else os.path.splitext(os.path.basename(file))[0]
+            df  = pd.read_csv(file, **read_csv_kwargs)
+            self.write(sym, df)
+            imported.append(sym)
+        return imported
+
+    def update(self, symbols, start, end, download) -> dict:
+        """
+        Fetch only the missing parts of [start, end) for each symbol.
+        `download(symbols, start, end)` must return {symbol: DataFrame}; symbols
+        sharing the same missing range are requested in one call. A symbol left
+        out of the result counts as failed and is retried by the next update;
+        a returned frame, even an empty one, covers the range up to today.
+        Returns {(start, end): [symbols fetched]} (empty when offline or complete).
+        """
+        if self.offline:
+            return {}
+        if isinstance(symbols, str):
+            symbols = [symbols]
+
+        wanted = {}
+        for sym in symbols:
+            for gap in self.missing(sym, start, end):
+                wanted.setdefault(gap, []).append(sym)
+
+        # never mark today or later as covered: those bars may still change or arrive
+        today = pd.Timestamp.today().normalize()
+        for (gap_start, gap_end), syms in wanted.items():
+            frames = download(syms, gap_start, gap_end)
+            for sym in syms:
+                df = frames.get(sym)
+                if df is None:
+                    # the download failed for it: leave the gap open so the next update retries
+                    continue
+                # fetched, possibly with no rows: weekends, holidays and empty ranges count as covered
+                self.write(sym, df, start=gap_start, end=min(gap_end, today))
+        return wanted
+
+    # ─── Reading ──────────────────────────────────────────────────────────────
+
+    def _read_partitions(self, paths, start=None, end=None) -> pd.DataFrame:
+        # slice the memory-mapped Arrow tables first, so only rows in
+        # [start, end) are ever materialised as pandas
+        tables = []
+        for path in paths:
+            table = feather.read_table(path, memory_map=True)
+            if start is not None or end is not None:
+                dates = table.column("Date").to_numpy()
+                lo = np.searchsorted(dates, _utc64(start)) if start is not None else 0
+                hi = np.searchsorted(dates, _utc64(end)) if end is not None else len(dates)
+                table = table.slice(lo, hi - lo)
+            tables.append(table)
+        return pa.concat_tables(tables).to_pandas().set_index("Date")
+
+    def read(self, symbol, start=None, end=None) -> pd.DataFrame:
+        """
+        Read [start, end) for one symbol, touching only the partitions in range.
+        Returns an empty DataFrame if nothing is stored.
+        """
+        start = pd.Timestamp(start) if start is not None else None
+        end   = pd.Timestamp(end) if end is not None else None
+        years = [
+            y for y in self._years(symbol)
+            if (start is None or y >= start.year) and (end is None or y <= end.year)
+        ]
+        if not years:
+            return pd.DataFrame()
+
+        return self._read_partitions([self._partition_path(symbol, y) for y in years], start, end)
+
+    def read_many(self, symbols, start=None, end=None) -> dict:
+        """
+        Read several symbols in parallel (Arrow I/O releases the GIL).
+        Returns { symbol: DataFrame }, in the order of `symbols`.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            frames = pool.map(lambda sym: self.read(sym, start, end), symbols)
+            return dict(zip(symbols, frames))
+
+    def iter_chunks(self, symbols, start=None, end=None, freq="MS"):
+        """
+        Yield { symbol: DataFrame } for consecutive [chunk_start, chunk_end)
+        windows of [start, end), cut at `freq` boundaries ("MS", "W", "D", ...).
+        Only one chunk is in memory at a time, so the whole history never is;
+        feed the chunks to Backtester.run_chunked. start/end default to the
+        stored years.
+        """
+        years = sorted({y for sym in symbols for y in self._years(sym)})
+        if not years:
+            return
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp(years[0], 1, 1)
+        end   = pd.Timestamp(end) if end is not None else pd.Timestamp(years[-1] + 1, 1, 1)
+        cuts  = [t for t in pd.date_range(start, end, freq=freq) if start < t < end]
+        edges = [start] + cuts + [end]
+        for chunk_start, chunk_end in zip(edges[:-1], edges[1:]):
+            yield self.read_many(symbols, chunk_start, chunk_end)
@@ -0,0 +1,153 @@
+# engine/sinks.py
+
+import abc
+import json
+import queue
+import threading
+
+import pandas as pd
+
+class ReportSink(abc.ABC):
+    """
+    Destination for report rows written while a backtest runs: the trade log
+    (ExecutionHandler(trade_sink=...)) and the per-bar history
+    (Backtester(history_sink=...)). Producers hand over whole batches as
+    DataFrames and drop them, so a run never holds its full report.
+    """
+    @abc.abstractmethod
+    def write(self, frame: pd.DataFrame):
+        ...
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameCollector(ReportSink):
+    """Keeps the batches in memory; for tests and small runs."""
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame: pd.DataFrame):
+        self.frames.append(frame)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.concat(self.frames, ignore_index=True) if self.frames else pd.DataFrame()
+
+
+class FileSink(ReportSink):
+    """
+    Appends batches to a CSV file, or to a Parquet file one row group per
+    batch, on a background thread so the backtest never waits on disk.
+
+    format:      "csv" or "parquet" (default: from the file extension)
+    max_pending: batches queued for the writer; write() blocks once that
+                 many are waiting, which bounds memory if the disk falls behind
+
+    Categoricals are written as their values and dict cells (the 'positions'
+    column) as JSON. A write error is raised by the next write/flush/close.
+    Every batch reaches the file by the time flush() or close() returns.
+    """
+    def __init__(self, path: str, format: str = None, max_pending: int = 4, **write_kwargs):
+        format = format or ("parquet" if path.endswith((".parquet", ".pq")) else "csv")
+        if format not in ("csv", "parquet"):
+            raise ValueError("format must be 'csv' or 'parquet'.")
+        self.path         = path
+        self.format       = format
+        self.write_kwargs = write_kwargs
+        self.rows_written = 0
+        self._queue  = queue.Queue(max_pending)
+        self._error  = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name=f"FileSink({path})", daemon=True)
+        self._thread.start()
+
+    def write(self, frame: pd.DataFrame):
+        self._raise_error()
+        if self._closed:
+            raise ValueError("write to a closed sink.")
+        if len(frame):
+            self._queue.put(frame)
+
+    def flush(self):
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    # ─── Writer thread ────────────────────────────────────────────────────────
+
+    def _drain(self):
+        out, failed = None, False
+        try:
+            while True:
+                frame = self._queue.get()
+                try:
+                    if frame is None:
+                        return
+                    if not failed:
+                        out = self._write_batch(out, self._prepare(frame))
+                        self.rows_written += len(frame)
+                except BaseException as e:
+                    # keep draining so producers blocked on the queue are released
+                    self._error, failed = e, True
+                finally:
+                    self._queue.task_done()
+        finally:
+            if out is not None:
+                try:
+                    out.close()
+                except BaseException as e:
+                    self._error = self._error or e
+
+    @staticmethod
+    def _prepare(frame: pd.DataFrame) -> pd.DataFrame:
+        frame = frame.reset_index() if frame.index.name is not None else frame
+        converted = {}
+        for col in frame.columns:
+            values = frame[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                converted[col] = values.astype(values.cat.categories.dtype)
+            elif values.dtype == object and len(values) and isinstance(values.iloc[0], dict):
+                converted[col] = values.map(json.dumps)
+        return frame.assign(**converted) if converted else frame
+
+    def _write_batch(self, out, frame: pd.DataFrame):
+        if self.format == "csv":
+            if out is None:
+                out = open(self.path, "w", newline="")
+                header = True
+            else:
+                header = False
+            frame.to_csv(out, header=header, index=False, **self.write_kwargs)
+            out.flush()
+            return out
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if out is None:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            out   = pq.ParquetWriter(self.path, table.schema, **self.write_kwargs)
+        else:
+            # later batches follow the first one's schema (e.g. an all-NaN column)
+            table = pa.Table.from_pandas(frame, schema=out.schema, preserve_index=False)
+        out.write_table(table)
+        return out
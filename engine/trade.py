@@ -2,7 +2,10 @@
 from dataclasses import dataclass
 from datetime import datetime
 
-@dataclass
+import numpy as np
+import pandas as pd
+
+@dataclass(slots=True)
 class Trade:
     timestamp: datetime
     symbol: str
@@ -10,4 +13,189 @@ class Trade:
     quantity: int
     price: float
     commission: float
-    slippage: float
\ No newline at end of file
+    slippage: float
+
+
+class TradeLog:
+    """
+    Columnar, append-only trade log backed by growable typed arrays:
+
+        timestamp   int64   nanoseconds since epoch (NaT when missing)
+        symbol      int32   code into self.symbols
+        side        int8    code into ORDER_TYPES (0 = BUY, 1 = SELL)
+        quantity    int64
+        price       float64
+        commission  float64
+        slippage    float64
+
+    Iterating or indexing yields Trade objects, so code written against the old
+    list of Trades keeps working; to_frame() exposes the columns to pandas without copying.
+
+    With a `sink` (engine.sinks), every `batch_rows` trades the filled rows are
+    handed to it as one frame and dropped: the log then holds only the trades
+    since the last hand-off, and `flushed` counts the ones already passed on.
+    """
+    ORDER_TYPES = ("BUY", "SELL")
+    COLUMNS = (
+        ("timestamp",  np.int64),
+        ("symbol",     np.int32),
+        ("side",       np.int8),
+        ("quantity",   np.int64),
+        ("price",      np.float64),
+        ("commission", np.float64),
+        ("slippage",   np.float64),
+    )
+
+    def __init__(self, capacity: int = 1024, sink=None, batch_rows: int = 10_000):
+        self._n       = 0
+        self._cols    = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS}
+        self.symbols  = []        # category list; code = position
+        self._sym_code = {}
+        self.tz       = None
+        self.sink       = sink
+        self.batch_rows = batch_rows
+        self.flushed    = 0       # trades handed to the sink and no longer held
+
+    def __getstate__(self):
+        # pickle only the filled rows, not the spare capacity (nor the sink's thread)
+        state = self.__dict__.copy()
+        state["_cols"] = {name: col[:self._n].copy() for name, col in self._cols.items()}
+        state["sink"]  = None
+        return state
+
+    @property
+    def total(self) -> int:
+        """Trades recorded, including those already handed to the sink."""
+        return self.flushed + self._n
+
+    def flush(self):
+        """Hand the trades held so far to the sink (no-op without one)."""
+        if self.sink is None or self._n == 0:
+            return
+        frame = self.to_frame()
+        # the frame keeps the current buffers; start new ones rather than overwrite them
+        capacity   = min(len(self._cols["price"]), self.batch_rows)
+        self._cols = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS}
+        self.flushed += self._n
+        self._n = 0
+        self.sink.write(frame)
+
+    # ─── Appending ────────────────────────────────────────────────────────────
+
+    def _grow(self):
+        capacity = max(2 * len(self._cols["price"]), 1)
+        for name, col in self._cols.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self._n] = col[:self._n]
+            self._cols[name] = grown
+
+    def record(self, timestamp, symbol, order_type, quantity, price, commission, slippage):
+        """Append one fill from its fields (no per-trade object is created)."""
+        if self.sink is not None and self._n >= self.batch_rows:
+            self.flush()
+        if self._n == len(self._cols["price"]):
+            self._grow()
+        code = self._sym_code.get(symbol)
+        if code is None:
+            code = self._sym_code[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        ts = pd.Timestamp(timestamp) if timestamp is not None else pd.NaT
+        if ts is not pd.NaT and ts.tz is not None and self.tz is None:
+            self.tz = ts.tz
+
+        i = self._n
+        cols = self._cols
+        cols["timestamp"][i]  = ts.value
+        cols["symbol"][i]     = code
+        cols["side"][i]       = self.ORDER_TYPES.index(order_type)
+        cols["quantity"][i]   = quantity
+        cols["price"][i]      = price
+        cols["commission"][i] = commission
+        cols["slippage"][i]   = slippage
+        self._n += 1
+
+    def append(self, trade: Trade):
+        """list-style append of a Trade object."""
+        self.record(trade.timestamp, trade.symbol, trade.order_type, trade.quantity,
+                    trade.price, trade.commission, trade.slippage)
+
+    # ─── Trade-compatible access ──────────────────────────────────────────────
+
+    def __len__(self):
+        return self._n
+
+    def _trade(self, i) -> Trade:
+        cols = self._cols
+        ts   = pd.Timestamp(int(cols["timestamp"][i])) if cols["timestamp"][i] != pd.NaT.value else pd.NaT
+        if self.tz is not None and ts is not pd.NaT:
+            ts = ts.tz_localize("UTC").tz_convert(self.tz)
+        return Trade(
+            timestamp=ts,
+            symbol=self.symbols[cols["symbol"][i]],
+            order_type=self.ORDER_TYPES[cols["side"][i]],
+            quantity=int(cols["quantity"][i]),
+            price=float(cols["price"][i]),
+            commission=float(cols["commission"][i]),
+            slippage=float(cols["slippage"][i]),
+        )
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._trade(i) for i in range(*key.indices(self._n))]
+        if key < 0:
+            key += self._n
+        if not 0 <= key < self._n:
+            raise IndexError("trade index out of range")
+        return self._trade(key)
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self._trade(i)
+
+    def __reversed__(self):
+        for i in range(self._n - 1, -1, -1):
+            yield self._trade(i)
+
+    def __eq__(self, other):
+        if not isinstance(other, (TradeLog, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def column(self, name) -> np.ndarray:
+        """Read-only view of one raw column (length = number of trades)."""
+        view = self._cols[name][:self._n]
+        view.flags.writeable = False
+        return view
+
+    # ─── Export ───────────────────────────────────────────────────────────────
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame with the report columns (timestamp, symbol, order_type, quantity,
+        price, commission, slippage). Numeric columns are views on the log's
+        arrays and symbol/order_type are categoricals over the stored codes.
+        """
+        n, cols = self._n, self._cols
+        timestamps = pd.DatetimeIndex(cols["timestamp"][:n].view("M8[ns]"))
+        if self.tz is not None:
+            timestamps = timestamps.tz_localize("UTC").tz_convert(self.tz)
+        return pd.DataFrame({
+            "timestamp":  timestamps,
+            "symbol":     pd.Categorical.from_codes(cols["symbol"][:n], categories=list(self.symbols)),
+            "order_type": pd.Categorical.from_codes(cols["side"][:n], categories=list(self.ORDER_TYPES)),
+            "quantity":   cols["quantity"][:n],
+            "price":      cols["price"][:n],
+            "commission": cols["commission"][:n],
+            "slippage":   cols["slippage"][:n],
+        }, copy=False)
+
+    def to_csv(self, path, **kwargs):
+        """Write the log in the reports/trade_log.csv layout."""
+        kwargs.setdefault("index", False)
+        self.to_frame().to_csv(path, **kwargs)
+
+    def to_parquet(self, path, **kwargs):
+        """Write the log as Parquet; symbols are stored dictionary-encoded."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pandas(self.to_frame(), preserve_index=False), path, **kwargs)
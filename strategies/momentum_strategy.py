@@ -3,6 +3,9 @@
 import pandas as pd
 import numpy as np
 
+from engine.price_panel import PricePanel
+from utils import indicators
+
 class MomentumStrategy:
     """
     Simple cross-sectional momentum:
@@ -13,30 +16,107 @@ class MomentumStrategy:
         self.lookback = lookback
         self.top_k     = top_k
         self.bottom_k = bottom_k
+        self.reset()
+
+    @property
+    def warmup_bars(self) -> int:
+        """Bars of history a signal depends on besides the current one (see Backtester.run_chunked)."""
+        return self.lookback
 
     def generate_signals(self, multi_data: dict) -> pd.DataFrame:
         """
         multi_data: dict of { symbol: DataFrame } with 'Close' column.
         Returns a DataFrame signals[symbol] = +1/0/−1 per date.
         """
-        # build a price panel
-        prices = pd.DataFrame({
+        prices = self._price_panel(multi_data)
+        return self._signals_for(prices, self.lookback)
+
+    def generate_signals_batch(self, multi_data: dict, lookbacks) -> dict:
+        """
+        Signals for several lookbacks at once, sharing one price panel.
+        Returns { lookback: signals DataFrame }, each identical to what
+        MomentumStrategy(lookback, top_k, bottom_k).generate_signals would give.
+        """
+        prices = self._price_panel(multi_data)
+        return {lb: self._signals_for(prices, lb) for lb in lookbacks}
+
+    @staticmethod
+    def _price_panel(multi_data: dict) -> pd.DataFrame:
+        # build a price panel (a PricePanel already is one: view it, don't copy)
+        if isinstance(multi_data, PricePanel):
+            return multi_data.to_frame()
+        return pd.DataFrame({
             sym: df['Close'] for sym, df in multi_data.items()
         })
 
-        # compute returns
-        ret = prices.pct_change(self.lookback, fill_method=None).dropna()
-        signals = pd.DataFrame(0, index=prices.index, columns=prices.columns)
-
-        # On each date, rank and assign +1, −1
-        for date in ret.index:
-            today = ret.loc[date].dropna()
-            if len(today) < (self.top_k + self.bottom_k):
-                continue
-            ranked = today.rank(ascending=False)
-            longs  = ranked[ranked <= self.top_k].index
-            shorts = ranked[ranked > (len(today) - self.bottom_k)].index
-            signals.loc[date, longs]  = 1
-            signals.loc[date, shorts] = -1
-
-        return signals
\ No newline at end of file
+    def _signals_for(self, prices: pd.DataFrame, lookback: int) -> pd.DataFrame:
+        # compute returns (memoized per price panel and lookback)
+        ret    = indicators.pct_change(prices, lookback).to_numpy(dtype=float)
+        n_syms = ret.shape[1]
+
+        signals = np.zeros(ret.shape, dtype=np.int64)
+        # dropna() keeps only dates where every name has a return; and a
+        # date with fewer names than top_k + bottom_k is skipped entirely
+        rows = np.flatnonzero(~np.isnan(ret).any(axis=1))
+        if len(rows) and n_syms >= (self.top_k + self.bottom_k):
+            ranked = self._rank_desc(ret[rows])
+            today  = np.zeros(ranked.shape, dtype=np.int64)
+            today[ranked <= self.top_k] = 1
+            today[ranked > (n_syms - self.bottom_k)] = -1
+            signals[rows] = today
+
+        return pd.DataFrame(signals, index=prices.index, columns=prices.columns)
+
+    # ─── Online / bar-by-bar mode ─────────────────────────────────────────────
+
+    def reset(self):
+        """Clear the streaming state used by on_bar()."""
+        self._symbols = None
+        self._closes  = None     # ring buffer of the last lookback + 1 closes
+        self._seen    = 0
+
+    def on_bar(self, prices: dict) -> dict:
+        """
+        {symbol: close} of one bar → {symbol: signal}, the row generate_signals
+        gives for that bar; O(symbols) per call, for the EventEngine.
+        """
+        if self._symbols is None:
+            self._symbols = list(prices)
+            self._closes  = np.full((self.lookback + 1, len(self._symbols)), np.nan)
+        row = self._seen % (self.lookback + 1)
+        self._closes[row] = [prices[sym] for sym in self._symbols]
+        self._seen += 1
+
+        n_syms  = len(self._symbols)
+        signals = np.zeros(n_syms, dtype=np.int64)
+        if self._seen > self.lookback:
+            # same arithmetic as pct_change: p_t / p_{t-lookback} - 1
+            ret = self._closes[row] / self._closes[self._seen % (self.lookback + 1)] - 1
+            if not np.isnan(ret).any() and n_syms >= (self.top_k + self.bottom_k):
+                ranked = self._rank_desc(ret[None, :])[0]
+                signals[ranked <= self.top_k] = 1
+                signals[ranked > (n_syms - self.bottom_k)] = -1
+        return dict(zip(self._symbols, signals.tolist()))
+
+    @staticmethod
+    def _rank_desc(values: np.ndarray) -> np.ndarray:
+        """
+        Row-wise descending ranks with ties averaged, i.e. Series.rank(ascending=False)
+        applied to every row at once.
+        """
+        n_rows, n_cols = values.shape
+        order   = np.argsort(-values, axis=1)
+        ordered = np.take_along_axis(-values, order, axis=1)
+
+        # tie groups: [first, last] positions of equal values in each sorted row
+        pos       = np.broadcast_to(np.arange(n_cols), (n_rows, n_cols))
+        new_group = np.ones((n_rows, n_cols), dtype=bool)
+        new_group[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+        end_group = np.ones((n_rows, n_cols), dtype=bool)
+        end_group[:, :-1] = new_group[:, 1:]
+        first = np.maximum.accumulate(np.where(new_group, pos, 0), axis=1)
+        last  = np.minimum.accumulate(np.where(end_group, pos, n_cols)[:, ::-1], axis=1)[:, ::-1]
+
+        ranks = np.empty((n_rows, n_cols), dtype=float)
+        np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=1)
+        return ranks
\ No newline at end of file
@@ -1,8 +1,11 @@
 # strategies/pairs_trading_strategy.py
 
+import math
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.stattools import coint
+
+from utils import indicators
+from utils.rolling import RollingWindow
 
 class PairsTradingStrategy:
     """
@@ -15,13 +18,34 @@ class PairsTradingStrategy:
         self.z_entry  = z_entry
         self.z_exit   = z_exit
         self.symbols = [symbol_x, symbol_y]
+        self.reset()
+
+    @property
+    def symbol_x(self) -> str:
+        return self.x
+
+    @property
+    def symbol_y(self) -> str:
+        return self.y
+
+    @property
+    def warmup_bars(self) -> int:
+        """Bars of history a signal depends on besides the current one (see Backtester.run_chunked)."""
+        # the hedge ratio needs `lookback` bars, then the spread z-score `lookback` ratios
+        return 2 * (self.lookback - 1)
 
     def fit(self, df_x: pd.Series, df_y: pd.Series):
         # test cointegration and estimate hedge ratio via OLS
-        self.ratio = (df_x / df_y).rolling(self.lookback).mean()
+        self.ratio = indicators.rolling_mean(df_x / df_y, self.lookback)
         # track z-score of spread
         spread = df_x - self.ratio * df_y
-        self.zscore = (spread - spread.rolling(self.lookback).mean()) / spread.rolling(self.lookback).std()
+        self.zscore = ((spread - indicators.rolling_mean(spread, self.lookback))
+                       / indicators.rolling_std(spread, self.lookback))
+
+    def coint_pvalue(self, df_x: pd.Series, df_y: pd.Series) -> float:
+        """Engle-Granger cointegration p-value for the pair."""
+        from statsmodels.tsa.stattools import coint   # heavy; only needed here
+        return float(coint(df_x, df_y)[1])
 
     def generate_signals(self, multi_data: dict) -> pd.DataFrame:
         px = multi_data[self.x]['Close']
@@ -33,4 +57,47 @@ class PairsTradingStrategy:
         sig.loc[self.zscore >  self.z_entry, [self.x, self.y]] = [-1, 1]
         sig.loc[self.zscore < -self.z_entry, [self.x, self.y]] = [1, -1]
         sig.loc[self.zscore.abs() < self.z_exit, [self.x, self.y]] = [0, 0]
-        return sig
\ No newline at end of file
+        return sig
+
+    # ─── Online / bar-by-bar mode ─────────────────────────────────────────────
+
+    def reset(self):
+        """Clear the streaming state used by update()."""
+        self._ratio_window  = RollingWindow(self.lookback)
+        self._spread_window = RollingWindow(self.lookback)
+
+    def update(self, price_x: float, price_y: float):
+        """
+        Feed one new bar and get (zscore, {symbol_x: s, symbol_y: s}) for it.
+        Rolling ratio and spread statistics are kept in fixed-size ring buffers,
+        so each call is O(1) and memory stays constant; the z-scores match what
+        fit() computes over the whole history up to that bar.
+        """
+        self._ratio_window.push(price_x / price_y)
+        ratio  = self._ratio_window.mean()
+        spread = price_x - ratio * price_y
+        self._spread_window.push(spread)
+
+        deviation = spread - self._spread_window.mean()
+        std       = self._spread_window.std()
+        if std == 0:
+            # float division like pandas: 0/0 → NaN, x/0 → ±inf
+            zscore = math.nan if deviation == 0 or math.isnan(deviation) else math.copysign(math.inf, deviation)
+        else:
+            zscore = deviation / std
+        return zscore, self._signal_for(zscore)
+
+    def on_bar(self, prices: dict) -> dict:
+        """{symbol: close} of one bar → {symbol_x: s, symbol_y: s}, for the EventEngine."""
+        return self.update(prices[self.x], prices[self.y])[1]
+
+    def _signal_for(self, zscore: float) -> dict:
+        # same precedence as generate_signals: entry rules, then exit overrides
+        sx, sy = 0, 0
+        if zscore > self.z_entry:
+            sx, sy = -1, 1
+        if zscore < -self.z_entry:
+            sx, sy = 1, -1
+        if abs(zscore) < self.z_exit:
+            sx, sy = 0, 0
+        return {self.x: sx, self.y: sy}
\ No newline at end of file
@@ -1,33 +1,79 @@
 # strategies/strategy_template.py
+from collections.abc import Mapping
+
 import pandas as pd
 
+from utils import indicators
+from utils.rolling import RollingWindow
+
 class MovingAverageCrossoverStrategy:
     def __init__(self, short_window=50, long_window=200):
         self.short_window = short_window
         self.long_window = long_window
+        self.reset()
+
+    @property
+    def warmup_bars(self) -> int:
+        """Bars of history a signal depends on besides the current one (see Backtester.run_chunked)."""
+        return max(self.short_window, self.long_window) - 1
 
     def generate_signals(self, data):
         """
-        Accepts either a pd.Series (prices) or a pd.DataFrame with 'Close'.
+        Accepts either a pd.Series (prices), a pd.DataFrame with 'Close',
+        or a one-symbol mapping { symbol: DataFrame } as passed by Backtester.
         Returns a DataFrame with at least these columns:
           - 'Close'  : the price series
           - 'signal' : the trading signal (+1, 0, -1)
         """
-        # 1) Wrap a Series into a DataFrame
+        if isinstance(data, Mapping):
+            if len(data) != 1:
+                raise ValueError("MovingAverageCrossoverStrategy trades a single symbol.")
+            data = next(iter(data.values()))
+
+        # 1) Wrap a Series into a DataFrame; new columns go on a shallow copy,
+        #    so the (possibly read-only) input columns are shared, not duplicated
         if isinstance(data, pd.Series):
             df = data.to_frame(name="Close")
         elif isinstance(data, pd.DataFrame):
-            df = data.copy()
+            df = data.copy(deep=False)
         else:
             raise ValueError("Data must be a pandas Series or DataFrame")
 
-        # 2) Compute moving averages
-        df["short_ma"] = df["Close"].rolling(self.short_window).mean()
-        df["long_ma"]  = df["Close"].rolling(self.long_window).mean()
+        # 2) Compute moving averages (memoized across instances and runs)
+        df["short_ma"] = indicators.rolling_mean(df["Close"], self.short_window)
+        df["long_ma"]  = indicators.rolling_mean(df["Close"], self.long_window)
 
         # 3) Generate the signal column
         df["signal"] = 0
         df.loc[df["short_ma"] > df["long_ma"], "signal"] = 1
         df.loc[df["short_ma"] < df["long_ma"], "signal"] = -1
 
-        return df
\ No newline at end of file
+        return df
+
+    # ─── Online / bar-by-bar mode ─────────────────────────────────────────────
+
+    def reset(self):
+        """Clear the streaming state used by update()."""
+        self._short_window = RollingWindow(self.short_window)
+        self._long_window  = RollingWindow(self.long_window)
+
+    def update(self, price: float) -> int:
+        """
+        Feed one close and get that bar's signal (+1 / 0 / −1) in O(1), the
+        same rule generate_signals applies to the moving averages so far.
+        """
+        self._short_window.push(price)
+        self._long_window.push(price)
+        short_ma, long_ma = self._short_window.mean(), self._long_window.mean()
+        if short_ma > long_ma:
+            return 1
+        if short_ma < long_ma:
+            return -1
+        return 0
+
+    def on_bar(self, prices: dict) -> dict:
+        """{symbol: close} of one bar → {symbol: signal}, for the EventEngine."""
+        if len(prices) != 1:
+            raise ValueError("MovingAverageCrossoverStrategy trades a single symbol.")
+        (sym, price), = prices.items()
+        return {sym: self.update(price)}
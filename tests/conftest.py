@@ -3,7 +3,68 @@
 import sys
 import os
 
+import numpy as np
+import pandas as pd
+
 # Insert the project root (one level up) at front of sys.path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
-    sys.path.insert(0, project_root)
\ No newline at end of file
+    sys.path.insert(0, project_root)
+
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from utils.backtester import Backtester
+
+# ─── Shared test helpers ──────────────────────────────────────────────────────
+# Plain functions, imported by the test modules with `from conftest import ...`
+# (pytest has already loaded this module, so nothing runs twice).
+
+class FixedSignalStrategy:
+    """Returns a precomputed signals frame, whatever the input."""
+    def __init__(self, signals: pd.DataFrame):
+        self.signals = signals
+
+    def generate_signals(self, multi_data: dict) -> pd.DataFrame:
+        return self.signals
+
+
+def make_prices(n_bars=200, symbols=("A", "B", "C", "D"), seed=1):
+    """{ symbol: DataFrame with a random-walk 'Close' } on a daily index."""
+    rng   = np.random.default_rng(seed)
+    dates = pd.date_range("2020-01-01", periods=n_bars)
+    return {
+        sym: pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))}, index=dates)
+        for sym in symbols
+    }
+
+
+def make_panel(n_bars=300, symbols=("A", "B", "C", "D"), seed=0):
+    """Random-walk prices plus sticky random signals in {-1, 0, 1} for them."""
+    rng   = np.random.default_rng(seed)
+    dates = pd.date_range("2020-01-01", periods=n_bars)
+    data  = {
+        sym: pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))}, index=dates)
+        for sym in symbols
+    }
+    raw     = rng.integers(-1, 2, size=(n_bars, len(symbols)))
+    keep    = rng.random((n_bars, len(symbols))) < 0.8
+    signals = pd.DataFrame(raw, index=dates, columns=list(symbols)).mask(keep).ffill().fillna(0).astype(int)
+    return data, signals
+
+
+def make_backtester(strategy, commission=1.0, slippage=0.001, capital=100_000, trade_sink=None, **kwargs):
+    """
+    Backtester with the suite's usual costs and capital. `strategy` may be a
+    signals frame (wrapped in FixedSignalStrategy); other keyword arguments
+    (execution_mode, stop_loss_pct, result_cache, ...) go to Backtester.
+    """
+    if isinstance(strategy, pd.DataFrame):
+        strategy = FixedSignalStrategy(strategy)
+    exec_h = ExecutionHandler(commission_per_trade=commission, slippage_pct=slippage, trade_sink=trade_sink)
+    return Backtester(strategy, exec_h, Portfolio(initial_capital=capital), **kwargs)
+
+
+def run_mode(mode, data, signals, **kwargs):
+    """Run fixed `signals` in one execution mode; returns (history, exec_h, portfolio)."""
+    bt = make_backtester(signals, execution_mode=mode, **kwargs)
+    return bt.run(data), bt.exec_h, bt.portfolio
@@ -0,0 +1,138 @@
+# tests/test_backtester.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from engine.price_panel import PricePanel
+from engine.price_store import PriceStore
+from strategies.momentum_strategy import MomentumStrategy
+from strategies.pairs_strategy import PairsTradingStrategy
+from strategies.strategy_template import MovingAverageCrossoverStrategy
+from utils.backtester import Backtester
+from conftest import FixedSignalStrategy, make_backtester, make_panel, run_mode
+
+
+@pytest.mark.parametrize("stops", [
+    {},
+    {"stop_loss_pct": 0.03},
+    {"take_profit_pct": 0.05},
+    {"stop_loss_pct": 0.02, "take_profit_pct": 0.04},
+])
+def test_vectorized_matches_loop(stops):
+    data, signals = make_panel()
+    hist_loop, exec_loop, port_loop = run_mode("loop", data, signals, **stops)
+    hist_vec,  exec_vec,  port_vec  = run_mode("vectorized", data, signals, **stops)
+
+    pd.testing.assert_frame_equal(hist_vec, hist_loop, check_exact=True)
+    assert exec_vec.trades == exec_loop.trades
+    assert exec_vec.total_slippage == exec_loop.total_slippage
+    assert port_vec.cash == port_loop.cash
+    assert port_vec.positions == port_loop.positions
+
+
+def test_vectorized_missing_signal_dates_default_to_zero():
+    data, signals = make_panel(n_bars=50, symbols=("A", "B"))
+    sparse = signals.iloc[::3]
+    hist_loop, _, _ = run_mode("loop", data, sparse)
+    hist_vec,  _, _ = run_mode("vectorized", data, sparse)
+    pd.testing.assert_frame_equal(hist_vec, hist_loop, check_exact=True)
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_nan_signals_raise_in_both_modes(mode):
+    data, signals = make_panel(n_bars=50, symbols=("A", "B"))
+    signals = signals.astype(float)
+    signals.iloc[20, 1] = np.nan
+    with pytest.raises(ValueError, match=f"NaN signal for 'B' on {signals.index[20]}"):
+        run_mode(mode, data, signals)
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_replay_in_segments_matches_run(mode):
+    data, signals = make_panel(n_bars=120)
+    expected, _, _ = run_mode(mode, data, signals, stop_loss_pct=0.03)
+
+    bt    = make_backtester(signals, execution_mode=mode, stop_loss_pct=0.03)
+    panel = PricePanel.from_data(data)
+    sigs  = bt.signals_for(panel)
+    first = bt.replay(panel.window(0, 50), sigs)
+    rest  = bt.replay(panel.window(50, 120), sigs, bt.last_signals(first))
+    pd.testing.assert_frame_equal(pd.concat([first, rest]), expected, check_exact=True)
+
+
+def test_unknown_execution_mode_rejected():
+    with pytest.raises(ValueError):
+        Backtester(None, ExecutionHandler(), Portfolio(1000), execution_mode="turbo")
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_wide_positions_format_matches_dicts(mode):
+    data, signals = make_panel(n_bars=120, symbols=("A", "B", "C"))
+    hist_dict, _, _ = run_mode(mode, data, signals, stop_loss_pct=0.03, positions_format="dict")
+    hist_wide, _, _ = run_mode(mode, data, signals, stop_loss_pct=0.03, positions_format="wide")
+
+    assert "positions" not in hist_wide.columns
+    for sym in ("A", "B", "C"):
+        expected = hist_dict["positions"].map(lambda p: p.get(sym, 0))
+        assert (hist_wide[f"position_{sym}"] == expected).all()
+    pd.testing.assert_series_equal(hist_wide["total_equity"], hist_dict["total_equity"])
+
+
+def run_in_memory(strategy, data, mode, **kwargs):
+    exec_h = ExecutionHandler(commission_per_trade=1.0)
+    port   = Portfolio(initial_capital=100_000)
+    hist   = Backtester(strategy, exec_h, port, execution_mode=mode, **kwargs).run(data)
+    return hist, exec_h, port
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+@pytest.mark.parametrize("make_strategy", [
+    lambda signals: FixedSignalStrategy(signals),
+    lambda signals: MomentumStrategy(lookback=15, top_k=1, bottom_k=1),
+])
+def test_run_chunked_from_store_matches_in_memory(tmp_path, mode, make_strategy):
+    data, signals = make_panel(n_bars=400, symbols=("A", "B", "C", "D"))
+    store = PriceStore(root=str(tmp_path))
+    for sym, df in data.items():
+        store.write(sym, df)
+
+    hist_mem, exec_mem, port_mem = run_in_memory(make_strategy(signals), data, mode, stop_loss_pct=0.03)
+
+    exec_h = ExecutionHandler(commission_per_trade=1.0)
+    port   = Portfolio(initial_capital=100_000)
+    bt     = Backtester(make_strategy(signals), exec_h, port, execution_mode=mode, stop_loss_pct=0.03)
+    hist   = bt.run_chunked(store.iter_chunks(list(data), freq="MS"))
+
+    pd.testing.assert_frame_equal(hist, hist_mem, check_exact=True, check_names=False, check_freq=False)
+    assert exec_h.trades == exec_mem.trades
+    assert port.cash == port_mem.cash and port.positions == port_mem.positions
+
+
+def test_run_chunked_warmup_for_rolling_strategies():
+    rng   = np.random.default_rng(3)
+    dates = pd.date_range("2020-01-01", periods=300)
+    x     = pd.Series(100 + np.cumsum(rng.normal(size=300)), index=dates)
+    y     = pd.Series(50 + 0.5 * np.cumsum(rng.normal(size=300)) + 0.2 * x.to_numpy(), index=dates)
+
+    cases = [
+        (lambda: MovingAverageCrossoverStrategy(short_window=5, long_window=20), {"X": x}),
+        (lambda: PairsTradingStrategy("X", "Y", lookback=20, z_entry=1.0, z_exit=0.2), {"X": x, "Y": y}),
+    ]
+    for make_strategy, data in cases:
+        hist_mem, _, _ = run_in_memory(make_strategy(), data, "vectorized")
+        chunks = [{sym: s.iloc[i:i + 37] for sym, s in data.items()} for i in range(0, 300, 37)]
+        bt   = Backtester(make_strategy(), ExecutionHandler(commission_per_trade=1.0),
+                          Portfolio(initial_capital=100_000), execution_mode="vectorized")
+        hist = bt.run_chunked(chunks)
+        pd.testing.assert_frame_equal(hist, hist_mem, check_exact=True)
+
+
+def test_run_chunked_on_chunk_streams_histories():
+    data, signals = make_panel(n_bars=100, symbols=("A", "B"))
+    chunks = [{sym: df.iloc[i:i + 30] for sym, df in data.items()} for i in range(0, 100, 30)]
+    seen   = []
+    bt     = Backtester(FixedSignalStrategy(signals), ExecutionHandler(), Portfolio(100_000))
+    assert bt.run_chunked(chunks, on_chunk=seen.append) is None
+    assert [len(h) for h in seen] == [30, 30, 30, 10]
@@ -0,0 +1,33 @@
+# tests/test_bench_hot_paths.py
+
+from benchmarks.bench_hot_paths import run_suite, scaling, compare_to_baseline
+from benchmarks.synthetic import make_prices, make_signals
+
+
+def test_synthetic_inputs_are_reproducible():
+    prices = make_prices(3, 50, seed=7)
+    assert prices.shape == (50, 3)
+    assert prices.equals(make_prices(3, 50, seed=7))
+    signals = make_signals(prices.index, prices.columns)
+    assert set(signals.stack().unique()) <= {-1, 0, 1}
+
+
+def test_run_suite_records_time_and_memory():
+    results = run_suite(["portfolio_record", "compare_strategies"], symbols=(1, 4), bars=(100, 200),
+                        repeat=1, log=lambda *_: None)
+    assert len(results) == 8
+    assert all(r["median_s"] > 0 and r["peak_mb"] >= 0 for r in results)
+    assert "portfolio_record vs n_bars @ n_symbols=4" in scaling(results)
+
+
+def test_compare_to_baseline_flags_slowdowns_only():
+    base = [{"case": "a", "n_symbols": 1, "n_bars": 10, "median_s": 1.0},
+            {"case": "b", "n_symbols": 1, "n_bars": 10, "median_s": 1.0},
+            {"case": "c", "n_symbols": 1, "n_bars": 10, "median_s": 1e-5}]
+    now  = [{"case": "a", "n_symbols": 1, "n_bars": 10, "median_s": 1.1},
+            {"case": "b", "n_symbols": 1, "n_bars": 10, "median_s": 1.5},
+            {"case": "c", "n_symbols": 1, "n_bars": 10, "median_s": 5e-5},
+            {"case": "d", "n_symbols": 1, "n_bars": 10, "median_s": 9.0}]
+    regressions = compare_to_baseline(now, base, threshold=0.25)
+    assert [r["case"] for r in regressions] == ["b"]
+    assert regressions[0]["ratio"] == 1.5
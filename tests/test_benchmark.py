@@ -0,0 +1,67 @@
+# tests/test_benchmark.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.benchmark import backtest_strategy, simulate_portfolios, portfolio_metrics
+from utils.performance import calculate_returns, calculate_sharpe_ratio
+
+
+def make_case(n_bars=150, n_strats=6, seed=0):
+    rng    = np.random.default_rng(seed)
+    idx    = pd.date_range("2021-01-01", periods=n_bars)
+    prices = pd.Series(50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars))), index=idx)
+    raw    = rng.integers(-1, 2, size=(n_bars, n_strats))
+    keep   = rng.random((n_bars, n_strats)) < 0.7
+    signals = pd.DataFrame(raw, index=idx, columns=[f"s{i}" for i in range(n_strats)])
+    return prices, signals.mask(keep).ffill().fillna(0).astype(int)
+
+
+def test_matches_backtest_strategy_loop():
+    prices, signals = make_case()
+    equity = simulate_portfolios(prices, signals, initial_capital=10_000, qty_per_trade=7,
+                                 commission=1.5, block_size=4)
+    for name in signals.columns:
+        expected = backtest_strategy(prices, signals[name], "SYM", initial_capital=10_000,
+                                     qty_per_trade=7, commission=1.5)
+        np.testing.assert_array_equal(equity[name].to_numpy(), expected.to_numpy())
+
+
+def test_panel_prices_and_per_strategy_quantities():
+    prices, signals = make_case(n_strats=3, seed=1)
+    panel = pd.DataFrame({name: prices * (i + 1) for i, name in enumerate(signals.columns)})
+    qty   = pd.Series({"s0": 1, "s1": 5, "s2": 20})
+    equity = simulate_portfolios(panel, signals, qty_per_trade=qty)
+    for name in signals.columns:
+        expected = backtest_strategy(panel[name], signals[name], name, qty_per_trade=qty[name])
+        np.testing.assert_array_equal(equity[name].to_numpy(), expected.to_numpy())
+
+
+@pytest.mark.parametrize("qty", [[1, 5, 20], np.array([1, 5, 20]), {"s2": 20, "s0": 1, "s1": 5}])
+def test_quantities_by_position_or_name(qty):
+    prices, signals = make_case(n_strats=3, seed=2)
+    equity = simulate_portfolios(prices, signals, qty_per_trade=qty)
+    for name, q in zip(signals.columns, [1, 5, 20]):
+        expected = backtest_strategy(prices, signals[name], "SYM", qty_per_trade=q)
+        np.testing.assert_array_equal(equity[name].to_numpy(), expected.to_numpy())
+
+
+def test_quantities_must_cover_every_strategy():
+    prices, signals = make_case(n_strats=3)
+    with pytest.raises(KeyError):
+        simulate_portfolios(prices, signals, qty_per_trade=pd.Series({"s0": 1, "s1": 2}))
+    with pytest.raises(ValueError):
+        simulate_portfolios(prices, signals, qty_per_trade=[1, 2])
+
+
+def test_portfolio_metrics_table():
+    prices, signals = make_case(seed=2)
+    equity  = simulate_portfolios(prices, signals)
+    metrics = portfolio_metrics(equity)
+    assert list(metrics.index) == list(signals.columns)
+    for name in signals.columns:
+        curve = equity[name]
+        assert metrics.loc[name, "final_value"] == curve.iloc[-1]
+        assert metrics.loc[name, "sharpe"] == pytest.approx(
+            calculate_sharpe_ratio(calculate_returns(curve), 0.0, 252))
+        assert metrics.loc[name, "max_drawdown"] == pytest.approx((curve / curve.cummax() - 1).min())
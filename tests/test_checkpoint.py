@@ -0,0 +1,136 @@
+# tests/test_checkpoint.py
+
+import os
+import pickle
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from strategies.momentum_strategy import MomentumStrategy
+from utils import checkpoint, sweep
+from utils.backtester import Backtester
+from utils.sweep import run_sweep
+from utils.walk_forward import run_walk_forward
+from conftest import make_backtester, make_panel, make_prices
+
+STOPS = {"stop_loss_pct": 0.02}
+
+
+class Preempted(Exception):
+    pass
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+@pytest.mark.parametrize("positions_format", ["dict", "wide"])
+def test_resume_after_preemption_matches_uninterrupted_run(tmp_path, monkeypatch, mode, positions_format):
+    data, signals = make_panel(n_bars=500)
+    expected_bt   = make_backtester(signals, execution_mode=mode, **STOPS, positions_format=positions_format)
+    expected      = expected_bt.run(data)
+
+    # the worker dies while applying the third segment
+    calls = {"n": 0}
+    apply = Backtester._apply_trades
+    def flaky(self, *args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise Preempted()
+        return apply(self, *args, **kwargs)
+    monkeypatch.setattr(Backtester, "_apply_trades", flaky)
+    with pytest.raises(Preempted):
+        make_backtester(signals, execution_mode=mode, **STOPS, positions_format=positions_format).run_checkpointed(
+            data, checkpoint_dir=str(tmp_path), every=120)
+    assert checkpoint.load_state(str(tmp_path / "state.pkl"))["bar"] == 240
+
+    # a fresh process resumes: only the remaining segments run
+    calls["n"] = -10
+    bt      = make_backtester(signals, execution_mode=mode, **STOPS, positions_format=positions_format)
+    resumed = bt.run_checkpointed(data, checkpoint_dir=str(tmp_path), every=120)
+    assert calls["n"] == -10 + 3
+
+    pdt.assert_frame_equal(resumed, expected, check_exact=True)
+    assert bt.portfolio.cash == expected_bt.portfolio.cash
+    assert bt.portfolio.positions == expected_bt.portfolio.positions
+    assert list(bt.exec_h.trades) == list(expected_bt.exec_h.trades)
+    assert bt.exec_h.total_commission == expected_bt.exec_h.total_commission
+    assert bt.exec_h.total_slippage == expected_bt.exec_h.total_slippage
+    assert bt.exec_h.ledger.to_frame().equals(expected_bt.exec_h.ledger.to_frame())
+
+
+def test_checkpoint_of_another_run_is_ignored(tmp_path):
+    data, signals = make_panel(n_bars=200)
+    vectorized = {"execution_mode": "vectorized", **STOPS}
+    make_backtester(signals, **vectorized).run_checkpointed(data, checkpoint_dir=str(tmp_path), every=50)
+
+    other    = signals.shift(1).fillna(0).astype(int)
+    fresh    = make_backtester(other, **vectorized).run_checkpointed(data, checkpoint_dir=str(tmp_path), every=50)
+    expected = make_backtester(other, **vectorized).run(data)
+    pdt.assert_frame_equal(fresh, expected, check_exact=True)
+
+
+def test_pickled_state_is_trimmed():
+    port = Portfolio(initial_capital=1_000, capacity=100_000)
+    port.snapshot(pd.Timestamp("2024-01-02"), {})
+    exec_h = ExecutionHandler()
+    exec_h.execute_order("BUY", "A", 1, 10.0, pd.Timestamp("2024-01-02"))
+
+    assert len(pickle.dumps(port)) < 2_000 and len(pickle.dumps(exec_h)) < 2_000
+    restored = pickle.loads(pickle.dumps(port))
+    pdt.assert_frame_equal(restored.history(), port.history())
+    restored.buy("A", 1, 10.0, commission=0.0, timestamp=pd.Timestamp("2024-01-03"))
+    assert len(restored.history()) == 2
+
+
+def test_result_log_survives_a_torn_record(tmp_path):
+    path = str(tmp_path / "results.pkl")
+    log  = checkpoint.ResultLog(path)
+    log.append("a", {"x": 1})
+    log.append("b", {"x": 2})
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    log = checkpoint.ResultLog(path)
+    assert "a" in log and "b" not in log
+    log.append("c", {"x": 3})
+    assert checkpoint.ResultLog(path).get("c") == {"x": 3}
+
+
+def test_sweep_skips_finished_parameter_sets(tmp_path, monkeypatch):
+    data = make_prices()
+    grid = {"lookback": [5, 10, 20], "top_k": [1, 2], "bottom_k": [1]}
+    full = run_sweep(MomentumStrategy, grid, data, n_jobs=1)
+
+    calls = []
+    backtest = sweep._backtest_metrics
+    def counting(panel, params, config):
+        calls.append(params)
+        return backtest(panel, params, config)
+    monkeypatch.setattr(sweep, "_backtest_metrics", counting)
+
+    # a first attempt only got through part of the grid
+    run_sweep(MomentumStrategy, {"lookback": [5, 10], "top_k": [1, 2], "bottom_k": [1]}, data,
+              n_jobs=1, checkpoint_dir=str(tmp_path))
+    assert len(calls) == 4
+
+    calls.clear()
+    resumed = run_sweep(MomentumStrategy, grid, data, n_jobs=1, checkpoint_dir=str(tmp_path))
+    assert [p["lookback"] for p in calls] == [20, 20]
+    pdt.assert_frame_equal(resumed, full, check_exact=True)
+
+    # nothing left to run, even on a pool
+    calls.clear()
+    again = run_sweep(MomentumStrategy, grid, data, n_jobs=2, checkpoint_dir=str(tmp_path))
+    assert calls == []
+    pdt.assert_frame_equal(again, full, check_exact=True)
+
+
+def test_walk_forward_reuses_logged_scores(tmp_path):
+    data = make_prices(n_bars=300)
+    kw   = dict(train=100, test=50, metric="final_equity", n_jobs=1, checkpoint_dir=str(tmp_path))
+    grid = {"lookback": [5, 10], "top_k": [1], "bottom_k": [1]}
+    first  = run_walk_forward(MomentumStrategy, grid, data, **kw)
+    second = run_walk_forward(MomentumStrategy, grid, data, **kw)
+    for a, b in zip(first, second):
+        pdt.assert_frame_equal(a, b, check_exact=True)
+    assert len(checkpoint.ResultLog(str(tmp_path / "walk_forward_results.pkl"))) == 2
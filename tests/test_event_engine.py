@@ -0,0 +1,112 @@
+# tests/test_event_engine.py
+
+import time
+
+import pandas.testing as pdt
+import pytest
+from engine.event_engine import EventEngine
+from engine.feeds import BarFeed, ReplayFeed
+from strategies.momentum_strategy import MomentumStrategy
+from strategies.pairs_strategy import PairsTradingStrategy
+from strategies.strategy_template import MovingAverageCrossoverStrategy
+from conftest import make_backtester, make_prices
+
+
+STOPS = {"stop_loss_pct": 0.02, "take_profit_pct": 0.05}
+
+CASES = [
+    (lambda: MovingAverageCrossoverStrategy(10, 40), "A"),
+    (lambda: MomentumStrategy(lookback=20, top_k=2, bottom_k=2), None),
+    (lambda: PairsTradingStrategy("A", "B", lookback=30, z_entry=1.0, z_exit=0.25), None),
+]
+
+
+@pytest.mark.parametrize("online", [True, False])
+@pytest.mark.parametrize("make_strategy,symbol", CASES)
+def test_replay_matches_backtester_run(make_strategy, symbol, online):
+    data = make_prices(n_bars=400, symbols=tuple("ABCDEF"))
+    data = data["A"]["Close"] if symbol else data
+    expected = make_backtester(make_strategy(), **STOPS).run(data, symbol)
+
+    bt      = make_backtester(make_strategy(), **STOPS)
+    engine  = EventEngine(bt, ReplayFeed(data, symbol=symbol), online=online)
+    history = engine.run_sync()
+    pdt.assert_frame_equal(history, expected, check_exact=True)
+
+    report = engine.latency_report()
+    assert report.loc["bar", "count"] == report.loc["signal", "count"] == len(expected)
+    assert report.loc["fill", "count"] == len(bt.exec_h.trades)
+    assert (report["max_us"] >= report["p50_us"]).all()
+
+
+def test_replay_from_price_store_on_disk(tmp_path):
+    pytest.importorskip("pyarrow")
+    from engine.price_store import PriceStore
+    data  = make_prices(n_bars=200)
+    store = PriceStore(root=str(tmp_path))
+    for sym, df in data.items():
+        store.write(sym, df)
+
+    strategy = lambda: MomentumStrategy(lookback=10, top_k=1, bottom_k=1)
+    expected = make_backtester(strategy(), **STOPS).run(data)
+    feed     = ReplayFeed(store, symbols=list(data), freq="MS")
+    history  = EventEngine(make_backtester(strategy(), **STOPS), feed).run_sync()
+    pdt.assert_frame_equal(history, expected, check_exact=True, check_freq=False, check_names=False)
+
+
+def test_paced_replay_keeps_to_bars_per_second():
+    data = make_prices(n_bars=100)
+    feed = ReplayFeed(data, bars_per_second=1_000)
+    t0   = time.perf_counter()
+    EventEngine(make_backtester(MomentumStrategy(lookback=5, top_k=1, bottom_k=1), **STOPS), feed).run_sync()
+    assert time.perf_counter() - t0 >= 99 / 1_000
+
+
+class CountingFeed(BarFeed):
+    """Replays `data`, recording how far the feed ran ahead of the booked bars."""
+    def __init__(self, data, engine_ref):
+        self.inner   = ReplayFeed(data)
+        self.symbols = self.inner.symbols
+        self.engine  = engine_ref
+        self.lead    = 0
+
+    async def __aiter__(self):
+        sent = 0
+        async for bar in self.inner:
+            booked    = len(self.engine[0]._bars["timestamp"])
+            self.lead = max(self.lead, sent - booked)
+            sent += 1
+            yield bar
+
+
+def test_bounded_queues_hold_back_the_feed():
+    data   = make_prices(n_bars=300)
+    holder = []
+    feed   = CountingFeed(data, holder)
+    fills  = []
+
+    engine = EventEngine(make_backtester(MomentumStrategy(lookback=5, top_k=1, bottom_k=1), **STOPS), feed,
+                         queue_size=2, on_fill=fills.append)
+    holder.append(engine)
+    engine.run_sync()
+    # at most one bar in each of the four queues plus one per stage in flight
+    assert 0 < feed.lead <= 4 * 2 + 5
+    assert len(fills) == len(engine.bt.exec_h.trades)
+
+
+def test_stage_errors_cancel_the_run():
+    class Broken:
+        warmup_bars = 0
+        def on_bar(self, prices):
+            raise RuntimeError("boom")
+
+    engine = EventEngine(make_backtester(Broken(), **STOPS), ReplayFeed(make_prices(n_bars=50)))
+    with pytest.raises(RuntimeError, match="boom"):
+        engine.run_sync()
+
+
+def test_feed_without_aiter_fails_when_created():
+    class NoBars(BarFeed):
+        symbols = ["A"]
+    with pytest.raises(TypeError):
+        NoBars()
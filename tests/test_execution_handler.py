@@ -9,4 +9,14 @@ def test_execute_order_records_trade():
     trade = h.trades[0]
     # slippage = 1% of 100 = 1.0, exec_price = 101.0
     assert trade.price == pytest.approx(101.0)
-    assert trade.commission == pytest.approx(2.0)
\ No newline at end of file
+    assert trade.commission == pytest.approx(2.0)
+
+def test_ledger_tracks_last_fill_per_symbol():
+    h = ExecutionHandler(commission_per_trade=0.0, slippage_pct=0.0)
+    h.execute_order("BUY", "AAA", 5, 100.0, timestamp="2023-01-01")
+    h.execute_order("BUY", "BBB", 5, 50.0, timestamp="2023-01-01")
+    h.execute_order("SELL", "AAA", 5, 110.0, timestamp="2023-01-02")
+    assert h.last_trade_price("AAA") == pytest.approx(110.0)
+    assert h.last_trade_price("BBB") == pytest.approx(50.0)
+    assert h.last_trade_price("CCC") is None
+    assert h.position("AAA").realized_pnl == pytest.approx(50.0)
@@ -0,0 +1,69 @@
+# tests/test_indicators.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils import indicators
+from utils.indicators import IndicatorCache, fingerprint
+
+
+def make_series(n=100, seed=0, name="Close"):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 + np.cumsum(rng.normal(size=n)), index=pd.date_range("2020-01-01", periods=n), name=name)
+
+
+def test_fingerprint_depends_on_content_not_identity():
+    s = make_series()
+    assert fingerprint(s) == fingerprint(s.copy())
+    assert fingerprint(s) != fingerprint(make_series(seed=1))
+    assert fingerprint(s) != fingerprint(s.rename("Open"))
+
+
+def test_indicators_match_pandas_and_hit_the_cache():
+    cache = IndicatorCache()
+    s = make_series()
+    pd.testing.assert_series_equal(indicators.rolling_mean(s, 10, cache=cache), s.rolling(10).mean())
+    pd.testing.assert_series_equal(indicators.rolling_std(s, 10, cache=cache), s.rolling(10).std())
+    pd.testing.assert_series_equal(indicators.pct_change(s, 5, cache=cache), s.pct_change(5, fill_method=None))
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    indicators.rolling_mean(s.copy(), 10, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    s = make_series()
+    cache = IndicatorCache(max_entries=2)
+    for w in (2, 3, 4):
+        indicators.rolling_mean(s, w, cache=cache)
+    assert len(cache) == 2
+    indicators.rolling_mean(s, 2, cache=cache)          # evicted → recomputed
+    assert cache.misses == 4
+
+    small = IndicatorCache(max_bytes=2 * s.memory_usage(index=True))
+    for w in (2, 3, 4):
+        indicators.rolling_mean(s, w, cache=small)
+    assert len(small) == 2 and small.nbytes <= small.max_bytes
+
+
+def test_reinserting_a_key_keeps_the_byte_count():
+    s = make_series()
+    cache = IndicatorCache()
+    # as when two threads miss the same key and both store their result
+    cache.get_or_compute("k", lambda: s)
+    cache._insert("k", s)
+    assert len(cache) == 1 and cache.nbytes == s.memory_usage(index=True)
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    s = make_series()
+    first = IndicatorCache(disk_dir=str(tmp_path))
+    expected = indicators.rolling_mean(s, 20, cache=first)
+
+    second = IndicatorCache(disk_dir=str(tmp_path))
+    pd.testing.assert_series_equal(indicators.rolling_mean(s, 20, cache=second), expected)
+    assert (second.disk_hits, second.misses) == (1, 0)
+
+    second.clear(disk=True)
+    indicators.rolling_mean(s, 20, cache=second)
+    assert second.misses == 1
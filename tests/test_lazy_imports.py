@@ -0,0 +1,28 @@
+# tests/test_lazy_imports.py
+
+import subprocess
+import sys
+import os
+
+from utils.lazy import LazyModule
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_engine_imports_skip_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "import utils.backtester, utils.performance, utils.risk, engine.portfolio\n"
+        "import engine.data_handler, engine.multi_data_handler, strategies.pairs_strategy\n"
+        "print(','.join(m for m in ('matplotlib', 'scipy', 'statsmodels', 'yfinance') if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_lazy_module_loads_on_first_use():
+    json_mod = LazyModule("json")
+    assert "not loaded" in repr(json_mod)
+    assert json_mod.dumps([1]) == "[1]"
+    assert "(loaded)" in repr(json_mod)
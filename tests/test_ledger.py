@@ -0,0 +1,86 @@
+# tests/test_ledger.py
+
+import math
+
+import pandas as pd
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.ledger import PositionLedger
+from engine.portfolio import Portfolio
+from engine.trade import Trade
+from utils.backtester import Backtester
+from conftest import FixedSignalStrategy
+
+
+def fill(order_type, qty, price, symbol="AAA"):
+    return Trade(timestamp=None, symbol=symbol, order_type=order_type,
+                 quantity=qty, price=price, commission=1.0, slippage=0.0)
+
+
+def test_average_price_and_realized_pnl():
+    ledger = PositionLedger()
+    ledger.update(fill("BUY", 10, 100.0))
+    ledger.update(fill("BUY", 10, 110.0))
+    assert ledger["AAA"].quantity == 20
+    assert ledger.avg_price("AAA") == pytest.approx(105.0)
+
+    ledger.update(fill("SELL", 5, 120.0))
+    entry = ledger["AAA"]
+    assert entry.quantity == 15
+    assert entry.avg_price == pytest.approx(105.0)
+    assert entry.realized_pnl == pytest.approx(75.0)
+    assert entry.last_price == 120.0
+    assert entry.commission == pytest.approx(3.0)
+
+
+def test_flip_through_flat_and_short_side():
+    ledger = PositionLedger(allow_short=True)
+    ledger.update(fill("BUY", 10, 100.0))
+    ledger.update(fill("SELL", 15, 90.0))      # close 10 at -10 each, open 5 short
+    entry = ledger["AAA"]
+    assert entry.quantity == -5
+    assert entry.realized_pnl == pytest.approx(-100.0)
+    assert entry.avg_price == pytest.approx(90.0)
+
+    ledger.update(fill("BUY", 5, 80.0))        # cover the short at a profit
+    assert ledger["AAA"].quantity == 0
+    assert ledger.realized_pnl("AAA") == pytest.approx(-50.0)
+    assert math.isnan(ledger.avg_price("AAA"))
+
+
+def test_sells_never_go_below_flat_by_default():
+    ledger = PositionLedger()
+    ledger.update(fill("SELL", 10, 100.0))     # nothing held: no position, still a fill
+    entry = ledger["AAA"]
+    assert (entry.quantity, entry.realized_pnl, entry.fills) == (0, 0.0, 1)
+    assert entry.last_price == 100.0
+
+    ledger.update(fill("BUY", 10, 100.0))
+    ledger.update(fill("SELL", 15, 90.0))      # closes the 10 held, opens nothing
+    entry = ledger["AAA"]
+    assert entry.quantity == 0 and math.isnan(entry.avg_price)
+    assert entry.realized_pnl == pytest.approx(-100.0)
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_ledger_agrees_with_portfolio_after_an_opening_sell(mode):
+    dates   = pd.date_range("2021-01-01", periods=4)
+    prices  = pd.Series([100.0, 95.0, 105.0, 110.0], index=dates)
+    signals = pd.DataFrame({"A": [-1, 1, 1, 1]}, index=dates)
+    exec_h  = ExecutionHandler(commission_per_trade=0.0)
+    port    = Portfolio(initial_capital=10_000)
+    Backtester(FixedSignalStrategy(signals), exec_h, port, execution_mode=mode).run(prices, "A")
+
+    assert port.positions == {"A": 10}
+    assert exec_h.position("A").quantity == port.positions["A"]
+    assert exec_h.position("A").realized_pnl == 0.0
+
+
+def test_unknown_symbol_lookups():
+    ledger = PositionLedger()
+    ledger.update(fill("BUY", 1, 10.0, symbol="AAA"))
+    assert ledger.get("ZZZ") is None
+    assert ledger.last_price("ZZZ") is None
+    assert ledger.realized_pnl("ZZZ") == 0.0
+    assert "AAA" in ledger and len(ledger) == 1
+    assert list(ledger.to_frame().index) == ["AAA"]
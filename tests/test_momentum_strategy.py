@@ -1,5 +1,6 @@
 # tests/test_momentum_strategy.py
 
+import numpy as np
 import pandas as pd
 import pytest
 from strategies.momentum_strategy import MomentumStrategy
@@ -13,4 +14,47 @@ def test_momentum_signals():
     signals = strat.generate_signals(data)
     # On the second date, A should be top momentum, B bottom
     assert signals.loc[dates[1], "A"] == 1
-    assert signals.loc[dates[1], "B"] == -1
\ No newline at end of file
+    assert signals.loc[dates[1], "B"] == -1
+
+def reference_signals(strat, data):
+    """The original per-date loop, kept as the oracle for the batched ranking."""
+    prices  = pd.DataFrame({sym: df["Close"] for sym, df in data.items()})
+    ret     = prices.pct_change(strat.lookback, fill_method=None).dropna()
+    signals = pd.DataFrame(0, index=prices.index, columns=prices.columns)
+    for date in ret.index:
+        today = ret.loc[date].dropna()
+        if len(today) < (strat.top_k + strat.bottom_k):
+            continue
+        ranked = today.rank(ascending=False)
+        signals.loc[date, ranked[ranked <= strat.top_k].index] = 1
+        signals.loc[date, ranked[ranked > (len(today) - strat.bottom_k)].index] = -1
+    return signals
+
+
+def random_universe(n_syms=12, n_bars=80, seed=3):
+    rng   = np.random.default_rng(seed)
+    dates = pd.date_range("2020-01-01", periods=n_bars)
+    # rounded prices create plenty of tied returns; one late starter adds NaNs
+    data = {
+        f"S{i}": pd.DataFrame({"Close": np.round(50 + np.cumsum(rng.integers(-2, 3, n_bars)), 0)}, index=dates)
+        for i in range(n_syms)
+    }
+    data["LATE"] = data["S0"].iloc[30:] * 2
+    return data
+
+
+@pytest.mark.parametrize("lookback,top_k,bottom_k", [(1, 1, 1), (5, 3, 2), (10, 4, 4), (3, 7, 7), (2, 0, 3)])
+def test_batched_ranking_matches_reference_loop(lookback, top_k, bottom_k):
+    data  = random_universe()
+    strat = MomentumStrategy(lookback=lookback, top_k=top_k, bottom_k=bottom_k)
+    pd.testing.assert_frame_equal(strat.generate_signals(data), reference_signals(strat, data))
+
+
+def test_generate_signals_batch_over_lookbacks():
+    data  = random_universe()
+    strat = MomentumStrategy(top_k=2, bottom_k=2)
+    batch = strat.generate_signals_batch(data, [1, 5, 20])
+    assert list(batch) == [1, 5, 20]
+    for lb, signals in batch.items():
+        expected = MomentumStrategy(lookback=lb, top_k=2, bottom_k=2).generate_signals(data)
+        pd.testing.assert_frame_equal(signals, expected)
@@ -15,4 +15,31 @@ def test_pairs_trading_signals():
     )
     signals = strat.generate_signals({"X": df_x, "Y": df_y})
     # Identical series are never beyond entry threshold
-    assert (signals == 0).all().all()
\ No newline at end of file
+    assert (signals == 0).all().all()
+
+def test_online_update_matches_batch_fit():
+    rng   = np.random.default_rng(7)
+    dates = pd.date_range("2020-01-01", periods=400)
+    y = 50 + np.cumsum(rng.normal(size=400))
+    x = 1.5 * y + rng.normal(scale=2.0, size=400)
+    data  = {"X": pd.DataFrame({"Close": x}, index=dates), "Y": pd.DataFrame({"Close": y}, index=dates)}
+    strat = PairsTradingStrategy("X", "Y", lookback=20, z_entry=1.5, z_exit=0.5)
+    batch = strat.generate_signals(data)
+
+    online = PairsTradingStrategy("X", "Y", lookback=20, z_entry=1.5, z_exit=0.5)
+    zs, sigs = [], []
+    for px, py in zip(x, y):
+        z, sig = online.update(px, py)
+        zs.append(z)
+        sigs.append([sig["X"], sig["Y"]])
+
+    np.testing.assert_allclose(zs, strat.zscore.to_numpy(), rtol=1e-7, atol=1e-9)
+    assert (np.array(sigs) == batch.to_numpy()).all()
+    assert (batch != 0).any().any()
+
+
+def test_online_identical_series_never_signal():
+    strat = PairsTradingStrategy("X", "Y", lookback=5)
+    for v in range(1, 30):
+        z, sig = strat.update(float(v), float(v))
+        assert sig == {"X": 0, "Y": 0}
@@ -0,0 +1,72 @@
+# tests/test_performance_accumulator.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.performance import (PerformanceAccumulator, annualize_rets, annualize_vol,
+                               calculate_sharpe_ratio, calculate_drawdown, compound,
+                               skewness, kurtosis)
+
+
+def make_returns(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.standard_t(5, n) * 0.01 + 0.0003)
+
+
+def assert_matches_batch(acc, r, rf=0.0, ppy=252):
+    assert acc.n == len(r)
+    assert acc.compound()       == pytest.approx(compound(r), rel=1e-10)
+    assert acc.annualize_rets() == pytest.approx(annualize_rets(r, ppy), rel=1e-10)
+    assert acc.annualize_vol()  == pytest.approx(annualize_vol(r, ppy), rel=1e-10)
+    assert acc.sharpe_ratio()   == pytest.approx(calculate_sharpe_ratio(r, rf, ppy), rel=1e-10)
+    assert acc.skewness()       == pytest.approx(skewness(r), rel=1e-8)
+    assert acc.kurtosis()       == pytest.approx(kurtosis(r), rel=1e-10)
+    assert acc.max_drawdown()   == pytest.approx(calculate_drawdown(r)["Drawdown"].min(), rel=1e-10)
+
+
+def test_single_pass_matches_batch_functions():
+    r = make_returns()
+    assert_matches_batch(PerformanceAccumulator().update(r), r)
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 500])
+def test_chunked_updates_match_single_pass(chunk):
+    r   = make_returns(n=600, seed=1)
+    acc = PerformanceAccumulator(periods_per_year=52, riskfree_rate=0.02)
+    for start in range(0, len(r), chunk):
+        acc.update(r.iloc[start:start + chunk])
+    assert_matches_batch(acc, r, rf=0.02, ppy=52)
+
+
+def test_merge_of_parallel_chunks():
+    r      = make_returns(n=3000, seed=2)
+    parts  = [PerformanceAccumulator().update(part) for part in np.array_split(r.to_numpy(), 5)]
+    merged = PerformanceAccumulator()
+    for part in parts:
+        merged.merge(part)
+    assert_matches_batch(merged, r)
+
+
+def test_drawdown_spanning_chunks():
+    r = pd.Series([0.10, 0.05, -0.20, -0.10, 0.30, -0.05])
+    a = PerformanceAccumulator().update(r[:2])
+    b = PerformanceAccumulator().update(r[2:])
+    # peak after +10%, +5%; trough after −20%, −10% in the second chunk
+    assert a.merge(b).max_drawdown() == pytest.approx(0.8 * 0.9 - 1)
+
+
+def test_equity_values_count_the_first_point_as_a_peak():
+    equity = pd.Series([100, 120, 110, 130, 90, 95.0])
+    acc = PerformanceAccumulator()
+    acc.update_equity(equity[:3]).update_equity(equity[3:])
+    assert acc.max_drawdown()     == pytest.approx((90 - 130) / 130)
+    assert acc.current_drawdown() == pytest.approx((95 - 130) / 130)
+    assert acc.compound()         == pytest.approx(95 / 100 - 1)
+
+    falling = PerformanceAccumulator().update_equity([100, 80, 90])
+    assert falling.max_drawdown() == pytest.approx(-0.2)
+
+
+def test_merge_rejects_mismatched_settings():
+    with pytest.raises(ValueError):
+        PerformanceAccumulator(252).merge(PerformanceAccumulator(12))
@@ -27,54 +27,52 @@ def test_empty_cash_history():
     p = Portfolio(initial_capital=1000)
     hist = p.cash_history()
     assert isinstance(hist, pd.DataFrame)
-    assert hist.empty, "cash_history should be empty when no _record has been invoked"
+    assert hist.empty, "cash_history should be empty when no snapshot has been taken"
 
 
 def test_manual_history_and_cash_history_alignment():
     """
-    Manually populate _history with known (timestamp, cash, total)
-    triples and confirm that cash_history() returns exactly that as a DataFrame with
-    proper index and columns.
+    Take snapshots at known (timestamp, cash, total) points and confirm that
+    cash_history() returns exactly those as a DataFrame with proper index and columns.
     """
     p = Portfolio(initial_capital=1000)
 
-    # Build a fake history list: [(timestamp, cash, total), ...]
-    manual = [
-        (pd.Timestamp("2021-01-01"), 1000.0, 1000.0),
-        (pd.Timestamp("2021-01-02"),  900.0, 1000.0),
-        (pd.Timestamp("2021-01-03"),  900.0, 1100.0),
-        (pd.Timestamp("2021-01-04"), 1100.0, 1100.0),
-    ]
-    p._history = manual.copy()
+    p.snapshot(pd.Timestamp("2021-01-01"), {})
+    p.buy("XYZ", 1, price=100.0, commission=0.0)
+    p.snapshot(pd.Timestamp("2021-01-02"), {"XYZ": 100.0})
+    p.snapshot(pd.Timestamp("2021-01-03"), {"XYZ": 200.0})
+    p.sell("XYZ", 1, price=200.0, commission=0.0)
+    p.snapshot(pd.Timestamp("2021-01-04"), {"XYZ": 200.0})
 
     hist_df = p.cash_history()
 
     # Build expected DataFrame
     expected_df = pd.DataFrame(
         {
-            "cash":  [1000.0,  900.0,  900.0, 1100.0],
-            "total": [1000.0, 1000.0, 1100.0, 1100.0],
+            "cash":         [1000.0,  900.0,  900.0, 1100.0],
+            "total_equity": [1000.0, 1000.0, 1100.0, 1100.0],
         },
         index=pd.to_datetime([
             "2021-01-01",
             "2021-01-02",
             "2021-01-03",
             "2021-01-04",
-        ])
+        ]).rename("timestamp")
     )
 
     pd.testing.assert_frame_equal(
         hist_df.sort_index(),
         expected_df.sort_index(),
         check_dtype=False,
-        obj="cash_history() did not match the manually assigned _history"
+        obj="cash_history() did not match the recorded snapshots"
     )
 
 
 def test_record_invoked_during_buy_and_sell():
     """
-    Simulate a simple sequence of trades and manually invoke _record(...) at those timestamps.
-    Check that after buy-sell, cash_history() shows correct cash and total.
+    Simulate a simple sequence of trades with timestamps: buy()/sell() record a
+    snapshot themselves, priced at the fill. Check that after buy-sell,
+    cash_history() shows correct cash and total.
     """
     p = Portfolio(initial_capital=1000)
 
@@ -83,33 +81,25 @@ def test_record_invoked_during_buy_and_sell():
     # After this buy:
     #   cash = 1000 - 2*100 = 800
     #   position 'XYZ' = 2
-    # For a total value you need today's price, so we'll pretend price=100 when recording:
-    dt1 = pd.Timestamp("2021-02-01")
-    # Manually record a snapshot at dt1. In real code, buy() would have called _record(dt1).
-    # Here we do it explicitly, providing a price dict for value():
-    current_price = {"XYZ": 100.0}
-    total1 = p.value(current_price)  # should be 800 + 2*100 = 1000
-    p._history.append((dt1, p.cash, total1))
+    # The snapshot buy() took values the position at the fill price, 100:
+    total1 = p.value({"XYZ": 100.0})  # should be 800 + 2*100 = 1000
+    assert p.cash_history()["total_equity"].iloc[-1] == pytest.approx(total1)
 
     # 2) SELL 1 share of 'XYZ' at 120, no commission
     p.sell("XYZ", quantity=1, price=120.0, commission=0.0, timestamp=pd.Timestamp("2021-02-02"))
     # After this sell:
     #   cash = 800 + 1*120 = 920
     #   position 'XYZ' = 1
-    dt2 = pd.Timestamp("2021-02-02")
-    current_price = {"XYZ": 120.0}
-    total2 = p.value(current_price)  # should be 920 + 1*120 = 1040
-    p._history.append((dt2, p.cash, total2))
+    total2 = p.value({"XYZ": 120.0})  # should be 920 + 1*120 = 1040
+    assert p.cash_history()["total_equity"].iloc[-1] == pytest.approx(total2)
 
     # 3) SELL remaining 1 share of 'XYZ' at 110, no commission
     p.sell("XYZ", quantity=1, price=110.0, commission=0.0, timestamp=pd.Timestamp("2021-02-03"))
     # After this sell:
     #   cash = 920 + 1*110 = 1030
     #   positions empty
-    dt3 = pd.Timestamp("2021-02-03")
-    current_price = {"XYZ": 110.0}
-    total3 = p.value(current_price)  # should be 1030 + 0 = 1030
-    p._history.append((dt3, p.cash, total3))
+    total3 = p.value({"XYZ": 110.0})  # should be 1030 + 0 = 1030
+    assert p.cash_history()["total_equity"].iloc[-1] == pytest.approx(total3)
 
     # Now check the resulting history DataFrame:
     hist = p.cash_history()
@@ -117,19 +107,40 @@ def test_record_invoked_during_buy_and_sell():
     # Build what we expect:
     expected = pd.DataFrame(
         {
-            "cash":  [800.0,  920.0, 1030.0],
-            "total": [1000.0, 1040.0, 1030.0],
+            "cash":         [800.0,  920.0, 1030.0],
+            "total_equity": [1000.0, 1040.0, 1030.0],
         },
         index=pd.to_datetime([
             "2021-02-01",
             "2021-02-02",
             "2021-02-03",
-        ])
+        ]).rename("timestamp")
     )
 
     pd.testing.assert_frame_equal(
         hist.sort_index(),
         expected.sort_index(),
         check_dtype=False,
-        obj="After buy/sell and explicit _record, cash_history() is incorrect"
-    )
\ No newline at end of file
+        obj="After buy/sell with timestamps, cash_history() is incorrect"
+    )
+
+def test_history_buffers_wide_and_dict_views():
+    p = Portfolio(initial_capital=1000, capacity=1)   # force buffer growth
+    dates = pd.date_range("2021-03-01", periods=3)
+    p.buy("AAA", 2, price=10.0, commission=0.0)
+    p.snapshot(dates[0], {"AAA": 10.0})
+    p.buy("BBB", 1, price=50.0, commission=0.0)
+    p.snapshot(dates[1], {"AAA": 11.0, "BBB": 50.0})
+    p.sell("AAA", 2, price=12.0, commission=0.0)
+    p.snapshot(dates[2], {"AAA": 12.0, "BBB": 55.0})
+
+    hist = p.history()
+    assert list(hist.columns) == ["cash", "total_equity", "position_AAA", "position_BBB"]
+    assert list(hist["position_AAA"]) == [2, 2, 0]
+    assert list(hist["position_BBB"]) == [0, 1, 1]
+    assert list(hist.index) == list(dates)
+
+    dict_hist = p.history(positions="dict")
+    assert list(dict_hist["positions"]) == [{"AAA": 2}, {"AAA": 2, "BBB": 1}, {"BBB": 1}]
+    assert dict_hist["cash"].iloc[-1] == pytest.approx(1000 - 20 - 50 + 24)
+    assert list(hist["total_equity"]) == pytest.approx([1000, 1002, 1009])
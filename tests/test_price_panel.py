@@ -0,0 +1,205 @@
+# tests/test_price_panel.py
+
+import mmap
+import pickle
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from engine.price_panel import PricePanel
+from strategies.momentum_strategy import MomentumStrategy
+from strategies.strategy_template import MovingAverageCrossoverStrategy
+from utils.backtester import Backtester
+from conftest import FixedSignalStrategy, make_panel
+
+
+class RecordingStrategy(FixedSignalStrategy):
+    """FixedSignalStrategy that keeps what the backtester handed it."""
+    def generate_signals(self, multi_data):
+        self.seen = multi_data
+        return self.signals
+
+
+def wide_closes(n_bars=50_000, symbols=("A", "B", "C", "D"), seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, len(symbols))), axis=0)),
+                        index=pd.date_range("2020-01-01", periods=n_bars, freq="min"),
+                        columns=list(symbols))
+
+
+def maps_file(array) -> bool:
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_from_frame_is_a_read_only_view():
+    closes = wide_closes(1_000)
+    panel  = PricePanel.from_frame(closes)
+
+    assert panel.shape == closes.shape and panel.symbols == list(closes.columns)
+    assert np.shares_memory(panel.array, closes.to_numpy())
+    assert np.shares_memory(panel["B"]["Close"].to_numpy(), closes.to_numpy())
+    assert np.shares_memory(panel.to_frame().to_numpy(), closes.to_numpy())
+    pdt.assert_series_equal(panel.close("C"), closes["C"], check_exact=True)
+
+    with pytest.raises(ValueError, match="read-only"):
+        panel["A"].iloc[0, 0] = 0.0
+    with pytest.raises(ValueError, match="read-only"):
+        panel.array[0, 0] = 0.0
+    # the caller's frame stays writable
+    closes.iloc[0, 0] = 1.0
+
+
+def test_from_data_validates_once():
+    dates = pd.date_range("2021-01-01", periods=5)
+    with pytest.raises(KeyError, match="Close"):
+        PricePanel.from_data({"A": pd.DataFrame({"Open": range(5)}, index=dates)})
+    with pytest.raises(TypeError, match="numeric"):
+        PricePanel.from_data(pd.Series(list("abcde"), index=dates), "A")
+    with pytest.raises(ValueError, match="Duplicate timestamps"):
+        PricePanel.from_data(pd.Series(1.0, index=dates[[0, 1, 1, 2, 3]]), "A")
+    with pytest.raises(ValueError, match="symbol"):
+        PricePanel.from_data(pd.Series(1.0, index=dates))
+
+    panel = PricePanel.from_data(pd.Series([3, 1, 2], index=dates[[2, 0, 1]]), "A")
+    assert list(panel.index) == list(dates[:3])
+    assert panel.array[:, 0].tolist() == [1.0, 2.0, 3.0]
+    assert PricePanel.from_data(panel) is panel
+
+
+def test_misaligned_symbols_keep_their_own_rows():
+    dates = pd.date_range("2021-01-01", periods=6)
+    data  = {
+        "A": pd.Series([1.0, 2, 3, 4, 5], index=dates[:5]),
+        "B": pd.DataFrame({"Close": [10.0, 11, 12, 13]}, index=dates[[1, 2, 4, 5]]),
+    }
+    panel = PricePanel.from_data(data)
+
+    assert not panel.aligned
+    assert list(panel.index) == list(dates)
+    assert list(panel.common_index) == list(dates[[1, 2, 4]])
+    pdt.assert_series_equal(panel["B"]["Close"], data["B"]["Close"], check_exact=True, check_names=False)
+    pdt.assert_frame_equal(panel.to_frame(), pd.DataFrame({"A": data["A"], "B": data["B"]["Close"]}),
+                           check_exact=True)
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_panel_run_matches_per_symbol_frames(mode):
+    data, signals = make_panel(n_bars=200)
+    # drop a few bars of one symbol so the panel covers a union of dates
+    data["B"] = data["B"].drop(data["B"].index[[5, 50, 120]])
+
+    def run(frames):
+        bt = Backtester(FixedSignalStrategy(signals), ExecutionHandler(commission_per_trade=1.0),
+                        Portfolio(initial_capital=100_000), stop_loss_pct=0.03, execution_mode=mode)
+        if frames:
+            return bt._run_frames(Backtester._normalize_input(data, None))
+        return bt.run(data)
+
+    pdt.assert_frame_equal(run(frames=False), run(frames=True), check_exact=True)
+
+
+def test_strategies_get_views_of_the_input():
+    closes     = wide_closes(5_000)
+    _, signals = make_panel(n_bars=5_000, symbols=tuple(closes.columns))
+    signals.index = closes.index
+    panel    = PricePanel.from_frame(closes)
+    strategy = RecordingStrategy(signals)
+    Backtester(strategy, ExecutionHandler(), Portfolio(1_000_000), execution_mode="vectorized").run(panel)
+
+    assert strategy.seen is panel
+    for sym in closes.columns:
+        assert np.shares_memory(strategy.seen[sym]["Close"].to_numpy(), closes.to_numpy())
+
+    series = closes["A"].copy()
+    sig    = MovingAverageCrossoverStrategy(5, 20).generate_signals(PricePanel.from_data(series, "A"))
+    assert np.shares_memory(sig["Close"].to_numpy(), series.to_numpy())
+
+
+def test_input_data_is_never_duplicated():
+    closes = wide_closes()
+    size   = closes.to_numpy().nbytes
+
+    # wrapping an existing float64 block, viewing its symbols and the momentum
+    # panel allocates nothing proportional to the data
+    def wrap_and_view():
+        panel = PricePanel.from_frame(closes)
+        return panel, [panel[sym] for sym in panel], MomentumStrategy._price_panel(panel)
+    _, peak = peak_bytes(wrap_and_view)
+    assert peak < 0.01 * size
+
+    # separate per-symbol series are packed once: one copy, no temporaries
+    series = {sym: closes[sym].copy() for sym in closes.columns}
+    panel, peak = peak_bytes(lambda: PricePanel.from_data(series))
+    assert peak < 1.05 * size
+    pdt.assert_frame_equal(panel.to_frame(), closes, check_exact=True, check_freq=False)
+
+    # a single series is wrapped in place
+    _, peak = peak_bytes(lambda: PricePanel.from_data(series["A"], "A"))
+    assert peak < 0.01 * series["A"].nbytes
+
+
+def test_saved_panel_reopens_as_a_read_only_memmap(tmp_path):
+    closes = wide_closes(2_000)
+    panel  = PricePanel.from_frame(closes)
+    opened = PricePanel.open(panel.save(str(tmp_path / "panel")))
+
+    assert maps_file(opened.array)
+    assert not opened.array.flags.writeable
+    pdt.assert_frame_equal(opened.to_frame(), closes, check_exact=True, check_freq=False)
+
+    # pickling (e.g. to a pool worker) sends the path, not the closes
+    assert len(pickle.dumps(opened)) < 1_000
+    again = pickle.loads(pickle.dumps(opened))
+    assert again.path == opened.path
+    pdt.assert_frame_equal(again.to_frame(), opened.to_frame(), check_exact=True)
+
+
+def test_saved_panel_keeps_timezone_and_missing_bars(tmp_path):
+    idx   = pd.date_range("2021-03-01", periods=6, tz="America/New_York", name="ts")
+    panel = PricePanel.from_data({"A": pd.Series(np.arange(6.0), idx), "B": pd.Series([1.0, 2.0], idx[[1, 4]])})
+    opened = PricePanel.open(panel.save(str(tmp_path / "panel")))
+
+    assert opened.index.equals(panel.index) and opened.index.name == "ts"
+    np.testing.assert_array_equal(opened.present, panel.present)
+    pdt.assert_series_equal(opened.close("B"), panel.close("B"))
+
+
+def test_opening_a_panel_does_not_read_the_closes(tmp_path):
+    # memory taken by open() follows the bars (the index), not the universe
+    closes = wide_closes(n_bars=2_000, symbols=[f"S{i}" for i in range(1_000)])
+    path   = PricePanel.from_frame(closes).save(str(tmp_path / "panel"))
+    panel, peak = peak_bytes(lambda: PricePanel.open(path))
+    assert peak < 0.02 * closes.to_numpy().nbytes
+    assert panel.shape == closes.shape
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_backtest_on_opened_panel_matches_in_memory(tmp_path, mode):
+    data, signals = make_panel(n_bars=200)
+    data["B"] = data["B"].drop(data["B"].index[[5, 50]])
+    panel  = PricePanel.from_data(data)
+    opened = PricePanel.open(panel.save(str(tmp_path / "panel")))
+
+    def run(prices):
+        bt = Backtester(FixedSignalStrategy(signals), ExecutionHandler(commission_per_trade=1.0),
+                        Portfolio(initial_capital=100_000), stop_loss_pct=0.03, execution_mode=mode)
+        return bt.run(prices)
+
+    pdt.assert_frame_equal(run(opened), run(panel), check_exact=True, check_freq=False)
@@ -0,0 +1,152 @@
+# tests/test_price_store.py
+
+import pandas as pd
+import pytest
+from engine.data_handler import DataHandler
+from engine.multi_data_handler import MultiDataHandler
+from engine.price_store import PriceStore
+
+pytest.importorskip("pyarrow")
+
+
+def ohlcv(start, periods):
+    idx = pd.bdate_range(start, periods=periods)
+    close = pd.Series(range(1, periods + 1), index=idx, dtype=float)
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 100
+    })
+
+
+def test_write_partitions_by_year_and_reads_range(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    df = ohlcv("2019-12-20", 20)
+    store.write("AAA", df)
+
+    assert store.symbols() == ["AAA"]
+    assert (tmp_path / "AAA" / "2019.feather").exists()
+    assert (tmp_path / "AAA" / "2020.feather").exists()
+
+    out = store.read("AAA", "2019-12-30", "2020-01-03")
+    assert list(out.index) == list(df.loc["2019-12-30":"2020-01-02"].index)
+    pd.testing.assert_frame_equal(store.read("AAA"), df, check_names=False, check_freq=False)
+
+
+def test_missing_ranges_follow_coverage(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    store.write("AAA", ohlcv("2020-01-01", 5), start="2020-01-01", end="2020-02-01")
+    assert store.missing("AAA", "2020-01-10", "2020-01-20") == []
+    assert store.missing("AAA", "2019-12-01", "2020-03-01") == [
+        (pd.Timestamp("2019-12-01"), pd.Timestamp("2020-01-01")),
+        (pd.Timestamp("2020-02-01"), pd.Timestamp("2020-03-01")),
+    ]
+
+
+def test_import_csv_directory(tmp_path):
+    csv_dir = tmp_path / "csv"
+    csv_dir.mkdir()
+    ohlcv("2021-01-01", 3).to_csv(csv_dir / "AAA.csv")
+    ohlcv("2021-01-01", 4).to_csv(csv_dir / "BBB.csv")
+
+    store = PriceStore(root=str(tmp_path / "store"))
+    assert store.import_csv(str(csv_dir)) == ["AAA", "BBB"]
+    assert len(store.read("BBB")) == 4
+
+
+def test_tz_aware_import_then_missing(tmp_path):
+    csv = tmp_path / "AAA.csv"
+    df  = ohlcv("2021-01-04", 5)
+    df.index = df.index.tz_localize("America/New_York")
+    df.to_csv(csv)
+
+    store = PriceStore(root=str(tmp_path / "store"))
+    store.import_csv(str(csv))
+    # bars 2021-01-04..08 00:00 New York are 05:00 UTC; coverage runs a day past the last
+    assert store.coverage("AAA") == [(pd.Timestamp("2021-01-04 05:00"), pd.Timestamp("2021-01-09 05:00"))]
+    assert store.missing("AAA", "2021-01-05", "2021-01-08") == []
+    assert store.missing("AAA", pd.Timestamp("2021-01-01", tz="UTC"), "2021-01-06") == [
+        (pd.Timestamp("2021-01-01"), pd.Timestamp("2021-01-04 05:00"))
+    ]
+
+
+def test_data_handler_fetches_only_missing_range(tmp_path, monkeypatch):
+    store = PriceStore(root=str(tmp_path))
+    store.write("AAA", ohlcv("2020-01-01", 10), start="2020-01-01", end="2020-01-15")
+
+    calls = []
+    def fake_download(symbol, start, end):
+        calls.append((symbol, pd.Timestamp(start), pd.Timestamp(end)))
+        return ohlcv("2020-01-15", 5)
+    monkeypatch.setattr("engine.data_handler.yf.download", fake_download)
+
+    data = DataHandler("AAA", "2020-01-01", "2020-01-22", store=store).load_data()
+    assert calls == [("AAA", pd.Timestamp("2020-01-15"), pd.Timestamp("2020-01-22"))]
+    assert data.index.max() < pd.Timestamp("2020-01-22")
+
+    # second load is served from disk
+    DataHandler("AAA", "2020-01-01", "2020-01-22", store=store).load_data()
+    assert len(calls) == 1
+
+
+def test_multi_data_handler_offline_never_downloads(tmp_path, monkeypatch):
+    store = PriceStore(root=str(tmp_path), offline=True)
+    for sym in ["AAA", "BBB"]:
+        store.write(sym, ohlcv("2020-01-01", 10))
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("network access")
+    monkeypatch.setattr("engine.multi_data_handler.yf.download", no_network)
+
+    data = MultiDataHandler(["AAA", "BBB", "CCC"], "2020-01-01", "2020-02-01", store=store).load_data()
+    assert list(data) == ["AAA", "BBB", "CCC"]
+    assert len(data["AAA"]) == 10
+    assert data["CCC"].empty
+
+
+def test_failed_download_is_retried(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    replies = [{}, {"AAA": None}, {"AAA": ohlcv("2020-01-01", 5)}]
+    calls = []
+    def download(symbols, start, end):
+        calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        return replies[len(calls) - 1]
+
+    store.update("AAA", "2020-01-01", "2020-02-01", download)
+    store.update("AAA", "2020-01-01", "2020-02-01", download)
+    assert store.coverage("AAA") == []
+
+    store.update("AAA", "2020-01-01", "2020-02-01", download)
+    assert len(calls) == 3 and len(store.read("AAA")) == 5
+    assert store.missing("AAA", "2020-01-01", "2020-02-01") == []
+
+
+def test_ranges_without_bars_are_not_fetched_again(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    calls = []
+    def download(symbols, start, end):
+        calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        return {"AAA": ohlcv(start, 5)[:end - pd.Timedelta(days=1)]}
+
+    # 2020-01-04 is a Saturday: the last bar is Friday the 3rd
+    store.update("AAA", "2020-01-01", "2020-01-05", download)
+    store.update("AAA", "2020-01-01", "2020-01-05", download)
+    # a range with no bars at all (a weekend) is covered once fetched
+    store.update("AAA", "2020-01-11", "2020-01-13", lambda symbols, s, e: {"AAA": pd.DataFrame()})
+    store.update("AAA", "2020-01-11", "2020-01-13", download)
+    assert len(calls) == 1
+
+
+def test_data_handler_leaves_failed_tickers_uncovered(tmp_path, monkeypatch):
+    store = PriceStore(root=str(tmp_path))
+    monkeypatch.setattr("engine.data_handler.yf.download", lambda symbol, start, end: pd.DataFrame())
+    monkeypatch.setattr("engine.data_handler.failed_tickers", lambda: {"AAA"})
+    DataHandler("AAA", "2020-01-01", "2020-01-22", store=store).load_data()
+    assert store.coverage("AAA") == []
+
+
+def test_coverage_never_reaches_past_today(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    today = pd.Timestamp.today().normalize()
+    start = today - pd.Timedelta(days=10)
+    store.update("AAA", start, today + pd.Timedelta(days=30),
+                 lambda symbols, s, e: {"AAA": ohlcv(start, 20)})
+    assert store.coverage("AAA")[-1][1] <= today
@@ -0,0 +1,71 @@
+# tests/test_profiling.py
+
+import json
+import pstats
+
+import pandas as pd
+import pytest
+from utils.profiling import RunProfiler, NULL_PROFILER
+from conftest import make_backtester, make_panel
+
+SETTINGS = {"slippage": 0.0, "stop_loss_pct": 0.03, "take_profit_pct": 0.05}
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_run_profiled_matches_run_and_reports_phases(mode):
+    data, signals = make_panel(n_bars=120, symbols=("A", "B", "C"))
+    plain = make_backtester(signals, execution_mode=mode, **SETTINGS).run(data)
+    bt    = make_backtester(signals, execution_mode=mode, **SETTINGS)
+    hist, prof = bt.run_profiled(data)
+
+    pd.testing.assert_frame_equal(hist, plain)
+    assert bt.profiler is NULL_PROFILER
+
+    phases = prof.report()["phases"]
+    for path in ("run", "run/normalize_input", "run/generate_signals", "run/apply_trades",
+                 "run/apply_trades/align", "run/apply_trades/history"):
+        assert path in phases
+        assert phases[path]["wall_s"] >= 0 and phases[path]["calls"] == 1
+    children = sum(v["wall_s"] for k, v in phases.items() if k.count("/") == 1)
+    assert children <= phases["run"]["wall_s"]
+
+    counters = prof.report()["counters"]
+    assert counters["bars"] == 120 and counters["symbols"] == 3
+    assert counters["orders_buy"] + counters["orders_sell"] == len(bt.exec_h.trades)
+    assert counters["stop_loss_exits"] + counters["take_profit_exits"] > 0
+
+
+def test_stop_counters_agree_between_modes():
+    data, signals = make_panel(n_bars=200, symbols=("A", "B"))
+    _, loop_prof = make_backtester(signals, execution_mode="loop", **SETTINGS).run_profiled(data)
+    _, vec_prof  = make_backtester(signals, execution_mode="vectorized", **SETTINGS).run_profiled(data)
+    assert loop_prof.counters == vec_prof.counters
+
+
+def test_loop_reports_per_bar_slices():
+    data, signals = make_panel(n_bars=50, symbols=("A",))
+    _, prof = make_backtester(signals, execution_mode="loop", **SETTINGS).run_profiled(data)
+    frame = prof.to_frame()
+    assert frame.loc["run/apply_trades/bars/stop_checks", "calls"] == 50
+    assert "run/apply_trades/bars/snapshot" in frame.index
+
+
+def test_allocations_chrome_trace_and_cprofile(tmp_path):
+    data, signals = make_panel(n_bars=60, symbols=("A", "B"))
+    _, prof = make_backtester(signals, execution_mode="vectorized", **SETTINGS).run_profiled(data, track_allocations=True, cprofile=True)
+
+    phases = prof.report()["phases"]
+    assert phases["run"]["alloc_peak_bytes"] >= phases["run/apply_trades"]["alloc_peak_bytes"] > 0
+
+    trace = json.loads(json.dumps(prof.to_chrome_trace(tmp_path / "trace.json")))
+    assert json.loads((tmp_path / "trace.json").read_text()) == trace
+    names = {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert {"run", "generate_signals", "replay_orders"} <= names
+
+    prof.dump_stats(tmp_path / "run.prof")
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+
+def test_stats_requires_cprofile():
+    with pytest.raises(RuntimeError):
+        RunProfiler().stats()
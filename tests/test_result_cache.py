@@ -0,0 +1,122 @@
+# tests/test_result_cache.py
+
+import os
+import time
+
+import pandas.testing as pdt
+import pytest
+from strategies.buy_and_hold_strategy import BuyAndHoldStrategy
+from strategies.momentum_strategy import MomentumStrategy
+from strategies.pairs_strategy import PairsTradingStrategy
+from strategies.strategy_template import MovingAverageCrossoverStrategy
+from utils.benchmark import compare_strategies
+from utils.result_cache import ResultCache
+from conftest import make_backtester, make_prices
+
+
+class CountingMomentum(MomentumStrategy):
+    calls = 0
+
+    def generate_signals(self, multi_data):
+        CountingMomentum.calls += 1
+        return super().generate_signals(multi_data)
+
+
+def cached_backtester(cache, lookback=10, **kwargs):
+    """Backtester of a CountingMomentum(lookback) reading and filling `cache`."""
+    return make_backtester(CountingMomentum(lookback=lookback, top_k=1, bottom_k=1),
+                           stop_loss_pct=0.02, result_cache=cache, **kwargs)
+
+
+def test_rerun_is_served_from_the_cache(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    data  = make_prices()
+    first = cached_backtester(cache)
+    expected = first.run(data)
+
+    CountingMomentum.calls = 0
+    again   = cached_backtester(cache)
+    history = again.run(data)
+    assert CountingMomentum.calls == 0
+    pdt.assert_frame_equal(history, expected, check_exact=True)
+    assert list(again.exec_h.trades) == list(first.exec_h.trades)
+    assert again.portfolio.cash == first.portfolio.cash
+    pdt.assert_frame_equal(again.portfolio.history(), first.portfolio.history())
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5 and stats["saved_seconds"] > 0
+
+
+def test_rerun_of_a_fitted_strategy_hits(tmp_path):
+    # fit() leaves ratio/zscore on the strategy; they must not enter the key
+    cache    = ResultCache(str(tmp_path))
+    data     = make_prices()
+    strategy = PairsTradingStrategy("A", "B", lookback=20)
+    run = lambda: make_backtester(strategy, result_cache=cache).run(data)
+    expected = run()
+    pdt.assert_frame_equal(run(), expected)
+    pdt.assert_frame_equal(run(), expected)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+@pytest.mark.parametrize("change", [
+    {"lookback": 20},
+    {"commission": 2.0},
+    {"qty_per_trade": 5},
+    {"take_profit_pct": 0.05},
+])
+def test_any_input_change_misses(tmp_path, change):
+    cache = ResultCache(str(tmp_path))
+    data  = make_prices()
+    cached_backtester(cache).run(data)
+    cached_backtester(cache, **change).run(data)
+
+    prices = dict(data)
+    prices["A"] = prices["A"] * 1.0001
+    cached_backtester(cache).run(prices)
+    assert cache.hits == 0 and cache.misses == 3
+
+
+def test_compare_strategies_metrics_are_cached(tmp_path):
+    cache  = ResultCache(str(tmp_path))
+    prices = make_prices(n_bars=100, symbols=("SYM",))["SYM"]["Close"]
+    strategies = lambda window: {"buy_hold": BuyAndHoldStrategy(),
+                                 "ma_cross": MovingAverageCrossoverStrategy(short_window=5, long_window=window)}
+
+    fresh = compare_strategies(prices, strategies(20), "SYM", cache=cache)
+    pdt.assert_frame_equal(compare_strategies(prices, strategies(20), "SYM", cache=cache), fresh)
+    compare_strategies(prices, strategies(30), "SYM", cache=cache)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10**9)
+    blob  = b"x" * 10_000
+    for key in "abc":
+        cache.put(key, blob)
+        time.sleep(0.01)
+    size = os.path.getsize(os.path.join(str(tmp_path), "a.pkl"))
+
+    cache.get("a")                 # "b" is now the least recently used
+    cache.max_bytes = 3 * size
+    cache.put("d", blob)
+    assert "b" not in cache and all(key in cache for key in "acd")
+    assert cache.nbytes <= cache.max_bytes
+
+    cache.put("huge", b"x" * (4 * size))
+    assert "huge" not in cache
+
+
+def test_invalidate_and_clear(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    data  = make_prices()
+    bt    = cached_backtester(cache)
+    key   = bt.cache_key(data)
+    bt.run(data)
+    assert key in cache
+
+    assert cache.invalidate(key) and not cache.invalidate(key)
+    cached_backtester(cache).run(data)
+    cache.clear()
+    assert len(cache) == 0 and cache.get(key) is None
@@ -1,12 +1,138 @@
 # tests/test_risk.py
 
+import numpy as np
 import pandas as pd
 import pytest
-from utils.risk import historical_var, expected_shortfall
+from scipy.stats import norm
+from utils.risk import (historical_var, expected_shortfall, normal_quantile, parametric_var, parametric_es,
+                        var_gaussian, _tail_mean, rolling_parametric_var, rolling_parametric_es,
+                        var_historic, cvar_historic, RollingTailRisk, rolling_tail_risk, expanding_tail_risk)
 
 def test_var_es():
     returns = pd.Series([0.01, -0.02, 0.03, -0.04, 0.05])
     var = historical_var(returns, level=0.05)
     assert var >= 0
     es = expected_shortfall(returns, level=0.05)
-    assert es >= var
\ No newline at end of file
+    assert es >= var
+
+
+def make_returns(n=600, cols=("A", "B", "C"), seed=1):
+    rng = np.random.default_rng(seed)
+    data = rng.standard_t(4, size=(n, len(cols))) * 0.01 + 0.0005
+    return pd.DataFrame(data, index=pd.date_range("2020-01-01", periods=n), columns=list(cols))
+
+
+def test_normal_quantile_matches_scipy():
+    for p in (0.001, 0.01, 0.05, 0.5, 0.99):
+        assert normal_quantile(p) == pytest.approx(norm.ppf(p), abs=1e-12)
+
+
+def test_parametric_var_is_deterministic_and_positive_for_losses():
+    r = make_returns()["A"]
+    assert parametric_var(r) == parametric_var(r)
+    assert parametric_var(r) == pytest.approx(-(r.mean() + norm.ppf(0.05) * r.std()))
+    assert parametric_var(r) > 0
+
+
+@pytest.mark.parametrize("level, modified, expected", [
+    (5, False, 0.023906372085828183),
+    (5, True,  0.01487475910064465),
+    (1, False, 0.033986354052392934),
+    (1, True,  0.05167249727901779),
+])
+def test_var_gaussian_matches_original_values(level, modified, expected):
+    # values from the original var_gaussian (z-score, population std, Cornish-Fisher)
+    r = make_returns()["B"]
+    assert var_gaussian(r, level=level, modified=modified) == pytest.approx(expected, rel=1e-12)
+
+
+def test_var_gaussian_dataframe_matches_original_values():
+    out = var_gaussian(make_returns(), modified=True)
+    assert out.to_dict() == pytest.approx(
+        {"A": 0.022403155246459965, "B": 0.014874759100644641, "C": 0.025095523089344957}, rel=1e-12)
+
+
+@pytest.mark.parametrize("fn", [parametric_var, parametric_es])
+@pytest.mark.parametrize("modified", [False, True])
+def test_dataframe_is_columnwise(fn, modified):
+    df  = make_returns()
+    out = fn(df, modified=modified)
+    assert list(out.index) == list(df.columns)
+    for col in df.columns:
+        assert out[col] == pytest.approx(fn(df[col], modified=modified))
+
+
+def test_parametric_es_matches_numerical_tail():
+    r = make_returns()["C"]
+    mu, sigma = r.mean(), r.std()
+    z = np.linspace(-12, norm.ppf(0.05), 200_001)
+    tail = np.trapezoid(z * norm.pdf(z), z) / 0.05
+    assert parametric_es(r) == pytest.approx(-(mu + sigma * tail), rel=1e-6)
+    assert parametric_es(r) > parametric_var(r)
+
+    s, k = 0.4, 5.0
+    zc = z + (z**2 - 1)*s/6 + (z**3 - 3*z)*(k-3)/24 - (2*z**3 - 5*z)*(s**2)/36
+    assert _tail_mean(norm.ppf(0.05), 0.05, s, k) == pytest.approx(
+        np.trapezoid(zc * norm.pdf(z), z) / 0.05, rel=1e-6)
+
+
+@pytest.mark.parametrize("modified", [False, True])
+def test_rolling_matches_per_window(modified):
+    df, window = make_returns(n=300), 60
+    var_roll = rolling_parametric_var(df, window, modified=modified)
+    es_roll  = rolling_parametric_es(df, window, modified=modified)
+    assert var_roll.iloc[:window - 1].isna().all().all()
+    for end in (window, 150, 300):
+        chunk = df.iloc[end - window:end]
+        pd.testing.assert_series_equal(var_roll.iloc[end - 1], parametric_var(chunk, modified=modified),
+                                       check_names=False, rtol=1e-8)
+        pd.testing.assert_series_equal(es_roll.iloc[end - 1], parametric_es(chunk, modified=modified),
+                                       check_names=False, rtol=1e-8)
+
+
+@pytest.mark.parametrize("window", [1, 7, 60])
+def test_rolling_tail_risk_matches_per_window(window):
+    df = make_returns(n=200)
+    var, es = rolling_tail_risk(df, window)
+    assert var.iloc[:window - 1].isna().all().all()
+    for end in range(window, 201, 13):
+        chunk = df.iloc[end - window:end]
+        for col in df.columns:
+            assert var[col].iloc[end - 1] == historical_var(chunk[col])
+            assert es[col].iloc[end - 1] == pytest.approx(expected_shortfall(chunk[col]), rel=1e-12)
+
+
+def test_expanding_tail_risk_matches_history_so_far():
+    r = make_returns(n=300)["A"]
+    var, es = expanding_tail_risk(r, level=0.01)
+    for end in (1, 2, 50, 299, 300):
+        assert var.iloc[end - 1] == historical_var(r.iloc[:end], level=0.01)
+        assert es.iloc[end - 1] == pytest.approx(expected_shortfall(r.iloc[:end], level=0.01))
+
+
+def test_rolling_tail_risk_nan_windows():
+    df = make_returns(n=40, cols=("A", "B"))
+    df.iloc[10, 0] = np.nan
+    var, _ = rolling_tail_risk(df, 5)
+    assert var["A"].iloc[10:15].isna().all()
+    assert var["A"].iloc[15] == historical_var(df["A"].iloc[11:16])
+    assert var["B"].iloc[4:].notna().all()
+
+
+def test_incremental_update_matches_batch():
+    df = make_returns(n=120)
+    batch_var, batch_es = rolling_tail_risk(df, 30)
+    engine = RollingTailRisk(df.columns, window=30)
+    engine.run(df.iloc[:100])
+    for i in range(100, 120):
+        var, es = engine.update(df.iloc[i])
+        pd.testing.assert_series_equal(var, batch_var.iloc[i], check_names=False)
+        pd.testing.assert_series_equal(es, batch_es.iloc[i], check_names=False)
+
+
+def test_var_historic_dataframe_matches_columns():
+    df = make_returns()
+    var, cvar = var_historic(df), cvar_historic(df)
+    for col in df.columns:
+        assert var[col] == var_historic(df[col])
+        assert cvar[col] == pytest.approx(cvar_historic(df[col]))
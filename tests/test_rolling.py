@@ -0,0 +1,90 @@
+# tests/test_rolling.py
+
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from utils.rolling import RollingWindow
+
+
+def test_rolling_window_matches_pandas():
+    rng    = np.random.default_rng(0)
+    values = 100 + np.cumsum(rng.normal(size=500))
+    values[[40, 41, 200]] = np.nan
+    expected_mean = pd.Series(values).rolling(20).mean().to_numpy()
+    expected_std  = pd.Series(values).rolling(20).std().to_numpy()
+
+    win = RollingWindow(20, resync_every=97)
+    means, stds = [], []
+    for v in values:
+        win.push(v)
+        means.append(win.mean())
+        stds.append(win.std())
+
+    np.testing.assert_allclose(means, expected_mean, rtol=1e-10)
+    np.testing.assert_allclose(stds, expected_std, rtol=1e-8)
+
+
+def test_constant_window_has_exact_mean_and_zero_variance():
+    win = RollingWindow(3)
+    for v in [0.1, 0.1, 0.1]:
+        win.push(v)
+    assert win.mean() == 0.1
+    assert win.var() == 0.0
+
+
+def test_memory_is_constant():
+    win = RollingWindow(5)
+    for v in range(10_000):
+        win.push(v)
+    assert len(win._buf) == 5
+    assert win.mean() == pytest.approx(9997.0)
+
+
+from utils.rolling import SortedWindows, rolling_quantile_tail
+
+
+@pytest.mark.parametrize("size", [None, 1, 5, 32])
+def test_sorted_windows_track_sorted_values(size):
+    rng  = np.random.default_rng(3)
+    data = rng.integers(0, 6, size=(200, 4)).astype(float)   # plenty of ties
+    win  = SortedWindows(4, size, capacity=2)
+    for i in range(len(data)):
+        win.push(data[i])
+        start = 0 if size is None else max(0, i + 1 - size)
+        expected = np.sort(data[start:i + 1], axis=0).T
+        np.testing.assert_array_equal(win.values(), expected)
+        np.testing.assert_array_equal(win.quantile(0.3), np.quantile(data[start:i + 1], 0.3, axis=0))
+
+
+@pytest.mark.parametrize("size", [None, 1, 4, 25])
+def test_rolling_quantile_tail_matches_sorted_windows(size):
+    rng  = np.random.default_rng(4)
+    data = rng.integers(-3, 4, size=(120, 3)).astype(float)
+    data[30, 1] = np.nan
+    quant, tail = rolling_quantile_tail(data, size, q=0.2)
+
+    win = SortedWindows(3, size)
+    for i in range(len(data)):
+        win.push(data[i])
+        if not win.ready:
+            assert np.isnan(quant[i]).all()
+            continue
+        cutoff = win.quantile(0.2)
+        masked = win.nan_count > 0
+        np.testing.assert_array_equal(quant[i], np.where(masked, np.nan, cutoff))
+        np.testing.assert_allclose(tail[i], np.where(masked, np.nan, win.tail_mean(cutoff)), rtol=1e-12)
+
+
+def test_sorted_windows_from_values_continues_like_pushes():
+    rng  = np.random.default_rng(5)
+    data = rng.normal(size=(50, 3))
+    for size in (None, 7):
+        pushed = SortedWindows(3, size)
+        for row in data[:40]:
+            pushed.push(row)
+        seeded = SortedWindows.from_values(data[:40], size)
+        for row in data[40:]:
+            pushed.push(row)
+            seeded.push(row)
+            np.testing.assert_array_equal(seeded.values(), pushed.values())
@@ -0,0 +1,93 @@
+# tests/test_sinks.py
+
+import json
+import pickle
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.sinks import FileSink, FrameCollector, ReportSink
+from conftest import make_backtester, make_panel
+
+
+def sink_backtester(signals, **kwargs):
+    """Backtester of fixed `signals` whose trade log flushes every 7 trades."""
+    bt = make_backtester(signals, stop_loss_pct=0.02, **kwargs)
+    bt.exec_h.trades.batch_rows = 7
+    return bt
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_trades_stream_to_csv_in_batches(tmp_path, mode):
+    data, signals = make_panel(n_bars=300)
+    reference = sink_backtester(signals, execution_mode=mode)
+    reference.run(data)
+    expected = reference.exec_h.trades.to_frame()
+
+    path = str(tmp_path / "trade_log.csv")
+    with FileSink(path) as sink:
+        bt = sink_backtester(signals, trade_sink=sink, execution_mode=mode)
+        bt.run(data)
+    # nothing is left behind in memory once the run returns
+    assert len(bt.exec_h.trades) == 0 and bt.exec_h.trades.total == len(expected)
+
+    written = pd.read_csv(path, parse_dates=["timestamp"])
+    expected = expected.assign(symbol=expected["symbol"].astype(str),
+                               order_type=expected["order_type"].astype(str))
+    pdt.assert_frame_equal(written, expected, check_dtype=False)
+    assert bt.portfolio.cash == reference.portfolio.cash
+
+
+@pytest.mark.parametrize("positions_format", ["wide", "dict"])
+def test_history_streams_to_parquet(tmp_path, positions_format):
+    pytest.importorskip("pyarrow")
+    data, signals = make_panel(n_bars=300)
+    expected = sink_backtester(signals, positions_format=positions_format).run(data).reset_index()
+
+    path = str(tmp_path / "history.parquet")
+    with FileSink(path) as sink:
+        bt = sink_backtester(signals, history_sink=sink, sink_every=64, positions_format=positions_format)
+        assert bt.run(data) is None
+    written = pd.read_parquet(path)
+    if positions_format == "dict":
+        written["positions"] = written["positions"].map(json.loads)
+    pdt.assert_frame_equal(written, expected, check_exact=True)
+
+    import pyarrow.parquet as pq
+    assert pq.ParquetFile(path).num_row_groups == 5
+
+
+def test_history_batches_follow_sink_every():
+    data, signals = make_panel(n_bars=130)
+    sink = FrameCollector()
+    sink_backtester(signals, history_sink=sink, sink_every=50, execution_mode="vectorized").run(data)
+    assert [len(frame) for frame in sink.frames] == [50, 50, 30]
+
+
+def test_writer_errors_surface_in_the_caller(tmp_path):
+    sink = FileSink(str(tmp_path / "missing_dir" / "log.csv"))
+    sink.write(pd.DataFrame({"a": [1, 2]}))
+    with pytest.raises(OSError):
+        sink.flush()
+    sink.close()
+    with pytest.raises(ValueError):
+        sink.write(pd.DataFrame({"a": [1]}))
+
+
+def test_sink_is_not_pickled_with_the_trade_log(tmp_path):
+    path = str(tmp_path / "log.csv")
+    with FileSink(path) as sink:
+        exec_h = ExecutionHandler(trade_sink=sink)
+        exec_h.execute_order("BUY", "A", 1, 10.0, pd.Timestamp("2024-01-02"))
+        restored = pickle.loads(pickle.dumps(exec_h))
+        exec_h.trades.flush()
+    assert restored.trades.sink is None and len(restored.trades) == 1
+    assert len(pd.read_csv(path)) == 1
+
+
+def test_sink_without_write_fails_when_created():
+    class NoWrite(ReportSink):
+        pass
+    with pytest.raises(TypeError):
+        NoWrite()
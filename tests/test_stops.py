@@ -0,0 +1,93 @@
+# tests/test_stops.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from utils import stops
+from utils.backtester import Backtester
+from conftest import make_panel, run_mode
+
+# the numba kernel only runs (and is only checked) where numba is installed
+ENGINES = ["python", "rows",
+           pytest.param("numba", marks=pytest.mark.skipif(stops.numba is None, reason="numba not installed"))]
+
+
+def random_case(seed, n_bars=250, n_syms=4):
+    rng    = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_bars, n_syms)), axis=0))
+    prices[rng.random(prices.shape) < 0.02] = np.nan
+    prices[rng.random(prices.shape) < 0.01] = 0.0
+    signals = rng.integers(-1, 2, (n_bars, n_syms))
+    prev    = np.vstack([np.zeros((1, n_syms), dtype=np.int64), signals[:-1]])
+    buys, sells = (signals == 1) & (prev != 1), (signals == -1) & (prev != -1)
+    pos0     = rng.integers(0, 3, n_syms) * 10
+    last_px0 = np.where(rng.random(n_syms) < 0.3, np.nan, prices[0] * 1.01)
+    return prices, buys, sells, pos0, last_px0, signals
+
+
+def use_engine(monkeypatch, engine):
+    """Backtester stop_engine for `engine`; "rows" forces the whole-row NumPy walk."""
+    if engine == "rows":
+        monkeypatch.setattr(stops, "ROWS_MIN_SYMBOLS", 1)
+        return "python"
+    return engine
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("stop_loss_pct,take_profit_pct", [(0.02, None), (None, 0.03), (0.02, 0.03)])
+def test_kernels_agree_with_loop(monkeypatch, engine, seed, stop_loss_pct, take_profit_pct):
+    # NaN and zero closes included: a zero fill price means no entry price, so no stop check
+    prices, _, _, _, _, signals = random_case(seed)
+    dates   = pd.date_range("2020-01-01", periods=len(prices))
+    symbols = list("ABCD")
+    data    = {sym: pd.DataFrame({"Close": prices[:, j]}, index=dates) for j, sym in enumerate(symbols)}
+    signals = pd.DataFrame(signals, index=dates, columns=symbols)
+    kwargs  = {"stop_loss_pct": stop_loss_pct, "take_profit_pct": take_profit_pct}
+
+    hist_loop, exec_loop, port_loop = run_mode("loop", data, signals, **kwargs)
+    hist_vec,  exec_vec,  port_vec  = run_mode("vectorized", data, signals,
+                                               stop_engine=use_engine(monkeypatch, engine), **kwargs)
+    pd.testing.assert_frame_equal(hist_vec, hist_loop, check_exact=True)
+    pd.testing.assert_frame_equal(exec_vec.trades.to_frame(), exec_loop.trades.to_frame(), check_exact=True)
+    assert port_vec.positions == port_loop.positions
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_zero_entry_price_never_stops(monkeypatch, engine):
+    prices   = np.array([[0.0], [50.0], [200.0]])
+    no_fills = np.zeros((3, 1), dtype=bool)
+    kinds, pos_mid, _ = stops.simulate_stops(prices, no_fills, no_fills, [10], [0.0], 10, 0.0, 0.02, 0.05,
+                                             engine=use_engine(monkeypatch, engine))
+    assert (kinds == stops.NO_STOP).all() and (pos_mid == 10).all()
+
+
+def test_wide_panels_use_the_row_walk(monkeypatch):
+    prices, buys, sells, pos0, last_px0, _ = random_case(0, n_bars=30, n_syms=6)
+    monkeypatch.setattr(stops, "ROWS_MIN_SYMBOLS", 6)
+    monkeypatch.setattr(stops, "_stops_python", None)
+    kinds, _, _ = stops.simulate_stops(prices, buys, sells, pos0, last_px0, 10, 0.001, 0.02, engine="python")
+    assert kinds.shape == (30, 6)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_vectorized_with_stops_matches_loop(monkeypatch, engine):
+    data, signals = make_panel(n_bars=400)
+    kwargs = {"stop_loss_pct": 0.02, "take_profit_pct": 0.04}
+    hist_loop, exec_loop, port_loop = run_mode("loop", data, signals, **kwargs)
+    hist_vec,  exec_vec,  port_vec  = run_mode("vectorized", data, signals,
+                                               stop_engine=use_engine(monkeypatch, engine), **kwargs)
+
+    pd.testing.assert_frame_equal(hist_vec, hist_loop, check_exact=True)
+    assert exec_vec.trades == exec_loop.trades
+    assert port_vec.cash == port_loop.cash
+    assert port_vec.positions == port_loop.positions
+
+
+def test_unknown_stop_engine_rejected():
+    with pytest.raises(ValueError):
+        Backtester(None, ExecutionHandler(), Portfolio(1000), stop_engine="cuda")
+    with pytest.raises(ValueError):
+        stops.simulate_stops(np.ones((1, 1)), [[False]], [[False]], [0], [np.nan], 1, 0.0, engine="cuda")
@@ -0,0 +1,56 @@
+# tests/test_sweep.py
+
+import pandas as pd
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from engine.price_panel import PricePanel
+from strategies.momentum_strategy import MomentumStrategy
+from strategies.strategy_template import MovingAverageCrossoverStrategy
+from utils import sweep
+from utils.backtester import Backtester
+from utils.sweep import parameter_grid, run_sweep
+from conftest import make_prices
+
+
+def test_parameter_grid_is_cartesian_product():
+    grid = parameter_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(grid) == 6
+    assert grid[0] == {"a": 1, "b": "x"}
+    assert grid[-1] == {"a": 2, "b": "z"}
+
+
+def test_sweep_matches_sequential_backtests():
+    data = make_prices()
+    grid = {"lookback": [5, 10, 20], "top_k": [1, 2], "bottom_k": [1]}
+    table = run_sweep(MomentumStrategy, grid, data, n_jobs=2)
+
+    assert list(table.columns) == ["lookback", "top_k", "bottom_k", "final_equity", "sharpe", "max_drawdown"]
+    assert len(table) == 6
+    for _, row in table.iterrows():
+        strat = MomentumStrategy(lookback=int(row["lookback"]), top_k=int(row["top_k"]), bottom_k=1)
+        hist  = Backtester(strat, ExecutionHandler(), Portfolio(100000)).run(data)
+        assert row["final_equity"] == pytest.approx(hist["total_equity"].iloc[-1])
+        assert row["max_drawdown"] <= 0
+
+
+def test_sweep_single_symbol_moving_average():
+    prices = make_prices(symbols=("SYM",))["SYM"]["Close"]
+    grid   = {"short_window": [5, 10], "long_window": [20, 40]}
+    par    = run_sweep(MovingAverageCrossoverStrategy, grid, prices, symbol="SYM", n_jobs=2)
+    seq    = run_sweep(MovingAverageCrossoverStrategy, grid, prices, symbol="SYM", n_jobs=1)
+    pd.testing.assert_frame_equal(par, seq)
+    assert par["final_equity"].nunique() > 1
+
+
+def test_sweep_over_a_saved_panel_maps_its_file(tmp_path, monkeypatch):
+    data  = make_prices()
+    grid  = {"lookback": [5, 10], "top_k": [1, 2], "bottom_k": [1]}
+    panel = PricePanel.open(PricePanel.from_data(data).save(str(tmp_path / "panel")))
+
+    def no_shared_memory(*args, **kwargs):
+        raise AssertionError("a file-backed panel must not be copied to shared memory")
+    monkeypatch.setattr(sweep.shared_memory, "SharedMemory", no_shared_memory)
+
+    pd.testing.assert_frame_equal(run_sweep(MomentumStrategy, grid, panel, n_jobs=2),
+                                  run_sweep(MomentumStrategy, grid, data, n_jobs=1))
@@ -0,0 +1,61 @@
+# tests/test_trade.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from engine.trade import Trade, TradeLog
+
+
+def filled_log(n=5):
+    log = TradeLog(capacity=2)   # force a few resizes
+    for i in range(n):
+        log.record(pd.Timestamp("2021-01-01") + pd.Timedelta(days=i), "AAA" if i % 2 else "BBB",
+                   "BUY" if i % 3 else "SELL", 10, 100.0 + i, 1.0, 0.05)
+    return log
+
+
+def test_trade_uses_slots():
+    t = Trade(pd.Timestamp("2021-01-01"), "AAA", "BUY", 1, 1.0, 0.0, 0.0)
+    assert not hasattr(t, "__dict__")
+
+
+def test_log_iterates_as_trades():
+    log = filled_log()
+    assert len(log) == 5
+    assert log[0] == Trade(pd.Timestamp("2021-01-01"), "BBB", "SELL", 10, 100.0, 1.0, 0.05)
+    assert log[-1].price == pytest.approx(104.0)
+    assert [t.symbol for t in log] == ["BBB", "AAA", "BBB", "AAA", "BBB"]
+    assert next(reversed(log)) == log[4]
+    assert log[1:3] == [log[1], log[2]]
+    with pytest.raises(IndexError):
+        log[5]
+
+
+def test_append_accepts_trade_objects():
+    log = TradeLog()
+    trade = Trade(pd.Timestamp("2021-01-01"), "AAA", "BUY", 3, 10.0, 1.0, 0.0)
+    log.append(trade)
+    assert list(log) == [trade]
+
+
+def test_to_frame_is_zero_copy():
+    log   = filled_log()
+    frame = log.to_frame()
+    assert list(frame.columns) == ["timestamp", "symbol", "order_type", "quantity",
+                                   "price", "commission", "slippage"]
+    assert np.shares_memory(frame["price"].to_numpy(), log.column("price"))
+    assert list(frame["symbol"].cat.categories) == ["BBB", "AAA"]
+    assert frame["order_type"].iloc[0] == "SELL"
+
+
+def test_csv_and_parquet_roundtrip(tmp_path):
+    log = filled_log()
+    log.to_csv(tmp_path / "trades.csv")
+    csv = pd.read_csv(tmp_path / "trades.csv", parse_dates=["timestamp"])
+    assert list(csv["symbol"]) == [t.symbol for t in log]
+    assert list(csv["price"]) == [t.price for t in log]
+
+    pytest.importorskip("pyarrow")
+    log.to_parquet(tmp_path / "trades.parquet")
+    back = pd.read_parquet(tmp_path / "trades.parquet")
+    pd.testing.assert_frame_equal(back, log.to_frame(), check_categorical=False)
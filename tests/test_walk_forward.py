@@ -0,0 +1,81 @@
+# tests/test_walk_forward.py
+
+import pandas.testing as pdt
+import pytest
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from strategies.pairs_strategy import PairsTradingStrategy
+from strategies.strategy_template import MovingAverageCrossoverStrategy
+from utils.backtester import Backtester
+from utils.walk_forward import run_walk_forward, walk_forward_folds
+from conftest import FixedSignalStrategy, make_prices
+
+
+def test_folds_roll_and_anchor():
+    folds = walk_forward_folds(100, train=40, test=25)
+    assert [(f.start, f.stop, t.start, t.stop) for f, t in folds] == [
+        (0, 40, 40, 65), (25, 65, 65, 90), (50, 90, 90, 100),
+    ]
+    anchored = walk_forward_folds(100, train=40, test=25, anchored=True)
+    assert [f.start for f, _ in anchored] == [0, 0, 0]
+    assert [t for _, t in anchored] == [t for _, t in folds]
+
+    with pytest.raises(ValueError, match="overlap"):
+        walk_forward_folds(100, train=40, test=25, step=10)
+    assert walk_forward_folds(30, train=40, test=10) == []
+
+
+def ma_signals(data, short, long):
+    return MovingAverageCrossoverStrategy(short, long).generate_signals(data)[["signal"]].rename(
+        columns={"signal": "SYM"})
+
+
+@pytest.mark.parametrize("mode", ["loop", "vectorized"])
+def test_walk_forward_matches_manual_backtests(mode):
+    prices = make_prices(n_bars=400, symbols=("SYM",))["SYM"]["Close"]
+    grid   = {"short_window": [5, 10], "long_window": [20, 40]}
+    kwargs = {"backtester_kwargs": {"execution_mode": mode}, "execution_kwargs": {"commission_per_trade": 1.0}}
+    history, folds, scores = run_walk_forward(MovingAverageCrossoverStrategy, grid, prices, train=150,
+                                              test=50, symbol="SYM", n_jobs=1, **kwargs)
+
+    # in-sample: full-history signals traded on each train window
+    train_slices = [f for f, _ in walk_forward_folds(len(prices), 150, 50)]
+    for row in scores.itertuples():
+        signals = ma_signals(prices, row.short_window, row.long_window)
+        bt      = Backtester(FixedSignalStrategy(signals), ExecutionHandler(commission_per_trade=1.0),
+                             Portfolio(100000), execution_mode=mode)
+        equity  = bt.run(prices.iloc[train_slices[row.fold]], "SYM")["total_equity"]
+        assert row.final_equity == equity.iloc[-1]
+
+    # the winner of each fold has the best in-sample Sharpe
+    for fold in folds.itertuples():
+        assert fold.is_sharpe == scores[scores["fold"] == fold.Index]["sharpe"].max()
+
+    # out-of-sample segments chain into one curve over every test bar
+    assert history.index.equals(prices.index[150:])
+    assert folds["test_start"].tolist() == prices.index[[150, 200, 250, 300, 350]].tolist()
+
+
+def test_single_parameter_set_equals_one_continuous_run():
+    prices = make_prices(n_bars=300, symbols=("SYM",))["SYM"]["Close"]
+    history, folds, _ = run_walk_forward(MovingAverageCrossoverStrategy, [{"short_window": 5, "long_window": 30}],
+                                         prices, train=100, test=40, symbol="SYM", n_jobs=1)
+
+    signals  = ma_signals(prices, 5, 30)
+    expected = Backtester(FixedSignalStrategy(signals), ExecutionHandler(), Portfolio(100000),
+                          execution_mode="vectorized").run(prices.iloc[100:], "SYM")
+    pdt.assert_frame_equal(history, expected, check_exact=True)
+    assert (folds["param_set"] == 0).all()
+
+
+def test_parallel_pairs_matches_sequential():
+    data = make_prices(n_bars=300, symbols=("X", "Y"))
+    grid = {"lookback": [10, 20], "z_entry": [1.0, 1.5]}
+    kw   = dict(train=120, test=60, metric="final_equity",
+                strategy_kwargs={"symbol_x": "X", "symbol_y": "Y"})
+    par = run_walk_forward(PairsTradingStrategy, grid, data, n_jobs=2, **kw)
+    seq = run_walk_forward(PairsTradingStrategy, grid, data, n_jobs=1, **kw)
+    for a, b in zip(par, seq):
+        pdt.assert_frame_equal(a, b, check_exact=True)
+    assert len(par[1]) == 3 and len(par[2]) == 3 * 4
+    assert par[0]["total_equity"].notna().all()
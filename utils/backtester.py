@@ -1,6 +1,16 @@
+import os
+import time
+
 import pandas as pd
 import numpy as np
 
+from engine.price_panel import PricePanel
+from utils import checkpoint, stops
+from utils.profiling import NULL_PROFILER, RunProfiler
+from utils.result_cache import strategy_key
+
+EXECUTION_MODES = ("loop", "vectorized")
+
 class Backtester:
     def __init__(
         self,
@@ -10,136 +20,668 @@ class Backtester:
         qty_per_trade: int = 10,
         stop_loss_pct: float   = None,
         take_profit_pct: float = None,
+        execution_mode: str    = "loop",
+        positions_format: str  = "wide",
+        stop_engine: str       = "auto",
+        result_cache           = None,
+        history_sink           = None,
+        sink_every: int        = 10_000,
     ):
-        self.strategy        = strategy
-        self.exec_h          = exec_handler
-        self.portfolio       = portfolio
-        self.qty_per_trade   = qty_per_trade
-        self.stop_loss_pct   = stop_loss_pct
-        self.take_profit_pct = take_profit_pct
+        """
+        execution_mode:   "loop" walks the bars one by one with pandas lookups;
+                          "vectorized" aligns prices/signals into dense
+                          (bars × symbols) arrays first and produces the same history.
+        positions_format: "wide" (default) writes one integer 'position_<sym>' column
+                          per symbol, with no per-bar dict allocations; "dict" keeps
+                          a {symbol: qty} dict per bar in a 'positions' column.
+        stop_engine:      kernel for stops in the vectorized mode (utils.stops):
+                          "numba", "python", or "auto" (numba when installed).
+        result_cache:     a utils.result_cache.ResultCache: run() on inputs it has
+                          seen returns the stored history and restores the
+                          portfolio / execution handler state instead of trading.
+        history_sink:     an engine.sinks.ReportSink: run() then writes the history
+                          to it in batches of `sink_every` bars and returns None,
+                          so the full history is never held (nor cached).
+        """
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"execution_mode must be one of {EXECUTION_MODES}.")
+        if positions_format not in ("dict", "wide"):
+            raise ValueError("positions_format must be 'dict' or 'wide'.")
+        if stop_engine not in stops.ENGINES:
+            raise ValueError(f"stop_engine must be one of {stops.ENGINES}.")
+        self.strategy         = strategy
+        self.exec_h           = exec_handler
+        self.portfolio        = portfolio
+        self.qty_per_trade    = qty_per_trade
+        self.stop_loss_pct    = stop_loss_pct
+        self.take_profit_pct  = take_profit_pct
+        self.execution_mode   = execution_mode
+        self.positions_format = positions_format
+        self.stop_engine      = stop_engine
+        self.result_cache     = result_cache
+        self.history_sink     = history_sink
+        self.sink_every       = sink_every
+        self.profiler         = NULL_PROFILER   # swapped for a RunProfiler by run_profiled()
 
     def run(self, price_data, symbol=None) -> pd.DataFrame:
-        price_df_dict = self._normalize_input(price_data, symbol)
-        signals_df    = self.strategy.generate_signals(price_df_dict)
-        history_df    = self._apply_trades(price_df_dict, signals_df)
+        """
+        price_data: a Series or DataFrame (with `symbol`), a dict of them, or a
+        PricePanel. The closes are validated and packed into one read-only
+        PricePanel up front; strategies and the trade loop only get views of it.
+        """
+        prof = self.profiler
+        with prof.phase("run"):
+            with prof.phase("normalize_input"):
+                price_df_dict = PricePanel.from_data(price_data, symbol)
+            if self.history_sink is not None:
+                history_df = self._run_streamed(price_df_dict)
+            elif self.result_cache is None:
+                history_df = self._run_frames(price_df_dict)
+            else:
+                history_df = self._run_cached(price_df_dict)
+            # the trade file is complete once the run returns
+            self.exec_h.trades.flush()
         return history_df
 
-    def _normalize_input(self, price_data, symbol):
+    def _run_streamed(self, panel):
+        prof = self.profiler
+        rows = np.arange(len(panel.index))[panel.common_rows()]
+        if len(rows) == 0:
+            raise ValueError("No overlapping dates in price data.")
+        with prof.phase("generate_signals"):
+            signals = self.strategy.generate_signals(panel)
+        with prof.phase("normalize_signals"):
+            signals_df = self._normalize_signals(signals, panel)
+        with prof.phase("apply_trades"):
+            for _, _, hist in self._trade_segments(panel, signals_df, rows, 0, self.sink_every):
+                self.history_sink.write(hist)
+        return None
+
+    def cache_key(self, price_data, symbol=None) -> str:
+        """
+        Result-cache key of run(price_data, symbol) from the current state:
+        prices, strategy class and parameters, and _settings().
+        """
+        return checkpoint.run_key("run", PricePanel.from_data(price_data, symbol),
+                                  *strategy_key(self.strategy), self._settings())
+
+    def _run_cached(self, panel):
+        def compute():
+            return {"history": self._run_frames(panel), "portfolio": self.portfolio, "exec_h": self.exec_h}
+        result = self.result_cache.get_or_compute(self.cache_key(panel), compute)
+        if result["portfolio"] is not self.portfolio:
+            # a hit: end up in the state the stored run left its handlers in
+            self._restore_handlers(result["portfolio"], result["exec_h"])
+        return result["history"]
+
+    def run_chunked(self, chunks, warmup: int = None, on_chunk=None):
+        """
+        Out-of-core run over time-ordered, non-overlapping chunks of price data
+        (each a dict { symbol: DataFrame/Series }, e.g. from PriceStore.iter_chunks).
+
+        Portfolio, execution handler and the previous bar's signals carry over
+        from one chunk to the next, and the strategy sees the last `warmup`
+        bars of history before each chunk (default: strategy.warmup_bars), so
+        the result matches run() on the concatenated data while only one chunk
+        (plus the warmup tail) is in memory.
+        With on_chunk set, each chunk's history is handed to it and not kept
+        (returns None); otherwise the concatenated history is returned.
+        """
+        if warmup is None:
+            warmup = getattr(self.strategy, "warmup_bars", 0)
+        prof = self.profiler
+        tail, prev_signals, kept = {}, None, []
+        with prof.phase("run"):
+            for chunk in chunks:
+                with prof.phase("normalize_input"):
+                    price_df_dict = self._normalize_input(chunk, None)
+                    price_df_dict = {sym: df for sym, df in price_df_dict.items() if len(df)}
+                if not price_df_dict:
+                    continue
+                signal_data = {
+                    sym: pd.concat([tail[sym], df]) if sym in tail else df
+                    for sym, df in price_df_dict.items()
+                }
+                tail = {sym: df.iloc[-warmup:] for sym, df in signal_data.items()} if warmup else {}
+                if len(self._common_index(price_df_dict, strict=False)) == 0:
+                    continue
+
+                history_df   = self._run_frames(price_df_dict, signal_data, prev_signals)
+                prev_signals = self.last_signals(history_df)
+                if on_chunk is not None:
+                    on_chunk(history_df)
+                else:
+                    kept.append(history_df)
+            self.exec_h.trades.flush()
+        if on_chunk is not None:
+            return None
+        return pd.concat(kept) if kept else None
+
+    def run_checkpointed(self, price_data, symbol=None, checkpoint_dir: str = "checkpoints",
+                         every: int = 10_000) -> pd.DataFrame:
+        """
+        run() for long backtests that may be preempted. The trades are applied in
+        segments of `every` bars; after each one the complete state (Portfolio,
+        ExecutionHandler, last signals, next bar, history so far) is saved under
+        `checkpoint_dir` (see utils.checkpoint).
+
+        Called again with the same prices, strategy and settings, it resumes
+        from the last checkpoint and returns the history an uninterrupted run()
+        gives. The injected portfolio and handler must be in the state the
+        first attempt started from; they are then restored in place. A
+        checkpoint of a different run is ignored and overwritten.
+        """
+        if every < 1:
+            raise ValueError("every must be at least one bar.")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        state_path = os.path.join(checkpoint_dir, "state.pkl")
+        prof = self.profiler
+        with prof.phase("run"):
+            with prof.phase("normalize_input"):
+                panel = PricePanel.from_data(price_data, symbol)
+                rows  = np.arange(len(panel.index))[panel.common_rows()]
+                if len(rows) == 0:
+                    raise ValueError("No overlapping dates in price data.")
+            with prof.phase("generate_signals"):
+                signals = self.strategy.generate_signals(panel)
+            with prof.phase("normalize_signals"):
+                signals_df = self._normalize_signals(signals, panel)
+            key = checkpoint.run_key(panel.to_frame(), signals_df, self._settings())
+
+            # 1) Pick up where a previous attempt stopped
+            state = checkpoint.load_state(state_path)
+            if state is not None and state["key"] == key:
+                self._restore_handlers(state["portfolio"], state["exec_h"])
+                bar, prev_signals, segments = state["bar"], state["prev_signals"], state["segments"]
+                pieces = [checkpoint.load_state(os.path.join(checkpoint_dir, name))["history"]
+                          for name in segments]
+            else:
+                bar, prev_signals, segments, pieces = 0, None, [], []
+
+            # 2) Trade the remaining bars, saving the history segment, then the state
+            with prof.phase("apply_trades"):
+                for stop, prev_signals, hist in self._trade_segments(panel, signals_df, rows, bar, every,
+                                                                     prev_signals):
+                    name = f"history_{bar:012d}.pkl"
+                    checkpoint.save_state(os.path.join(checkpoint_dir, name), {"history": hist})
+                    bar = stop
+                    segments.append(name)
+                    pieces.append(hist)
+                    checkpoint.save_state(state_path, {
+                        "key":          key,
+                        "bar":          bar,
+                        "prev_signals": prev_signals,
+                        "segments":     segments,
+                        "portfolio":    self.portfolio,
+                        "exec_h":       self.exec_h,
+                    })
+        return pd.concat(pieces)
+
+    def _restore_handlers(self, portfolio, exec_h):
+        # adopt saved portfolio / handler state in place, keeping this run's trade sink
+        sink = self.exec_h.trades.sink
+        self.portfolio.__dict__.update(portfolio.__dict__)
+        self.exec_h.__dict__.update(exec_h.__dict__)
+        self.exec_h.trades.sink = sink
+
+    def _trade_segments(self, panel, signals_df, rows, bar, every, prev_signals=None):
+        # histories of the common rows[bar:], `every` bars at a time, chained by the last signals
+        while bar < len(rows):
+            stop = min(bar + every, len(rows))
+            hist = self._apply_trades(panel.window(rows[bar], rows[stop - 1] + 1), signals_df, prev_signals)
+            prev_signals = self.last_signals(hist)
+            yield stop, prev_signals, hist
+            bar = stop
+
+    def _settings(self) -> dict:
+        # what, besides prices and signals, decides a run's result (its checkpoint key)
+        return {
+            "qty_per_trade":    self.qty_per_trade,
+            "stop_loss_pct":    self.stop_loss_pct,
+            "take_profit_pct":  self.take_profit_pct,
+            "execution_mode":   self.execution_mode,
+            "positions_format": self.positions_format,
+            "commission":       self.exec_h.commission,
+            "slippage_pct":     self.exec_h.slippage_pct,
+            "cash":             self.portfolio.cash,
+            "positions":        sorted(self.portfolio.positions.items()),
+            "trades":           self.exec_h.trades.total,
+        }
+
+    # ─── Signals and replay ───────────────────────────────────────────────────
+
+    def signals_for(self, prices) -> pd.DataFrame:
+        """
+        The strategy's signals over `prices` (a PricePanel or { symbol: DataFrame }),
+        one column per traded symbol, as run() would trade them.
+        """
+        return self._normalize_signals(self.strategy.generate_signals(prices), prices)
+
+    def replay(self, prices, signals_df, prev_signals=None) -> pd.DataFrame:
+        """
+        Trade precomputed `signals_df` (e.g. signals_for() over a longer span) on
+        the bars of `prices`, from the current portfolio / execution state.
+        prev_signals: {symbol: signal} of the bar before the first one here, so
+        a position carries over from an earlier replay (see last_signals); 0
+        when not given. Returns the history, like run().
+        """
+        return self._apply_trades(prices, signals_df, prev_signals)
+
+    @staticmethod
+    def last_signals(history_df) -> dict:
+        """{symbol: signal} of a history's last bar, to carry into the next segment."""
+        return {
+            col[len("signal_"):]: int(history_df[col].iloc[-1])
+            for col in history_df.columns if col.startswith("signal_")
+        }
+
+    def _run_frames(self, price_df_dict, signal_data=None, prev_signals=None):
+        # signals from `signal_data` (prices plus any warmup bars), trades on `price_df_dict`
+        prof = self.profiler
+        with prof.phase("generate_signals"):
+            signals = self.strategy.generate_signals(price_df_dict if signal_data is None else signal_data)
+        with prof.phase("normalize_signals"):
+            signals_df = self._normalize_signals(signals, price_df_dict)
+        with prof.phase("apply_trades"):
+            return self._apply_trades(price_df_dict, signals_df, prev_signals)
+
+    def run_profiled(self, price_data, symbol=None, track_allocations: bool = False,
+                     cprofile: bool = False):
+        """
+        run() with instrumentation on: per-phase wall/CPU time, counters (bars,
+        orders, stop exits), optionally allocations and cProfile stats.
+        Returns (history_df, RunProfiler); see utils.profiling for the exports.
+        """
+        prof = RunProfiler(track_allocations=track_allocations, cprofile=cprofile)
+        self.profiler = prof
+        try:
+            with prof.session():
+                history_df = self.run(price_data, symbol)
+        finally:
+            self.profiler = NULL_PROFILER
+        return history_df, prof
+
+    def _normalize_signals(self, signals, price_df_dict):
+        # Single-asset strategies return a Series, or a frame with a 'signal'
+        # column (MovingAverageCrossoverStrategy); key it by the traded symbol.
+        if len(price_df_dict) == 1:
+            sym = next(iter(price_df_dict))
+            if isinstance(signals, pd.Series):
+                return signals.to_frame(name=sym)
+            if "signal" in signals.columns and sym not in signals.columns:
+                return signals[["signal"]].rename(columns={"signal": sym})
+        return signals
+
+    @staticmethod
+    def _normalize_input(price_data, symbol):
+        # { symbol: DataFrame } over the caller's data (used per chunk by run_chunked)
         price_df_dict = {}
         if isinstance(price_data, pd.Series):
             if symbol is None:
                 raise ValueError("Must pass `symbol` when giving a Series.")
-            price_df_dict[symbol] = pd.DataFrame({"Close": price_data.astype(float)})
+            price_df_dict[symbol] = pd.DataFrame({"Close": price_data.astype(float, copy=False)}, copy=False)
         elif isinstance(price_data, pd.DataFrame):
             if symbol is None:
                 raise ValueError("Must pass `symbol` when giving a DataFrame.")
             if "Close" not in price_data.columns:
                 raise KeyError(f"DataFrame for '{symbol}' needs a 'Close' column.")
-            price_df_dict[symbol] = price_data.copy()
+            price_df_dict[symbol] = price_data
         elif isinstance(price_data, dict):
             for sym, df_or_ser in price_data.items():
                 if isinstance(df_or_ser, pd.Series):
-                    price_df_dict[sym] = pd.DataFrame({"Close": df_or_ser.astype(float)})
+                    price_df_dict[sym] = pd.DataFrame({"Close": df_or_ser.astype(float, copy=False)}, copy=False)
                 elif isinstance(df_or_ser, pd.DataFrame):
                     if "Close" not in df_or_ser.columns:
                         raise KeyError(f"DataFrame for '{sym}' must have a 'Close' column.")
-                    price_df_dict[sym] = df_or_ser.copy()
+                    price_df_dict[sym] = df_or_ser
                 else:
                     raise TypeError(f"Expected Series or DataFrame for '{sym}'.")
         else:
             raise TypeError("price_data must be Series, DataFrame, or dict thereof.")
         return price_df_dict
 
-    def _apply_trades(self, price_df_dict, signals_df):
-        # 1) Build intersection of all indices
+    def _common_index(self, price_df_dict, strict: bool = True):
+        # Build intersection of all indices (a PricePanel already knows it)
         common_idx = None
-        for df in price_df_dict.values():
-            common_idx = df.index if common_idx is None else common_idx.intersection(df.index)
-        if common_idx is None or len(common_idx) == 0:
+        if isinstance(price_df_dict, PricePanel):
+            common_idx = price_df_dict.common_index if len(price_df_dict) else None
+        else:
+            for df in price_df_dict.values():
+                common_idx = df.index if common_idx is None else common_idx.intersection(df.index)
+        if strict and (common_idx is None or len(common_idx) == 0):
             raise ValueError("No overlapping dates in price data.")
-        common_idx = common_idx.sort_values()
+        return common_idx.sort_values() if common_idx is not None else pd.Index([])
+
+    def _apply_trades(self, price_df_dict, signals_df, prev_signals=None):
+        """
+        prev_signals: {symbol: signal} of the bar before the first one here
+        (carried between chunks by run_chunked); 0 when not given.
+        """
+        if self.execution_mode == "vectorized":
+            return self._apply_trades_vectorized(price_df_dict, signals_df, prev_signals)
+        return self._apply_trades_loop(price_df_dict, signals_df, prev_signals)
+
+    @staticmethod
+    def _lap(acc, k, wall0, cpu0):
+        # per-bar timing slice (only called when profiling is on)
+        wall, cpu = time.perf_counter_ns(), time.process_time_ns()
+        acc[k][0] += wall - wall0
+        acc[k][1] += cpu - cpu0
+        return wall, cpu
+
+    def _count_run(self, n_bars, n_syms, n_trades_before):
+        prof = self.profiler
+        prof.count("bars", n_bars)
+        prof.count("symbols", n_syms)
+        # trades already handed to a sink are no longer in the log
+        trades = self.exec_h.trades
+        sides  = trades.column("side")[max(0, n_trades_before - trades.flushed):]
+        prof.count("orders_buy", int((sides == 0).sum()))
+        prof.count("orders_sell", int((sides == 1).sum()))
+
+    def _apply_trades_loop(self, price_df_dict, signals_df, prev_signals=None):
+        prof  = self.profiler
+        timed = prof.enabled
+        n_trades_before = self.exec_h.trades.total
+
+        # 1) Build intersection of all indices
+        with prof.phase("align"):
+            common_idx = self._common_index(price_df_dict)
 
         # 2) Now treat each column of signals_df as “that symbol’s signal”
         #    so signal_cols = list of tickers, e.g. ["AAPL","BRK-B","JPM","GS"]
         signal_cols = list(signals_df.columns)
-        # initialize prev_signals[sym] = 0 for each ticker
-        prev_signals = {sym: 0 for sym in signal_cols}
-
-        history = []
-
-        for date in common_idx:
-            # a) gather closes for each symbol on this date
-            price_at_date = {
-                sym: float(df.loc[date, "Close"])
-                for sym, df in price_df_dict.items()
-            }
-
-            # b) gather signals for each symbol‐column
-            #    (if a column or date is missing, fallback to 0)
-            current_signals = {}
-            for sym in signal_cols:
-                try:
-                    current_signals[sym] = int(signals_df.loc[date, sym])
-                except KeyError:
-                    # if for some reason that date or column isn’t in signals_df,
-                    # assume no signal change (0)
-                    current_signals[sym] = 0
-
-            # ─── Debug print ───
-            # print(f"[{date.date()}] prices: {price_at_date}, signals: {current_signals}")
-
-            # c) optional stop‐loss / take‐profit on existing positions
-            if self.stop_loss_pct or self.take_profit_pct:
+        # initialize prev_signals[sym] = 0 for each ticker (or carry it over)
+        prev_signals = {sym: (prev_signals or {}).get(sym, 0) for sym in signal_cols}
+
+        # preallocated history columns, filled one row per bar
+        n_bars, n_syms = len(common_idx), len(signal_cols)
+        cash_hist   = np.empty(n_bars, dtype=float)
+        equity_hist = np.empty(n_bars, dtype=float)
+        signal_hist = np.empty((n_bars, n_syms), dtype=np.int64)
+        price_hist  = np.empty((n_bars, n_syms), dtype=float)
+        if self.positions_format == "wide":
+            positions_hist = np.zeros((n_bars, n_syms), dtype=np.int64)
+            sym_col = {sym: j for j, sym in enumerate(signal_cols)}
+        else:
+            positions_hist = []
+
+        # a PricePanel hands over its rows directly instead of per-date lookups
+        if isinstance(price_df_dict, PricePanel):
+            panel_syms = price_df_dict.symbols
+            panel_rows = price_df_dict.array[price_df_dict.common_rows()]
+
+        # per-bar slices: price lookup, signal lookup, stops, signal orders, snapshot
+        slices = [[0, 0] for _ in range(5)]
+        with prof.phase("bars"):
+            for i, date in enumerate(common_idx):
+                if timed:
+                    wall0, cpu0 = time.perf_counter_ns(), time.process_time_ns()
+                # a) gather closes for each symbol on this date
+                if isinstance(price_df_dict, PricePanel):
+                    price_at_date = dict(zip(panel_syms, panel_rows[i].tolist()))
+                else:
+                    price_at_date = {
+                        sym: float(df.loc[date, "Close"])
+                        for sym, df in price_df_dict.items()
+                    }
+                if timed:
+                    wall0, cpu0 = self._lap(slices, 0, wall0, cpu0)
+
+                # b) gather signals for each symbol‐column
+                #    (if a column or date is missing, fallback to 0)
+                current_signals = {}
                 for sym in signal_cols:
-                    qty_held = self.portfolio.positions.get(sym, 0)
-                    if qty_held != 0:
-                        entry_price = self.exec_h.last_trade_price(sym) or np.nan
-                        if not np.isnan(entry_price):
-                            pnl_pct = (price_at_date[sym] - entry_price) / entry_price
-                            if self.stop_loss_pct and pnl_pct <= -self.stop_loss_pct:
-                                self.exec_h.execute_order("SELL", sym, self.qty_per_trade, price_at_date[sym], date)
-                                self.portfolio.sell(sym, self.qty_per_trade, price_at_date[sym],
-                                                    commission=self.exec_h.commission)
-                                # print(f"  → STOP-LOSS SELL {sym} @ {price_at_date[sym]}")
-                            elif self.take_profit_pct and pnl_pct >= self.take_profit_pct:
-                                self.exec_h.execute_order("SELL", sym, self.qty_per_trade, price_at_date[sym], date)
-                                self.portfolio.sell(sym, self.qty_per_trade, price_at_date[sym],
-                                                    commission=self.exec_h.commission)
-                                # print(f"  → TAKE-PROFIT SELL {sym} @ {price_at_date[sym]}")
-
-            # d) apply new signals (BUY/SELL on transition from prev_signals[sym] to current_signals[sym])
-            for sym in signal_cols:
-                sig  = current_signals[sym]
-                prev = prev_signals[sym]
-
-                if sig == 1 and prev != 1:
-                    self.exec_h.execute_order("BUY", sym, self.qty_per_trade, price_at_date[sym], date)
-                    self.portfolio.buy(sym, self.qty_per_trade, price_at_date[sym],
-                                       commission=self.exec_h.commission)
-                    # print(f"  → BUY {sym} @ {price_at_date[sym]}")
-
-                elif sig == -1 and prev != -1:
-                    self.exec_h.execute_order("SELL", sym, self.qty_per_trade, price_at_date[sym], date)
-                    self.portfolio.sell(sym, self.qty_per_trade, price_at_date[sym],
-                                        commission=self.exec_h.commission)
-                    # print(f"  → SELL {sym} @ {price_at_date[sym]}")
-
-                prev_signals[sym] = sig
-
-            # e) snapshot end‐of‐day: cash, positions, total_equity
-            total_equity = self.portfolio.value(price_at_date)
-            record = {
-                "timestamp":    date,
-                "cash":         self.portfolio.cash,
-                "positions":    self.portfolio.positions.copy(),
-                "total_equity": total_equity,
-            }
-            # also add each signal and its price to the record
-            for sym in signal_cols:
-                record[f"signal_{sym}"]   = current_signals[sym]
-                record[f"price_{sym}"]    = price_at_date[sym]
-
-            history.append(record)
-
-        df_hist = pd.DataFrame(history).set_index("timestamp")
-        return df_hist
\ No newline at end of file
+                    try:
+                        current_signals[sym] = int(signals_df.loc[date, sym])
+                    except KeyError:
+                        # if for some reason that date or column isn’t in signals_df,
+                        # assume no signal change (0)
+                        current_signals[sym] = 0
+                    except ValueError:
+                        raise ValueError(f"NaN signal for '{sym}' on {date}.") from None
+                if timed:
+                    wall0, cpu0 = self._lap(slices, 1, wall0, cpu0)
+
+                # ─── Debug print ───
+                # print(f"[{date.date()}] prices: {price_at_date}, signals: {current_signals}")
+
+                # c) optional stop‐loss / take‐profit on existing positions
+                if self.stop_loss_pct or self.take_profit_pct:
+                    for sym in signal_cols:
+                        qty_held = self.portfolio.positions.get(sym, 0)
+                        if qty_held != 0:
+                            entry_price = self.exec_h.last_trade_price(sym) or np.nan
+                            if not np.isnan(entry_price):
+                                pnl_pct = (price_at_date[sym] - entry_price) / entry_price
+                                if self.stop_loss_pct and pnl_pct <= -self.stop_loss_pct:
+                                    self.exec_h.execute_order("SELL", sym, self.qty_per_trade, price_at_date[sym], date)
+                                    self.portfolio.sell(sym, self.qty_per_trade, price_at_date[sym],
+                                                        commission=self.exec_h.commission)
+                                    prof.count("stop_loss_exits")
+                                    # print(f"  → STOP-LOSS SELL {sym} @ {price_at_date[sym]}")
+                                elif self.take_profit_pct and pnl_pct >= self.take_profit_pct:
+                                    self.exec_h.execute_order("SELL", sym, self.qty_per_trade, price_at_date[sym], date)
+                                    self.portfolio.sell(sym, self.qty_per_trade, price_at_date[sym],
+                                                        commission=self.exec_h.commission)
+                                    prof.count("take_profit_exits")
+                                    # print(f"  → TAKE-PROFIT SELL {sym} @ {price_at_date[sym]}")
+
+                if timed:
+                    wall0, cpu0 = self._lap(slices, 2, wall0, cpu0)
+
+                # d) apply new signals (BUY/SELL on transition from prev_signals[sym] to current_signals[sym])
+                for sym in signal_cols:
+                    sig  = current_signals[sym]
+                    prev = prev_signals[sym]
+
+                    if sig == 1 and prev != 1:
+                        self.exec_h.execute_order("BUY", sym, self.qty_per_trade, price_at_date[sym], date)
+                        self.portfolio.buy(sym, self.qty_per_trade, price_at_date[sym],
+                                           commission=self.exec_h.commission)
+                        # print(f"  → BUY {sym} @ {price_at_date[sym]}")
+
+                    elif sig == -1 and prev != -1:
+                        self.exec_h.execute_order("SELL", sym, self.qty_per_trade, price_at_date[sym], date)
+                        self.portfolio.sell(sym, self.qty_per_trade, price_at_date[sym],
+                                            commission=self.exec_h.commission)
+                        # print(f"  → SELL {sym} @ {price_at_date[sym]}")
+
+                    prev_signals[sym] = sig
+                if timed:
+                    wall0, cpu0 = self._lap(slices, 3, wall0, cpu0)
+
+                # e) snapshot end‐of‐day: cash, positions, total_equity
+                cash_hist[i]   = self.portfolio.cash
+                equity_hist[i] = self.portfolio.value(price_at_date)
+                if self.positions_format == "wide":
+                    for sym, qty in self.portfolio.positions.items():
+                        if sym in sym_col:
+                            positions_hist[i, sym_col[sym]] = qty
+                else:
+                    positions_hist.append(self.portfolio.positions.copy())
+                # also add each signal and its price to the record
+                for j, sym in enumerate(signal_cols):
+                    signal_hist[i, j] = current_signals[sym]
+                    price_hist[i, j]  = price_at_date[sym]
+                if timed:
+                    self._lap(slices, 4, wall0, cpu0)
+
+            if timed:
+                for name, (wall, cpu) in zip(("price_lookup", "signal_lookup", "stop_checks",
+                                              "signal_orders", "snapshot"), slices):
+                    prof.add_time(name, wall, cpu, calls=n_bars)
+        if timed:
+            self._count_run(n_bars, n_syms, n_trades_before)
+
+        with prof.phase("history"):
+            return self._history_frame(common_idx, cash_hist, positions_hist, equity_hist,
+                                       signal_hist, price_hist, signal_cols)
+
+    def _history_frame(self, common_idx, cash, positions, total_equity, signals, prices, signal_cols):
+        """
+        Assemble the history DataFrame from per-bar columns. `positions` is a list
+        of dicts (positions_format="dict") or a (bars × symbols) matrix ("wide").
+        """
+        data = {"timestamp": common_idx, "cash": cash}
+        if self.positions_format == "dict":
+            data["positions"] = positions
+        data["total_equity"] = total_equity
+        for j, sym in enumerate(signal_cols):
+            data[f"signal_{sym}"] = signals[:, j]
+            data[f"price_{sym}"]  = prices[:, j]
+            if self.positions_format == "wide":
+                data[f"position_{sym}"] = positions[:, j]
+
+        df_hist = pd.DataFrame(data).set_index("timestamp")
+        return df_hist
+
+    # ─── Vectorized execution path ────────────────────────────────────────────
+
+    def _align_arrays(self, price_df_dict, signals_df, common_idx, signal_cols):
+        """
+        Align closes and signals on `common_idx` into dense (bars × symbols) arrays,
+        one column per signal column. Missing signal dates fall back to 0 and NaN
+        signals raise ValueError, like the loop.
+        From an aligned PricePanel with the same columns, `prices` is its read-only buffer.
+        """
+        for sym in signal_cols:
+            if sym not in price_df_dict:
+                raise KeyError(sym)
+        if isinstance(price_df_dict, PricePanel):
+            rows   = price_df_dict.common_rows()
+            cols   = [price_df_dict.symbols.index(sym) for sym in signal_cols]
+            prices = price_df_dict.array[rows]
+            if cols != list(range(prices.shape[1])):
+                prices = prices[:, cols]
+        else:
+            prices = np.empty((len(common_idx), len(signal_cols)), dtype=float)
+            for j, sym in enumerate(signal_cols):
+                prices[:, j] = price_df_dict[sym]["Close"].reindex(common_idx).to_numpy(dtype=float)
+
+        aligned = signals_df.reindex(index=common_idx, columns=signal_cols).to_numpy(dtype=float)
+        missing = np.isnan(aligned)
+        if missing.any():
+            # a NaN the strategy returned is an error, as in the loop; only dates
+            # absent from signals_df fall back to 0
+            bad = missing & common_idx.isin(signals_df.index)[:, None]
+            if bad.any():
+                i, j = np.argwhere(bad)[0]
+                raise ValueError(f"NaN signal for '{signal_cols[j]}' on {common_idx[i]}.")
+            aligned[missing] = 0
+        return prices, aligned.astype(np.int64)
+
+    def _simulate_stops(self, prices, buys, sells, pos0, last_px0):
+        """
+        Path-dependent part of the vectorized mode: stop-loss / take-profit exits
+        change positions and entry prices, so they run in utils.stops (compiled
+        with numba when installed, see `stop_engine`).
+        Returns (stop_hits, positions before the signal block, positions at end of bar).
+        """
+        kinds, pos_mid, pos_end = stops.simulate_stops(
+            prices, buys, sells, pos0, last_px0, self.qty_per_trade, self.exec_h.slippage_pct,
+            self.stop_loss_pct, self.take_profit_pct, engine=self.stop_engine,
+        )
+        if self.profiler.enabled:
+            self.profiler.count("stop_loss_exits", int((kinds == stops.STOP_LOSS).sum()))
+            self.profiler.count("take_profit_exits", int((kinds == stops.TAKE_PROFIT).sum()))
+        return kinds != stops.NO_STOP, pos_mid, pos_end
+
+    def _apply_trades_vectorized(self, price_df_dict, signals_df, prev_signals=None):
+        prof = self.profiler
+        n_trades_before = self.exec_h.trades.total
+        common_idx  = self._common_index(price_df_dict)
+        signal_cols = list(signals_df.columns)
+
+        # Positions in symbols we don't trade are valued by the loop from
+        # price_df_dict; keep that (rare) case on the reference path.
+        if any(sym not in signal_cols for sym in self.portfolio.positions):
+            return self._apply_trades_loop(price_df_dict, signals_df, prev_signals)
+
+        with prof.phase("align"):
+            prices, signals = self._align_arrays(price_df_dict, signals_df, common_idx, signal_cols)
+            n_bars, n_syms  = prices.shape
+        q = self.qty_per_trade
+        c = self.exec_h.commission
+
+        # 1) Transitions: BUY on a move into +1, SELL on a move into −1
+        with prof.phase("transitions"):
+            prev0 = np.array([[(prev_signals or {}).get(sym, 0) for sym in signal_cols]], dtype=np.int64)
+            prev  = np.vstack([prev0.reshape(1, n_syms), signals[:-1]])
+            buys  = (signals ==  1) & (prev !=  1)
+            sells = (signals == -1) & (prev != -1)
+
+        # 2) Positions. Portfolio.sell floors a position at zero, so without stops
+        #    positions are a cumulative sum reflected at 0: X_t = S_t − min(0, min_{s≤t} S_s)
+        with prof.phase("positions"):
+            pos0 = np.array([self.portfolio.positions.get(sym, 0) for sym in signal_cols], dtype=np.int64)
+            if self.stop_loss_pct or self.take_profit_pct:
+                last_px0 = np.array([self.exec_h.last_trade_price(sym) or np.nan for sym in signal_cols],
+                                    dtype=float)
+                stop_hits, pos_mid, pos_end = self._simulate_stops(prices, buys, sells, pos0, last_px0)
+            else:
+                stop_hits = np.zeros((n_bars, n_syms), dtype=bool)
+                walk    = pos0 + np.cumsum(q * buys.astype(np.int64) - q * sells.astype(np.int64), axis=0)
+                pos_end = walk - np.minimum(np.minimum.accumulate(walk, axis=0), 0)
+                pos_mid = np.vstack([pos0[None, :], pos_end[:-1]])
+
+        # 3) Cash: each bar runs the stop block then the signal block, symbol by symbol.
+        #    A sequential cumsum over that order reproduces the loop's float arithmetic.
+        with prof.phase("cash"):
+            fill_buy  = np.hstack([np.zeros_like(stop_hits), buys])
+            fill_sell = np.hstack([stop_hits, sells])
+            fill_px   = np.hstack([prices, prices])
+            deltas = np.where(fill_buy, -(q * fill_px + c), np.where(fill_sell, q * fill_px - c, 0.0))
+            cash   = np.cumsum(np.concatenate([[self.portfolio.cash], deltas.ravel()]))[1:]
+            cash   = cash.reshape(n_bars, 2 * n_syms)[:, -1] if n_syms else np.full(n_bars, self.portfolio.cash)
+
+        # 4) Equity: Portfolio.value sums positions in dict insertion order, i.e. by
+        #    when each position was (re)opened. Track that order to keep sums bit-identical.
+        with prof.phase("equity"):
+            none_key = np.iinfo(np.int64).min
+            init_key = np.full(n_syms, none_key, dtype=np.int64)
+            for rank, sym in enumerate(self.portfolio.positions):
+                init_key[signal_cols.index(sym)] = rank - len(self.portfolio.positions)
+            opened   = buys & (pos_mid == 0)
+            evt_key  = np.where(opened, np.arange(n_bars * n_syms).reshape(n_bars, n_syms), none_key)
+            open_key = np.maximum.accumulate(np.vstack([init_key[None, :], evt_key]), axis=0)[1:]
+
+            held  = pos_end != 0
+            order = np.argsort(np.where(held, open_key, np.iinfo(np.int64).max), axis=1, kind="stable")
+            pos_sorted = np.take_along_axis(pos_end, order, axis=1)
+            val_sorted = np.take_along_axis(np.where(held, pos_end * prices, 0.0), order, axis=1)
+            pos_value  = np.cumsum(val_sorted, axis=1)[:, -1] if n_syms else np.zeros(n_bars)
+            total_equity = cash + pos_value
+
+        # 5) Replay the fills through the injected handlers so their state
+        #    (trades, totals, cash, positions) ends up exactly as after the loop.
+        with prof.phase("replay_orders"):
+            sym_arr = np.array(signal_cols, dtype=object)
+            for flat in np.flatnonzero(fill_buy | fill_sell):
+                t, slot = divmod(flat, 2 * n_syms)
+                j       = slot % n_syms
+                sym     = signal_cols[j]
+                price   = float(prices[t, j])
+                date    = common_idx[t]
+                if fill_buy[t, slot]:
+                    self.exec_h.execute_order("BUY", sym, q, price, date)
+                    self.portfolio.buy(sym, q, price, commission=c)
+                else:
+                    self.exec_h.execute_order("SELL", sym, q, price, date)
+                    self.portfolio.sell(sym, q, price, commission=c)
+
+        if prof.enabled:
+            self._count_run(n_bars, n_syms, n_trades_before)
+
+        # 6) Assemble the same frame the loop builds
+        with prof.phase("history"):
+            if self.positions_format == "wide":
+                positions = pos_end
+            else:
+                n_held    = held.sum(axis=1)
+                positions = [
+                    dict(zip(sym_arr[order[t, :n_held[t]]].tolist(), pos_sorted[t, :n_held[t]].tolist()))
+                    for t in range(n_bars)
+                ]
+            return self._history_frame(common_idx, cash, positions, total_equity,
+                                       signals, prices, signal_cols)
@@ -1,9 +1,13 @@
+import numpy as np
 import pandas as pd
+from collections.abc import Mapping
 from typing import Dict
 from engine.execution_handler import ExecutionHandler
 from engine.portfolio import Portfolio
 from strategies.buy_and_hold_strategy import BuyAndHoldStrategy
-from utils.performance import calculate_returns, calculate_sharpe_ratio, calculate_drawdowns
+from utils import checkpoint
+from utils.performance import calculate_returns, calculate_sharpe_ratio
+from utils.result_cache import strategy_key
 
 def backtest_strategy(
     prices: pd.Series,
@@ -34,54 +38,131 @@ def backtest_strategy(
         sig   = sigs.loc[date]
 
         if sig ==  1 and prev !=  1:
-            exec_h.execute_order("BUY", symbol, qty_per_trade, price)
-            # Note: we pass "date" to record immediately after the buy:
-            port.buy(symbol, qty_per_trade, price, commission=commission, timestamp=date)
+            exec_h.execute_order("BUY", symbol, qty_per_trade, price, date)
+            port.buy(symbol, qty_per_trade, price, commission=commission)
 
         elif sig == -1 and prev != -1:
-            exec_h.execute_order("SELL", symbol, qty_per_trade, price)
-            port.sell(symbol, qty_per_trade, price, commission=commission, timestamp=date)
+            exec_h.execute_order("SELL", symbol, qty_per_trade, price, date)
+            port.sell(symbol, qty_per_trade, price, commission=commission)
 
         prev = sig
 
-        # If no trade occurred, but you still want an end‐of‐day snapshot:
+        # one end-of-day snapshot per bar, after any trade
         port.snapshot(date, {symbol: price})
 
-    # Once loop ends, grab the full history DataFrame:
-    hist_df = port.history()  
+    return port.history()["total_equity"]
 
-    return hist_df
+def simulate_portfolios(
+    prices,
+    signals: pd.DataFrame,
+    initial_capital: float = 100000,
+    qty_per_trade=10,
+    commission: float = 0.0,
+    block_size: int = 1024
+) -> pd.DataFrame:
+    """
+    Batched backtest_strategy: every column of `signals` is one strategy, and
+    all of them are simulated together with array operations.
+
+    `prices` is either one Series that every strategy trades, or a DataFrame
+    with the same columns as `signals` (strategy i trades column i).
+    `qty_per_trade` may be a scalar, one value per strategy in column order,
+    or a Series/mapping keyed by strategy name. Same rules as
+    backtest_strategy: BUY on a switch to +1, SELL on a switch to −1, fills at
+    the bar's price, a SELL never leaves a negative position.
+    Returns the equity matrix (dates × strategies).
+    """
+    signals = signals.reindex(prices.index).fillna(0).astype(int)
+    names   = signals.columns
+    if isinstance(qty_per_trade, (pd.Series, Mapping)):
+        # labelled quantities follow the strategy names
+        qty = pd.Series(qty_per_trade)
+        missing = names.difference(qty.index)
+        if len(missing):
+            raise KeyError(f"qty_per_trade has no value for {list(missing)}.")
+        qty = qty.reindex(names).to_numpy(dtype=float)
+    else:
+        # scalars and sequences go by position
+        qty = np.broadcast_to(np.asarray(qty_per_trade, dtype=float), (len(names),))
+    if isinstance(prices, pd.DataFrame):
+        px = prices.reindex(columns=names).to_numpy(dtype=float)
+    else:
+        px = prices.to_numpy(dtype=float)[:, None]
+
+    equity = np.empty(signals.shape)
+    for start in range(0, len(names), block_size):
+        # column blocks bound the temporaries to T × block_size
+        cols = slice(start, start + block_size)
+        sig  = signals.iloc[:, cols].to_numpy()
+        p    = px[:, cols] if px.shape[1] > 1 else px
+        q    = qty[cols]
+
+        # 1) trade flags from signal switches
+        prev  = np.vstack([np.zeros((1, sig.shape[1]), dtype=sig.dtype), sig[:-1]])
+        buys  = (sig == 1) & (prev != 1)
+        sells = (sig == -1) & (prev != -1)
+
+        # 2) cash is path independent: a running sum of the fills
+        notional = q * p
+        flows    = np.where(buys, -(notional + commission), 0.0) + np.where(sells, notional - commission, 0.0)
+        flows[0] += initial_capital      # summed in the same order as Portfolio's cash updates
+        cash     = np.cumsum(flows, axis=0)
+
+        # 3) positions floored at zero: a random walk reflected at 0
+        walk      = np.cumsum(q * (buys.astype(float) - sells), axis=0)
+        positions = walk - np.minimum(np.minimum.accumulate(walk, axis=0), 0.0)
+
+        equity[:, cols] = cash + positions * p
+
+    return pd.DataFrame(equity, index=prices.index, columns=names)
+
+def portfolio_metrics(
+    equity: pd.DataFrame,
+    riskfree_rate: float = 0.0,
+    periods_per_year: int = 252
+) -> pd.DataFrame:
+    """
+    Per-strategy metrics of an equity matrix, one row per column:
+    'final_value', 'total_return', 'sharpe', 'max_drawdown'.
+    """
+    returns  = calculate_returns(equity)
+    wealth   = equity.to_numpy()
+    drawdown = wealth / np.maximum.accumulate(wealth, axis=0) - 1
+    return pd.DataFrame({
+        'final_value':  equity.iloc[-1],
+        'total_return': equity.iloc[-1] / equity.iloc[0] - 1,
+        'sharpe':       calculate_sharpe_ratio(returns, riskfree_rate, periods_per_year),
+        'max_drawdown': pd.Series(drawdown.min(axis=0), index=equity.columns),
+    })
 
 def compare_strategies(
     prices: pd.Series,
     strategies: Dict[str, object],
     symbol: str,
-    initial_capital: float = 100000
+    initial_capital: float = 100000,
+    cache=None
 ) -> pd.DataFrame:
     """
     Run multiple strategies and collect performance metrics.
     Returns a DataFrame indexed by strategy name with columns:
     'final_value', 'sharpe', 'max_drawdown'
+    With a utils.result_cache.ResultCache as `cache`, a rerun on the same
+    prices, strategies and parameters returns the stored metrics.
     """
-    results = []
+    if cache is not None:
+        key = checkpoint.run_key("compare_strategies", prices, symbol, initial_capital,
+                                 *[part for name, strat in strategies.items()
+                                   for part in [name, *strategy_key(strat)]])
+        return cache.get_or_compute(key, lambda: compare_strategies(prices, strategies, symbol, initial_capital))
+
+    signals, qty = {}, {}
     for name, strat in strategies.items():
-        # Handle Buy-and-Hold specially
-        if isinstance(strat, BuyAndHoldStrategy):
-            port_vals = backtest_strategy(prices, strat.generate_signals(prices),
-                                         symbol, initial_capital, qty_per_trade=int(initial_capital/prices.iloc[0]))
-        else:
-            df_signals = strat.generate_signals(prices)
-            port_vals  = backtest_strategy(prices, df_signals, symbol, initial_capital)
-
-        returns   = calculate_returns(port_vals)
-        sharpe    = calculate_sharpe_ratio(returns)
-        _, max_dd = calculate_drawdowns(port_vals)
-
-        results.append({
-            'strategy':     name,
-            'final_value':  float(port_vals.iloc[-1]),
-            'sharpe':       float(sharpe),
-            'max_drawdown': float(max_dd),
-        })
-
-    return pd.DataFrame(results).set_index('strategy')
\ No newline at end of file
+        sig = strat.generate_signals(prices)
+        signals[name] = sig["signal"] if isinstance(sig, pd.DataFrame) else sig
+        # Buy-and-Hold puts the whole capital in on the first bar
+        qty[name] = int(initial_capital/prices.iloc[0]) if isinstance(strat, BuyAndHoldStrategy) else 10
+
+    equity  = simulate_portfolios(prices, pd.DataFrame(signals), initial_capital, qty_per_trade=pd.Series(qty))
+    metrics = portfolio_metrics(equity)[['final_value', 'sharpe', 'max_drawdown']]
+    metrics.index.name = 'strategy'
+    return metrics
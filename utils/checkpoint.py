@@ -0,0 +1,103 @@
+# utils/checkpoint.py
+
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from engine.price_panel import PricePanel
+from utils.indicators import fingerprint
+
+FORMAT_VERSION = 1
+
+
+def save_state(path: str, state: dict):
+    """
+    Write `state` as one binary pickle. The file is replaced atomically, so a
+    crash mid-write leaves the previous checkpoint intact.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"version": FORMAT_VERSION, **state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_state(path: str):
+    """The state saved at `path`, or None if there is none (or it is from another format version)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    return state if state.get("version") == FORMAT_VERSION else None
+
+
+def run_key(*parts) -> str:
+    """
+    Hash identifying a run by its inputs: Series/DataFrames, PricePanels and
+    arrays by content (indicators.fingerprint), anything else by repr.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, PricePanel):
+            h.update(fingerprint(part.to_frame()).encode())
+            if part.present is not None:
+                h.update(np.packbits(part.present).tobytes())
+        elif isinstance(part, (pd.Series, pd.DataFrame)):
+            h.update(fingerprint(part).encode())
+        elif isinstance(part, np.ndarray):
+            h.update(f"{part.dtype}|{part.shape}".encode())
+            if part.dtype == object:
+                h.update(repr(part.tolist()).encode())
+            else:
+                h.update(np.ascontiguousarray(part))
+        else:
+            h.update(repr(part).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+class ResultLog:
+    """
+    Append-only file of finished results, e.g. one row per parameter set of a
+    sweep, so a restarted driver can skip what is already done.
+
+    Each record is pickled and flushed to disk as it is appended; a record
+    cut short by a crash is dropped on reload.
+    """
+    def __init__(self, path: str):
+        self.path     = path
+        self._results = {}
+        if os.path.exists(path):
+            valid = 0
+            with open(path, "rb") as f:
+                while True:
+                    try:
+                        key, value = pickle.load(f)
+                    except (EOFError, pickle.UnpicklingError):
+                        break
+                    self._results[key] = value
+                    valid = f.tell()
+            # cut a torn tail so later appends stay readable
+            if valid < os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+
+    def append(self, key: str, value):
+        with open(self.path, "ab") as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        self._results[key] = value
+
+    def get(self, key: str, default=None):
+        return self._results.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._results
+
+    def __len__(self):
+        return len(self._results)
@@ -0,0 +1,161 @@
+# utils/indicators.py
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+def fingerprint(obj) -> str:
+    """
+    Content hash of a Series/DataFrame: values, index, name / column labels.
+    Two objects with equal data get the same fingerprint, whatever their identity.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(type(obj).__name__.encode())
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+    else:
+        h.update(repr(obj.name).encode())
+    values = obj.to_numpy()
+    index  = obj.index
+    if values.dtype.kind in "biuf" and (isinstance(index, pd.DatetimeIndex) or index.dtype.kind in "iu"):
+        index_values = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+        h.update(f"{values.dtype}|{index.dtype}".encode())
+        # hash the buffers in place, column-major (a view for Series and column-major
+        # panels), so fingerprinting doesn't duplicate the data
+        h.update(np.asfortranarray(values).T if values.ndim == 2 else np.ascontiguousarray(values))
+        h.update(np.ascontiguousarray(index_values))
+    else:
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    return int(getattr(value, "nbytes", 0))
+
+
+class IndicatorCache:
+    """
+    Memoizes indicator results keyed by (input fingerprint, indicator, params).
+
+    The memory tier is an LRU bounded by `max_bytes` (and optionally
+    `max_entries`); with `disk_dir` set, every result is also pickled there so
+    another process or a later session can reuse it after eviction.
+    Results are shared between callers, so treat them as read-only.
+    """
+    def __init__(self, max_bytes: int = 256 * 2**20, max_entries: int = None, disk_dir: str = None):
+        self.max_bytes   = max_bytes
+        self.max_entries = max_entries
+        self.disk_dir    = disk_dir
+        self._entries    = OrderedDict()   # key -> (value, nbytes)
+        self._bytes      = 0
+        self._lock       = threading.Lock()
+        self.hits = self.misses = self.disk_hits = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.disk_dir, f"{name}.pkl")
+
+    def _insert(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        # a key can be inserted twice (two threads missing it at once, a disk promotion)
+        old = self._entries.pop(key, None)
+        if old:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._entries.move_to_end(key)
+        self._bytes += size
+        while self._bytes > self.max_bytes or (self.max_entries and len(self._entries) > self.max_entries):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+        if self.disk_dir and os.path.exists(self._disk_path(key)):
+            with open(self._disk_path(key), "rb") as f:
+                value = pickle.load(f)
+            with self._lock:
+                self.disk_hits += 1
+                self._insert(key, value)
+            return value
+
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._insert(key, value)
+        if self.disk_dir:
+            tmp = self._disk_path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._disk_path(key))
+        return value
+
+    def clear(self, disk: bool = False):
+        """Drop the memory tier (and the disk tier if disk=True)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if disk and self.disk_dir:
+            for f in os.listdir(self.disk_dir):
+                if f.endswith(".pkl"):
+                    os.remove(os.path.join(self.disk_dir, f))
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+_default_cache = IndicatorCache()
+
+def get_default_cache() -> IndicatorCache:
+    return _default_cache
+
+def set_default_cache(cache: IndicatorCache):
+    """Swap the process-wide cache, e.g. for one with a disk tier or a bigger budget."""
+    global _default_cache
+    _default_cache = cache
+
+
+def _cached(name, obj, params, compute, cache):
+    cache = cache if cache is not None else _default_cache
+    return cache.get_or_compute((fingerprint(obj), name, params), compute)
+
+
+# ─── Indicators ──────────────────────────────────────────────────────────────
+
+def rolling_mean(series, window: int, cache: IndicatorCache = None):
+    """series.rolling(window).mean(), memoized."""
+    return _cached("rolling_mean", series, (window,),
+                   lambda: series.rolling(window).mean(), cache)
+
+
+def rolling_std(series, window: int, ddof: int = 1, cache: IndicatorCache = None):
+    """series.rolling(window).std(ddof=ddof), memoized."""
+    return _cached("rolling_std", series, (window, ddof),
+                   lambda: series.rolling(window).std(ddof=ddof), cache)
+
+
+def pct_change(obj, periods: int = 1, cache: IndicatorCache = None):
+    """obj.pct_change(periods, fill_method=None), memoized."""
+    return _cached("pct_change", obj, (periods,),
+                   lambda: obj.pct_change(periods, fill_method=None), cache)
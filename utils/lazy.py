@@ -0,0 +1,25 @@
+# utils/lazy.py
+
+import importlib
+
+class LazyModule:
+    """
+    Stand-in for a heavy optional module: the real import happens on first
+    attribute access, e.g. `yf = LazyModule("yfinance")` then `yf.download(...)`.
+    Attributes set on the stand-in (monkeypatching in tests) take precedence.
+    """
+    def __init__(self, name: str):
+        self._name   = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
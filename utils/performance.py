@@ -2,7 +2,6 @@
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 def calculate_returns(portfolio_values, type='simple'):
     """
@@ -75,6 +74,7 @@ def calculate_drawdown(return_series: pd.Series):
                          "Drawdown": drawdowns})
 
 def plot_equity_curve(portfolio_values, drawdowns=None):
+    import matplotlib.pyplot as plt   # heavy; only needed when plotting
     fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(portfolio_values, label="Portfolio Value")
     if drawdowns is not None:
@@ -110,4 +110,145 @@ def kurtosis(r):
     # use the population standard deviation, so set dof=0
     sigma_r = r.std(ddof=0)
     exp = (demeaned_r**4).mean()
-    return exp/sigma_r**4
\ No newline at end of file
+    return exp/sigma_r**4
+
+class PerformanceAccumulator:
+    """
+    One-pass, constant-memory performance statistics over a stream of returns
+    (or equity values), fed one value or one chunk at a time.
+
+    Tracks the count, the first four central moments (Chan/Pébay updates), the
+    log growth of the compounded returns and of the excess returns, and the
+    peak / trough / worst drawdown of the log-wealth path. That is enough to
+    report annualize_rets, annualize_vol, calculate_sharpe_ratio, skewness,
+    kurtosis, compound and the maximum drawdown at any time. merge() folds in
+    the accumulator of the *following* stretch of the series, so chunks can be
+    summarised in parallel and combined in order. NaN returns are skipped, as
+    pandas does.
+    """
+    def __init__(self, periods_per_year: int = 252, riskfree_rate: float = 0.0):
+        self.periods_per_year = periods_per_year
+        self.riskfree_rate    = riskfree_rate
+        self.rf_per_period    = (1+riskfree_rate)**(1/periods_per_year)-1
+        self.n          = 0
+        self.mean       = 0.0
+        self.m2 = self.m3 = self.m4 = 0.0
+        self.log_growth = 0.0          # Σ log(1 + r)
+        self.log_excess = 0.0          # Σ log(1 + r − rf)
+        self.peak       = -np.inf      # highest log-wealth seen (relative to the start)
+        self.trough     = np.inf       # lowest log-wealth seen
+        self.worst_dd   = 0.0          # most negative log drawdown
+        self.last_equity = None
+
+    # ─── Feeding ──────────────────────────────────────────────────────────────
+
+    def update(self, returns):
+        """Consume one return or an array/Series chunk of returns."""
+        r = np.asarray(returns, dtype=float).ravel()
+        r = r[~np.isnan(r)]
+        if r.size == 0:
+            return self
+        # 1) summarise the chunk on its own …
+        chunk = PerformanceAccumulator(self.periods_per_year, self.riskfree_rate)
+        chunk.n    = r.size
+        chunk.mean = r.mean()
+        d = r - chunk.mean
+        d2 = d * d
+        chunk.m2, chunk.m3, chunk.m4 = d2.sum(), (d2 * d).sum(), (d2 * d2).sum()
+        path = np.cumsum(np.log1p(r))
+        chunk.log_growth = path[-1]
+        chunk.log_excess = np.log1p(r - self.rf_per_period).sum()
+        chunk.peak, chunk.trough = path.max(), path.min()
+        chunk.worst_dd   = min((path - np.maximum.accumulate(path)).min(), 0.0)
+        # 2) … then append it to the running state
+        return self.merge(chunk)
+
+    def update_equity(self, values):
+        """Consume equity values; returns are taken against the previous value seen."""
+        v = np.asarray(values, dtype=float).ravel()
+        if v.size == 0:
+            return self
+        if self.last_equity is None:
+            # the first equity point is itself on the wealth path (a possible peak)
+            self.peak, self.trough = max(self.peak, self.log_growth), min(self.trough, self.log_growth)
+        else:
+            v = np.concatenate([[self.last_equity], v])
+        self.last_equity = v[-1]
+        return self.update(v[1:] / v[:-1] - 1)
+
+    def merge(self, other: "PerformanceAccumulator"):
+        """Append the statistics of the stretch that follows this one (in place)."""
+        if (other.periods_per_year, other.riskfree_rate) != (self.periods_per_year, self.riskfree_rate):
+            raise ValueError("cannot merge accumulators with different periods_per_year / riskfree_rate")
+        na, nb = self.n, other.n
+        n = na + nb
+        if nb:
+            delta = other.mean - self.mean
+            m2 = self.m2 + other.m2 + delta**2 * na * nb / n
+            m3 = (self.m3 + other.m3
+                  + delta**3 * na * nb * (na - nb) / n**2
+                  + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+            m4 = (self.m4 + other.m4
+                  + delta**4 * na * nb * (na**2 - na * nb + nb**2) / n**3
+                  + 6 * delta**2 * (na**2 * other.m2 + nb**2 * self.m2) / n**2
+                  + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+            self.mean += delta * nb / n
+            self.m2, self.m3, self.m4 = m2, m3, m4
+            self.n = n
+
+        # drawdown across the seam: a peak here, a trough in `other`
+        g = self.log_growth
+        self.worst_dd = min(self.worst_dd, other.worst_dd, g + other.trough - self.peak)
+        self.peak     = max(self.peak, g + other.peak)
+        self.trough   = min(self.trough, g + other.trough)
+        self.log_growth += other.log_growth
+        self.log_excess += other.log_excess
+        if other.last_equity is not None:
+            self.last_equity = other.last_equity
+        return self
+
+    # ─── Metrics ──────────────────────────────────────────────────────────────
+
+    def std(self, ddof: int = 1) -> float:
+        return np.sqrt(self.m2 / (self.n - ddof)) if self.n > ddof else np.nan
+
+    def compound(self) -> float:
+        return np.expm1(self.log_growth)
+
+    def annualize_rets(self) -> float:
+        return np.expm1(self.log_growth * self.periods_per_year / self.n) if self.n else np.nan
+
+    def annualize_vol(self) -> float:
+        return self.std() * (self.periods_per_year**0.5)
+
+    def sharpe_ratio(self) -> float:
+        if not self.n:
+            return np.nan
+        ann_ex_ret = np.expm1(self.log_excess * self.periods_per_year / self.n)
+        return ann_ex_ret / self.annualize_vol()
+
+    def skewness(self) -> float:
+        return (self.m3 / self.n) / (self.m2 / self.n)**1.5 if self.n else np.nan
+
+    def kurtosis(self) -> float:
+        return (self.m4 / self.n) / (self.m2 / self.n)**2 if self.n else np.nan
+
+    def max_drawdown(self) -> float:
+        """Worst peak-to-trough loss as a (negative) fraction, as in calculate_drawdown."""
+        return np.expm1(self.worst_dd)
+
+    def current_drawdown(self) -> float:
+        return np.expm1(self.log_growth - self.peak) if np.isfinite(self.peak) else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "n_periods":        self.n,
+            "total_return":     self.compound(),
+            "annualized_return": self.annualize_rets(),
+            "annualized_vol":   self.annualize_vol(),
+            "sharpe":           self.sharpe_ratio(),
+            "skewness":         self.skewness(),
+            "kurtosis":         self.kurtosis(),
+            "max_drawdown":     self.max_drawdown(),
+            "current_drawdown": self.current_drawdown(),
+        }
@@ -0,0 +1,178 @@
+# utils/profiling.py
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+class NullProfiler:
+    """
+    Disabled instrumentation: every hook is a no-op, so instrumented code pays
+    one method call per phase (not per bar) and nothing else.
+    """
+    enabled = False
+    _noop   = nullcontext()
+
+    def phase(self, name):
+        return self._noop
+
+    def add_time(self, name, wall_ns, cpu_ns, calls=1):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class RunProfiler:
+    """
+    Opt-in instrumentation for one backtest run.
+
+    phase(name) is a context manager timing wall and CPU time of a (possibly
+    nested) phase; add_time() folds in time measured in many small slices
+    (e.g. one per bar) under the current phase; count() bumps a named counter.
+    With track_allocations=True each phase also records its net and peak
+    traced allocations (tracemalloc, which slows the run noticeably); with
+    cprofile=True the whole run is also profiled by cProfile.
+
+    Results: report() (dict), to_frame(), to_chrome_trace(path) for
+    chrome://tracing / Perfetto, and dump_stats(path) for pstats / snakeviz.
+    """
+    enabled = True
+
+    def __init__(self, track_allocations: bool = False, cprofile: bool = False):
+        self.track_allocations = track_allocations
+        self.cprofile          = cprofile
+        self.counters  = {}
+        self.events    = []       # one dict per phase occurrence, in completion order
+        self._totals   = {}       # path -> aggregated wall/cpu/calls/allocations
+        self._stack    = []       # open phases: (path, peak-so-far holder)
+        self._origin   = time.perf_counter_ns()
+        self._profile  = None
+
+    # ─── Hooks ────────────────────────────────────────────────────────────────
+
+    def _path(self, name):
+        return f"{self._stack[-1][0]}/{name}" if self._stack else name
+
+    def _total(self, path):
+        total = self._totals.get(path)
+        if total is None:
+            total = self._totals[path] = {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0}
+        return total
+
+    @contextmanager
+    def phase(self, name):
+        path  = self._path(name)
+        frame = [path, 0]
+        if self.track_allocations and tracemalloc.is_tracing():
+            # keep the enclosing phase's peak, then measure ours from here
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], tracemalloc.get_traced_memory()[1])
+            mem0 = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        wall0, cpu0 = time.perf_counter_ns(), time.process_time_ns()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter_ns() - wall0, time.process_time_ns() - cpu0
+            self._stack.pop()
+            total = self._total(path)
+            total["wall_s"] += wall / 1e9
+            total["cpu_s"]  += cpu / 1e9
+            total["calls"]  += 1
+            event = {"path": path, "start_ns": wall0 - self._origin, "wall_ns": wall, "cpu_ns": cpu}
+            if self.track_allocations and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame[1])
+                event["alloc_net_bytes"]  = current - mem0
+                event["alloc_peak_bytes"] = peak - mem0
+                total["alloc_net_bytes"]  = total.get("alloc_net_bytes", 0) + event["alloc_net_bytes"]
+                total["alloc_peak_bytes"] = max(total.get("alloc_peak_bytes", 0), event["alloc_peak_bytes"])
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+            self.events.append(event)
+
+    def add_time(self, name, wall_ns, cpu_ns, calls=1):
+        total = self._total(self._path(name))
+        total["wall_s"] += wall_ns / 1e9
+        total["cpu_s"]  += cpu_ns / 1e9
+        total["calls"]  += calls
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def session(self):
+        """Wrap a whole run: starts tracemalloc / cProfile if requested."""
+        started_tracing = False
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        if self.cprofile:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        try:
+            yield self
+        finally:
+            if self._profile is not None:
+                self._profile.disable()
+            if started_tracing:
+                tracemalloc.stop()
+
+    # ─── Results ──────────────────────────────────────────────────────────────
+
+    def report(self) -> dict:
+        """{"phases": {path: {wall_s, cpu_s, calls[, alloc_*]}}, "counters": {...}}"""
+        return {
+            "phases":   {path: dict(total) for path, total in self._totals.items()},
+            "counters": dict(self.counters),
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per phase path (nesting shown by '/'), in first-seen order."""
+        frame = pd.DataFrame.from_dict(self._totals, orient="index")
+        frame.index.name = "phase"
+        return frame
+
+    def to_chrome_trace(self, path=None) -> dict:
+        """
+        Chrome trace-event JSON: one complete ("X") event per phase occurrence
+        and the counters as a final "C" event. Written to `path` if given.
+        """
+        trace = [{
+            "name": event["path"].rsplit("/", 1)[-1],
+            "cat":  "backtest",
+            "ph":   "X",
+            "ts":   event["start_ns"] / 1e3,
+            "dur":  event["wall_ns"] / 1e3,
+            "pid":  0,
+            "tid":  0,
+            "args": {k: v for k, v in event.items() if k not in ("path", "start_ns", "wall_ns")},
+        } for event in self.events]
+        end = max((e["start_ns"] + e["wall_ns"] for e in self.events), default=0)
+        if self.counters:
+            trace.append({"name": "counters", "ph": "C", "ts": end / 1e3, "pid": 0, "tid": 0,
+                          "args": dict(self.counters)})
+        doc = {"traceEvents": trace, "displayTimeUnit": "ms"}
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(doc, f)
+        return doc
+
+    def stats(self):
+        """pstats.Stats of the run (requires cprofile=True)."""
+        if self._profile is None:
+            raise RuntimeError("run was not profiled with cprofile=True")
+        import pstats
+        return pstats.Stats(self._profile)
+
+    def dump_stats(self, path):
+        """Write cProfile stats to `path` (readable by pstats, snakeviz, gprof2dot)."""
+        self.stats().dump_stats(path)
@@ -0,0 +1,141 @@
+# utils/result_cache.py
+
+import inspect
+import os
+import pickle
+import time
+
+from utils import checkpoint
+
+def strategy_key(strategy) -> list:
+    """
+    run_key parts identifying a strategy: its class and its constructor
+    parameters, read off the instance under the same names (data such as a
+    fixed signal frame is hashed by content). State set while generating
+    signals (fitted ratios, streaming windows) is left out, so a rerun of the
+    same object hits. A class that doesn't keep its parameters under their
+    own names falls back to all its public attributes.
+    """
+    cls   = type(strategy)
+    parts = [f"{cls.__module__}.{cls.__qualname__}"]
+    names = [name for name, param in inspect.signature(cls.__init__).parameters.items()
+             if name != "self" and param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD)]
+    if all(hasattr(strategy, name) for name in names):
+        for name in names:
+            parts += [name, getattr(strategy, name)]
+    else:
+        for name, value in sorted(vars(strategy).items()):
+            if not name.startswith("_"):
+                parts += [name, value]
+    return parts
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk store of run results (Backtester.run histories,
+    compare_strategies metrics), one pickle per key under `root`.
+
+    Keys hash the inputs only (checkpoint.run_key): prices, strategy class and
+    parameters, and the run settings. They don't see code changes, so call
+    invalidate(key) or clear() after editing a strategy or the engine.
+    Once the files pass `max_bytes`, the least recently used are removed.
+    `hits`, `misses` and `saved_seconds` (compute time the hits skipped)
+    show what the cache saves; see stats().
+    """
+    def __init__(self, root: str = "cache/results", max_bytes: int = 2**30):
+        self.root      = root
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self.saved_seconds = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def _load(self, key: str):
+        path = self._path(key)
+        try:
+            entry = checkpoint.load_state(path)
+        except (EOFError, pickle.UnpicklingError):
+            entry = None      # unreadable: recompute and overwrite it
+        if entry is not None:
+            os.utime(path)    # recently used, for eviction
+        return entry
+
+    def get(self, key: str, default=None):
+        entry = self._load(key)
+        return default if entry is None else entry["value"]
+
+    def put(self, key: str, value, seconds: float = 0.0):
+        """Store `value` under `key`; `seconds` is what computing it took."""
+        checkpoint.save_state(self._path(key), {"value": value, "seconds": seconds})
+        self._evict(keep=key)
+
+    def get_or_compute(self, key: str, compute):
+        entry = self._load(key)
+        if entry is not None:
+            self.hits          += 1
+            self.saved_seconds += entry["seconds"]
+            return entry["value"]
+        t0    = time.perf_counter()
+        value = compute()
+        self.misses += 1
+        self.put(key, value, time.perf_counter() - t0)
+        return value
+
+    def invalidate(self, key: str) -> bool:
+        """Drop one entry; True if there was one."""
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self):
+        for key in self._keys():
+            self.invalidate(key)
+
+    # ─── Size ─────────────────────────────────────────────────────────────────
+
+    def _entries(self) -> list:
+        # (last used, bytes, key) of every stored result
+        out = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                out.append((stat.st_mtime, stat.st_size, entry.name[:-len(".pkl")]))
+        return out
+
+    def _keys(self) -> list:
+        return [key for _, _, key in self._entries()]
+
+    def _evict(self, keep: str = None):
+        entries = sorted(self._entries())
+        total   = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key != keep or size > self.max_bytes:
+                self.invalidate(key)
+                total -= size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def __len__(self):
+        return len(self._entries())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits":          self.hits,
+            "misses":        self.misses,
+            "hit_rate":      self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "entries":       len(self),
+            "nbytes":        self.nbytes,
+        }
@@ -1,9 +1,51 @@
 # utils/risk.py
 
+from functools import lru_cache
+from statistics import NormalDist
+
 import numpy as np
 import pandas as pd
 
 from utils.performance import skewness, kurtosis
+from utils.rolling import SortedWindows, rolling_quantile_tail
+
+@lru_cache(maxsize=256)
+def normal_quantile(p: float) -> float:
+    """
+    Standard normal quantile Φ⁻¹(p), closed form (no sampling, no scipy), memoized per level.
+    """
+    return NormalDist().inv_cdf(p)
+
+def _normal_pdf(z):
+    return np.exp(-0.5 * z * z) / np.sqrt(2 * np.pi)
+
+def _cornish_fisher(z, s, k):
+    """
+    Cornish-Fisher adjusted quantile for skewness s and (non-excess) kurtosis k.
+    Works elementwise on floats, arrays, Series and DataFrames.
+    """
+    return (z +
+            (z**2 - 1)*s/6 +
+            (z**3 - 3*z)*(k-3)/24 -
+            (2*z**3 - 5*z)*(s**2)/36
+        )
+
+def _tail_mean(z, level, s=0.0, k=3.0):
+    """
+    E[Z_cf | Z <= z] for the Cornish-Fisher transform of a standard normal Z,
+    from the closed-form partial moments M_j = ∫_{-inf}^{z} x^j φ(x) dx.
+    With s=0, k=3 it is the Gaussian tail mean -φ(z)/level.
+    """
+    phi = _normal_pdf(z)
+    m0  = level
+    m1  = -phi
+    m2  = level - z * phi
+    m3  = -(z**2 + 2) * phi
+    return (m1 +
+            (m2 - m0)*s/6 +
+            (m3 - 3*m1)*(k-3)/24 -
+            (2*m3 - 5*m1)*(s**2)/36
+        ) / level
 
 def historical_var(returns: pd.Series, level: float = 0.05) -> float:
     """
@@ -15,13 +57,69 @@ def historical_var(returns: pd.Series, level: float = 0.05) -> float:
     var = -np.percentile(returns, level * 100)
     return var
 
-def parametric_var(returns: pd.Series, level: float = 0.05) -> float:
+def parametric_var(returns, level: float = 0.05, modified: bool = False, ddof: int = 1):
+    """
+    Parametric VaR: -(μ + σ * z), where z is the normal quantile at `level`
+    (Cornish-Fisher adjusted if modified=True). A DataFrame is evaluated
+    column-wise in one pass and gives a Series.
+    """
+    z = normal_quantile(level)
+    if modified:
+        z = _cornish_fisher(z, skewness(returns), kurtosis(returns))
+    return -(returns.mean() + z * returns.std(ddof=ddof))
+
+def parametric_es(returns, level: float = 0.05, modified: bool = False, ddof: int = 1):
+    """
+    Parametric Expected Shortfall: -(μ + σ * E[z | z <= z_level]), closed form
+    for both the Gaussian and the Cornish-Fisher case. Column-wise on a DataFrame.
+    """
+    z = normal_quantile(level)
+    if modified:
+        tail = _tail_mean(z, level, skewness(returns), kurtosis(returns))
+    else:
+        tail = _tail_mean(z, level)
+    return -(returns.mean() + tail * returns.std(ddof=ddof))
+
+def _rolling_moments(returns, window: int, ddof: int = 1):
     """
-    Gaussian VaR: μ + σ * z, where z is the normal quantile
+    Rolling mean, std (with ddof) and population skewness / kurtosis, from
+    rolling means of the first four powers: each is an O(1) add/remove per bar,
+    so a long history costs O(n) whatever the window length.
     """
-    mu, sigma = returns.mean(), returns.std()
-    z = np.abs( np.percentile(np.random.randn(1_000_000), level * 100) )
-    return -(mu + sigma * z)
+    # centre on the full-sample mean so the power sums stay well conditioned
+    centre = returns.mean()
+    x   = returns - centre
+    e1  = x.rolling(window).mean()
+    e2  = (x**2).rolling(window).mean()
+    e3  = (x**3).rolling(window).mean()
+    e4  = (x**4).rolling(window).mean()
+
+    m2  = (e2 - e1**2).clip(lower=0)
+    m3  = e3 - 3*e1*e2 + 2*e1**3
+    m4  = e4 - 4*e1*e3 + 6*e1**2*e2 - 3*e1**4
+    std = np.sqrt(m2 * window / (window - ddof))
+    return e1 + centre, std, m3 / m2**1.5, m4 / m2**2
+
+def rolling_parametric_var(returns, window: int, level: float = 0.05,
+                           modified: bool = False, ddof: int = 1):
+    """
+    parametric_var over every trailing `window` of returns (NaN until the window fills).
+    """
+    mu, sigma, s, k = _rolling_moments(returns, window, ddof)
+    z = normal_quantile(level)
+    if modified:
+        z = _cornish_fisher(z, s, k)
+    return -(mu + z * sigma)
+
+def rolling_parametric_es(returns, window: int, level: float = 0.05,
+                          modified: bool = False, ddof: int = 1):
+    """
+    parametric_es over every trailing `window` of returns (NaN until the window fills).
+    """
+    mu, sigma, s, k = _rolling_moments(returns, window, ddof)
+    z = normal_quantile(level)
+    tail = _tail_mean(z, level, s, k) if modified else _tail_mean(z, level)
+    return -(mu + tail * sigma)
 
 def expected_shortfall(returns: pd.Series, level: float = 0.05) -> float:
     """
@@ -33,6 +131,89 @@ def expected_shortfall(returns: pd.Series, level: float = 0.05) -> float:
     tail   = returns[returns <= cutoff]
     return -tail.mean()
 
+class RollingTailRisk:
+    """
+    Historical VaR and Expected Shortfall for every column of a return panel,
+    over a rolling `window` of bars (or an expanding history if window=None).
+
+    run() evaluates a whole history at once with rank-indexed Fenwick trees
+    (utils.rolling.rolling_quantile_tail); update() then advances one sorted
+    window per column (utils.rolling.SortedWindows) by one day, an
+    O(columns × window) vectorized step instead of a re-sort. Values match
+    historical_var / expected_shortfall on the same window; windows that are
+    not full yet, or contain a NaN, give NaN.
+    """
+    def __init__(self, columns, window: int = None, level: float = 0.05):
+        self.columns = pd.Index(columns)
+        self.window  = window
+        self.level   = level
+        self.reset()
+
+    def reset(self):
+        self._windows = SortedWindows(len(self.columns), self.window)
+
+    def update(self, row) -> tuple:
+        """Push one day of returns (Series aligned on columns, or array); returns (var, es) Series."""
+        if isinstance(row, pd.Series):
+            row = row.reindex(self.columns)
+        self._windows.push(row)
+        var, es = self._current()
+        return pd.Series(var, index=self.columns), pd.Series(es, index=self.columns)
+
+    def _current(self):
+        w = self._windows
+        if not w.ready:
+            nan = np.full(len(self.columns), np.nan)
+            return nan, nan.copy()
+        # np.percentile(returns, level * 100) works with q = level * 100 / 100
+        cutoff = w.quantile(np.true_divide(self.level * 100, 100))
+        tail   = w.tail_mean(cutoff)
+        bad    = w.nan_count > 0
+        return np.where(bad, np.nan, -cutoff), np.where(bad, np.nan, -tail)
+
+    def run(self, returns: pd.DataFrame) -> tuple:
+        """Push every row of `returns`; returns (var, es) DataFrames on the same index."""
+        values = returns.reindex(columns=self.columns).to_numpy(dtype=float)
+        if self._windows.count:
+            # continuing a stream: step day by day from the current windows
+            var = np.empty_like(values)
+            es  = np.empty_like(values)
+            for i in range(len(values)):
+                self._windows.push(values[i])
+                var[i], es[i] = self._current()
+        else:
+            cutoff, tail  = rolling_quantile_tail(values, self.window, np.true_divide(self.level * 100, 100))
+            var, es       = -cutoff, -tail
+            self._windows = SortedWindows.from_values(values, self.window)
+        return (pd.DataFrame(var, index=returns.index, columns=self.columns),
+                pd.DataFrame(es, index=returns.index, columns=self.columns))
+
+
+def _tail_risk(returns, window, level):
+    frame  = returns.to_frame() if isinstance(returns, pd.Series) else returns
+    var, es = RollingTailRisk(frame.columns, window, level).run(frame)
+    if isinstance(returns, pd.Series):
+        return var.iloc[:, 0], es.iloc[:, 0]
+    return var, es
+
+def rolling_tail_risk(returns, window: int, level: float = 0.05) -> tuple:
+    """
+    (historical VaR, expected shortfall) over every trailing `window` of a Series or DataFrame.
+    """
+    return _tail_risk(returns, window, level)
+
+def expanding_tail_risk(returns, level: float = 0.05) -> tuple:
+    """
+    (historical VaR, expected shortfall) over the whole history up to each date.
+    """
+    return _tail_risk(returns, None, level)
+
+def rolling_historical_var(returns, window: int, level: float = 0.05):
+    return rolling_tail_risk(returns, window, level)[0]
+
+def rolling_expected_shortfall(returns, window: int, level: float = 0.05):
+    return rolling_tail_risk(returns, window, level)[1]
+
 def var_historic(r, level=5):
     """
     Returns the historic Value at Risk at a specified level
@@ -40,7 +221,8 @@ def var_historic(r, level=5):
     fall below that number, and the (100-level) percent are above
     """
     if isinstance(r, pd.DataFrame):
-        return r.aggregate(var_historic, level=level)
+        # all columns in one partition pass rather than one call per column
+        return pd.Series(-np.percentile(r.to_numpy(), level, axis=0), index=r.columns)
     elif isinstance(r, pd.Series):
         return -np.percentile(r, level)
     else:
@@ -55,27 +237,15 @@ def cvar_historic(r, level=5):
         is_beyond = r <= -var_historic(r, level=level)
         return -r[is_beyond].mean()
     elif isinstance(r, pd.DataFrame):
-        return r.aggregate(cvar_historic, level=level)
+        return -r.where(r <= -var_historic(r, level=level)).mean()
     else:
         raise TypeError("Expected r to be a Series or DataFrame")
 
 
-from scipy.stats import norm
 def var_gaussian(r, level=5, modified=False):
     """
     Returns the Parametric Gauusian VaR of a Series or DataFrame
     If "modified" is True, then the modified VaR is returned,
     using the Cornish-Fisher modification
     """
-    # compute the Z score assuming it was Gaussian
-    z = norm.ppf(level/100)
-    if modified:
-        # modify the Z score based on observed skewness and kurtosis
-        s = skewness(r)
-        k = kurtosis(r)
-        z = (z +
-                (z**2 - 1)*s/6 +
-                (z**3 -3*z)*(k-3)/24 -
-                (2*z**3 - 5*z)*(s**2)/36
-            )
-    return -(r.mean() + z*r.std(ddof=0))
+    return parametric_var(r, level=level/100, modified=modified, ddof=0)
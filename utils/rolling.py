@@ -0,0 +1,308 @@
+# utils/rolling.py
+
+import math
+
+import numpy as np
+
+class RollingWindow:
+    """
+    Fixed-size window over a stream of floats with O(1) updates.
+
+    Keeps a ring buffer of the last `size` values plus running count, mean and
+    sum of squared deviations (Welford add/remove), so memory is constant no
+    matter how many values have been pushed. Follows pandas rolling(size)
+    semantics: statistics are NaN until `size` non-NaN values fill the window,
+    and a window of identical values has exactly that mean and zero variance.
+    """
+    def __init__(self, size: int, resync_every: int = 10_000):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size         = size
+        self.resync_every = resync_every
+        self.reset()
+
+    def reset(self):
+        self._buf    = [math.nan] * self.size
+        self._pos    = 0      # next slot to overwrite
+        self._seen   = 0      # total values pushed
+        self._nobs   = 0      # non-NaN values in the window
+        self._mean   = 0.0
+        self._ssqdm  = 0.0
+        self._run    = 0      # length of the current run of identical values
+        self._last   = math.nan
+
+    def _add(self, x):
+        self._nobs += 1
+        delta = x - self._mean
+        self._mean += delta / self._nobs
+        self._ssqdm += delta * (x - self._mean)
+
+    def _remove(self, x):
+        self._nobs -= 1
+        if self._nobs == 0:
+            self._mean, self._ssqdm = 0.0, 0.0
+            return
+        delta = x - self._mean
+        self._mean -= delta / self._nobs
+        self._ssqdm -= delta * (x - self._mean)
+
+    def _resync(self):
+        # bound floating-point drift of the running moments: O(size) every resync_every pushes
+        values = [v for v in self._buf if not math.isnan(v)]
+        self._nobs  = len(values)
+        self._mean  = sum(values) / self._nobs if values else 0.0
+        self._ssqdm = sum((v - self._mean) ** 2 for v in values)
+
+    def push(self, x: float):
+        x = float(x)
+        old = self._buf[self._pos]
+        self._buf[self._pos] = x
+        self._pos = (self._pos + 1) % self.size
+        self._seen += 1
+
+        if not math.isnan(old):
+            self._remove(old)
+        if not math.isnan(x):
+            self._add(x)
+
+        self._run  = self._run + 1 if x == self._last else (0 if math.isnan(x) else 1)
+        self._last = x
+
+        if self._seen % self.resync_every == 0:
+            self._resync()
+
+    @property
+    def ready(self) -> bool:
+        """True once the window holds `size` non-NaN values."""
+        return self._nobs == self.size
+
+    def mean(self) -> float:
+        if not self.ready:
+            return math.nan
+        if self._run >= self.size:
+            return self._last
+        return self._mean
+
+    def var(self, ddof: int = 1) -> float:
+        if not self.ready or self._nobs <= ddof:
+            return math.nan
+        if self._run >= self.size:
+            return 0.0
+        return max(self._ssqdm / (self._nobs - ddof), 0.0)
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(self.var(ddof))
+
+
+class SortedWindows:
+    """
+    One sorted window per column of a panel, advanced a whole row at a time.
+
+    Each push inserts the new value of every column into its sorted row (and,
+    once a fixed `size` is reached, drops the value that fell out) with
+    O(columns × size) vectorized work and no re-sorting, so order statistics
+    and tail sums of every window are available after each bar. size=None
+    gives expanding windows that grow with the stream. NaN is kept sorted as
+    +inf and counted, so callers can mask windows that contain one.
+    """
+    def __init__(self, n_columns: int, size: int = None, capacity: int = 256):
+        if size is not None and size < 1:
+            raise ValueError("size must be >= 1")
+        self.n_columns = n_columns
+        self.size      = size
+        cap = size if size is not None else capacity
+        self._sorted   = np.full((n_columns, cap), np.inf)
+        self._ring     = np.full((n_columns, size), np.inf) if size is not None else None
+        self._pos      = 0
+        self.count     = 0                                   # values currently in each window
+        self.nan_count = np.zeros(n_columns, dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, values, size: int = None) -> "SortedWindows":
+        """Windows as they stand after pushing every row of `values` (sorted once, not row by row)."""
+        values = np.asarray(values, dtype=float)
+        n, m   = values.shape
+        win    = cls(m, size, capacity=max(n, 1))
+        recent = values if size is None else values[max(0, n - size):]
+        filled = np.where(np.isnan(recent), np.inf, recent).T
+        k      = filled.shape[1]
+        win._sorted[:, :k] = np.sort(filled, axis=1)
+        win.count     = k
+        win.nan_count = np.isnan(recent).sum(axis=0)
+        if size is not None:
+            win._ring[:, :k] = filled
+            win._pos = k % size
+        return win
+
+    def _grow(self):
+        grown = np.full((self.n_columns, 2 * self._sorted.shape[1]), np.inf)
+        grown[:, :self.count] = self._sorted[:, :self.count]
+        self._sorted = grown
+
+    def push(self, row):
+        x     = np.asarray(row, dtype=float).reshape(self.n_columns)
+        isnan = np.isnan(x)
+        x     = np.where(isnan, np.inf, x)
+        self.nan_count += isnan
+
+        if self.size is not None and self.count == self.size:
+            # 1) replace the oldest value: drop it at p, insert x at q
+            old = self._ring[:, self._pos]
+            self.nan_count -= np.isposinf(old)
+            S = self._sorted
+            j = np.arange(self.size)
+            p = (S < old[:, None]).sum(axis=1)[:, None]
+            q = ((S < x[:, None]).sum(axis=1) - (old < x))[:, None]
+            src = np.where((j >= p) & (j < q), j + 1, j)
+            src = np.where((j > q) & (j <= p), j - 1, src)
+            self._sorted = np.where(j == q, x[:, None], np.take_along_axis(S, src, axis=1))
+        else:
+            # 2) window still filling: insert x at q, shift the rest right
+            if self.count == self._sorted.shape[1]:
+                self._grow()
+            k = self.count + 1
+            S = self._sorted[:, :k]
+            j = np.arange(k)
+            q = (S[:, :-1] < x[:, None]).sum(axis=1)[:, None]
+            src = np.where(j > q, j - 1, j)
+            self._sorted[:, :k] = np.where(j == q, x[:, None], np.take_along_axis(S, src, axis=1))
+            self.count = k
+
+        if self._ring is not None:
+            self._ring[:, self._pos] = x
+            self._pos = (self._pos + 1) % self.size
+
+    @property
+    def ready(self) -> bool:
+        """True once every window holds `size` values (any value, for expanding windows)."""
+        return self.count == self.size if self.size is not None else self.count > 0
+
+    def values(self) -> np.ndarray:
+        """(n_columns, count) view of the sorted windows; NaN appear as +inf at the end."""
+        return self._sorted[:, :self.count]
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Per-column quantile with np.percentile's default linear interpolation."""
+        n = self.count
+        if n == 0:
+            return np.full(self.n_columns, np.nan)
+        # same virtual index and lerp as numpy's "linear" method, so results match np.quantile
+        lo = min(int(np.floor((n - 1) * q)), n - 1)
+        hi = min(lo + 1, n - 1)
+        return _linear_quantile(self._sorted[:, lo], self._sorted[:, hi], lo, q, n)
+
+    def tail_mean(self, cutoff) -> np.ndarray:
+        """Per-column mean of the window values <= cutoff."""
+        S    = self.values()
+        tail = S <= np.asarray(cutoff, dtype=float)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(tail, S, 0.0).sum(axis=1) / tail.sum(axis=1)
+
+
+def _linear_quantile(a, b, lo, q, n):
+    # numpy's "linear" lerp between the lo-th and next order statistics
+    gamma = (n - 1) * q - lo
+    with np.errstate(invalid="ignore"):
+        diff = b - a
+        return b - diff * (1 - gamma) if gamma >= 0.5 else a + diff * gamma
+
+
+def rolling_quantile_tail(values, size: int = None, q: float = 0.05) -> tuple:
+    """
+    Batch quantile and tail mean of every trailing window of every column.
+
+    `values` is an (n_bars, n_columns) array; for each bar and column returns
+    the q-quantile of the last `size` values (the whole history so far if
+    size=None), with np.quantile's linear interpolation, and the mean of the
+    window values <= that quantile. Bars whose window is not full, or holds
+    a NaN, give NaN.
+
+    The whole history is known up front, so each column is ranked once and the
+    windows live in Fenwick trees over those ranks (one count tree, one sum
+    tree per column, all columns stepped together): adding, dropping and
+    selecting the k-th value are O(log n) per bar, with no per-window sort.
+    """
+    values = np.asarray(values, dtype=float)
+    n, m   = values.shape
+    isnan  = np.isnan(values)
+    quant  = np.full((n, m), np.nan)
+    tail   = np.full((n, m), np.nan)
+    if n == 0:
+        return quant, tail
+
+    # 1) rank each column once; NaN sort last and carry no weight in the sum tree
+    order   = np.argsort(values, axis=0, kind="stable")
+    ranks   = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(n)[:, None], axis=0)
+    by_rank = np.take_along_axis(values, order, axis=0)
+    # upper[r]: last rank holding the same value as rank r (tie run end)
+    run_end = np.ones((n, m), dtype=bool)
+    run_end[:-1] = by_rank[1:] != by_rank[:-1]
+    upper   = np.where(run_end, np.arange(n)[:, None], n)
+    upper   = np.minimum.accumulate(upper[::-1], axis=0)[::-1]
+    weights = np.where(isnan, 0.0, values)
+    nan_cum = np.concatenate([np.zeros((1, m), dtype=np.int64), np.cumsum(isnan, axis=0)])
+
+    # 2) Fenwick trees, flattened so node i of column c lives at i * m + c
+    cols  = np.arange(m)
+    cnt   = np.zeros((n + 1) * m, dtype=np.int64)
+    tot   = np.zeros((n + 1) * m)
+    top   = 1 << int(n).bit_length()
+
+    def add(rank, dc, dv):
+        node = rank + 1
+        while True:
+            live = node <= n
+            if not live.any():
+                return
+            idx = node[live] * m + cols[live]
+            cnt[idx] += dc
+            tot[idx] += dv[live]
+            node = node + (node & -node)
+
+    def select(k):
+        # rank of the k-th smallest (0-based) value in each column's window
+        pos, rem, step = np.zeros(m, dtype=np.int64), np.full(m, k + 1), top
+        while step:
+            nxt  = pos + step
+            live = nxt <= n
+            c    = np.where(live, cnt[np.where(live, nxt, 0) * m + cols], 0)
+            go   = live & (c < rem)
+            pos  = np.where(go, nxt, pos)
+            rem  = np.where(go, rem - c, rem)
+            step >>= 1
+        return pos
+
+    def prefix(rank):
+        # (count, sum) over ranks 0..rank of each column's window
+        node, c, s = rank + 1, np.zeros(m, dtype=np.int64), np.zeros(m)
+        while True:
+            live = node > 0
+            if not live.any():
+                return c, s
+            idx  = np.where(live, node, 0) * m + cols
+            c   += np.where(live, cnt[idx], 0)
+            s   += np.where(live, tot[idx], 0.0)
+            node = node - (node & -node)
+
+    # 3) slide
+    for i in range(n):
+        add(ranks[i], 1, weights[i])
+        if size is not None and i >= size:
+            add(ranks[i - size], -1, -weights[i - size])
+        k = i + 1 if size is None else min(i + 1, size)
+        if size is not None and k < size:
+            continue
+        lo     = min(int(np.floor((k - 1) * q)), k - 1)
+        hi     = min(lo + 1, k - 1)
+        r_lo, r_hi = select(lo), (select(hi) if hi != lo else None)
+        a      = by_rank[r_lo, cols]
+        b      = by_rank[r_hi, cols] if r_hi is not None else a
+        cutoff = _linear_quantile(a, b, lo, q, k)
+        edge   = np.where(b <= cutoff, r_hi, r_lo) if r_hi is not None else r_lo
+        c, s   = prefix(upper[edge, cols])
+        bad    = nan_cum[i + 1] - nan_cum[i + 1 - k] > 0
+        quant[i] = np.where(bad, np.nan, cutoff)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tail[i] = np.where(bad, np.nan, s / c)
+    return quant, tail
@@ -0,0 +1,146 @@
+# utils/stops.py
+
+import numpy as np
+
+try:
+    import numba                 # optional: pip install numba
+except ImportError:
+    numba = None
+
+ENGINES = ("auto", "numba", "python")
+
+# Codes of the `kinds` array simulate_stops returns
+NO_STOP, STOP_LOSS, TAKE_PROFIT = 0, 1, 2
+
+# Above this many symbols the "python" engine steps whole rows with NumPy instead
+ROWS_MIN_SYMBOLS = 128
+
+
+def _stop_column(px, buys, sells, pos, last_px, qty, slip, stop_loss, take_profit, kinds, pos_mid, pos_end):
+    """
+    One symbol, one scalar step per bar in the loop's order: the stop check on
+    the position and entry price so far, then the signal fill. Written so the
+    same code runs on Python lists (fallback) and compiles under numba.
+    """
+    for t in range(len(px)):
+        price = px[t]
+        # a zero entry price counts as none, like the loop's `last_trade_price(sym) or np.nan`
+        if pos != 0 and last_px != 0.0:
+            pnl  = (price - last_px) / last_px
+            kind = NO_STOP
+            if stop_loss and pnl <= -stop_loss:
+                kind = STOP_LOSS
+            elif take_profit and pnl >= take_profit:
+                kind = TAKE_PROFIT
+            if kind != NO_STOP:
+                kinds[t] = kind
+                last_px  = price - price * slip
+                pos      = max(pos - qty, 0)
+        pos_mid[t] = pos
+        if buys[t]:
+            last_px = price + price * slip
+            pos     = pos + qty
+        elif sells[t]:
+            last_px = price - price * slip
+            pos     = max(pos - qty, 0)
+        pos_end[t] = pos
+
+
+def _stops_python(prices, buys, sells, pos0, last_px0, qty, slip, stop_loss, take_profit):
+    n_bars, n_syms = prices.shape
+    kinds   = np.zeros((n_bars, n_syms), dtype=np.int8)
+    pos_mid = np.empty((n_bars, n_syms), dtype=np.int64)
+    pos_end = np.empty((n_bars, n_syms), dtype=np.int64)
+    for j in range(n_syms):
+        # lists: scalar indexing and float maths on them are several times
+        # cheaper in CPython than on NumPy scalars
+        col_kinds, col_mid, col_end = [NO_STOP] * n_bars, [0] * n_bars, [0] * n_bars
+        _stop_column(prices[:, j].tolist(), buys[:, j].tolist(), sells[:, j].tolist(),
+                     int(pos0[j]), float(last_px0[j]), qty, slip, stop_loss, take_profit,
+                     col_kinds, col_mid, col_end)
+        kinds[:, j], pos_mid[:, j], pos_end[:, j] = col_kinds, col_mid, col_end
+    return kinds, pos_mid, pos_end
+
+
+def _stops_rows(prices, buys, sells, pos0, last_px0, qty, slip, stop_loss, take_profit):
+    """Walks the bars with whole-row NumPy operations; cheaper than _stops_python for wide panels."""
+    n_bars, n_syms = prices.shape
+    kinds   = np.zeros((n_bars, n_syms), dtype=np.int8)
+    pos_mid = np.empty((n_bars, n_syms), dtype=np.int64)
+    pos_end = np.empty((n_bars, n_syms), dtype=np.int64)
+    pos     = pos0.copy()
+    last_px = last_px0.copy()
+    for t in range(n_bars):
+        px = prices[t]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pnl_pct = (px - last_px) / last_px
+        held = (pos != 0) & (last_px != 0.0)
+        sl   = held & (pnl_pct <= -stop_loss) if stop_loss else np.zeros(n_syms, dtype=bool)
+        tp   = held & ~sl & (pnl_pct >= take_profit) if take_profit else np.zeros(n_syms, dtype=bool)
+        hit  = sl | tp
+        kinds[t] = np.where(sl, STOP_LOSS, np.where(tp, TAKE_PROFIT, NO_STOP))
+        last_px  = np.where(hit, px - px * slip, last_px)
+        pos      = np.where(hit, np.maximum(pos - qty, 0), pos)
+        pos_mid[t] = pos
+
+        last_px = np.where(buys[t], px + px * slip, np.where(sells[t], px - px * slip, last_px))
+        pos     = np.where(buys[t], pos + qty, np.where(sells[t], np.maximum(pos - qty, 0), pos))
+        pos_end[t] = pos
+    return kinds, pos_mid, pos_end
+
+
+def _stops_numba(prices, buys, sells, pos0, last_px0, qty, slip, stop_loss, take_profit):
+    # column-major copies, so every symbol's step reads and writes contiguous memory
+    prices, buys, sells = np.asfortranarray(prices), np.asfortranarray(buys), np.asfortranarray(sells)
+    kinds   = np.zeros(prices.shape, dtype=np.int8, order="F")
+    pos_mid = np.empty(prices.shape, dtype=np.int64, order="F")
+    pos_end = np.empty(prices.shape, dtype=np.int64, order="F")
+    _stop_columns_jit(prices, buys, sells, pos0, last_px0, qty, slip, stop_loss, take_profit,
+                      kinds, pos_mid, pos_end)
+    return kinds, pos_mid, pos_end
+
+
+def _stop_columns(prices, buys, sells, pos0, last_px0, qty, slip, stop_loss, take_profit,
+                  kinds, pos_mid, pos_end):
+    for j in range(prices.shape[1]):
+        _stop_column_jit(prices[:, j], buys[:, j], sells[:, j], pos0[j], last_px0[j], qty, slip,
+                         stop_loss, take_profit, kinds[:, j], pos_mid[:, j], pos_end[:, j])
+
+
+if numba is not None:
+    # compiled on first call (and cached on disk), not at import
+    _stop_column_jit  = numba.njit(cache=True, nogil=True)(_stop_column)
+    _stop_columns_jit = numba.njit(cache=True, nogil=True)(_stop_columns)
+
+
+def simulate_stops(prices, buys, sells, pos0, last_px0, qty, slippage_pct,
+                   stop_loss_pct=None, take_profit_pct=None, engine: str = "auto"):
+    """
+    Path-dependent stop-loss / take-profit pass of the vectorized backtest.
+
+    prices, buys, sells: (bars × symbols) closes and signal BUY/SELL masks
+    pos0, last_px0:      positions and last fill prices going in (NaN or 0: none)
+
+    Per bar and symbol, a held position whose move since the last fill
+    reaches -stop_loss_pct / +take_profit_pct sells `qty` at the close, then
+    the bar's signal fill applies; each fill resets the entry price.
+    Returns (kinds, pos_mid, pos_end): NO_STOP / STOP_LOSS / TAKE_PROFIT per
+    bar, and positions after the stop and after the signal fill.
+
+    engine: "numba" compiles the per-symbol step (numba must be installed),
+    "python" runs the same code on Python lists (or, from ROWS_MIN_SYMBOLS
+    symbols on, steps whole rows with NumPy), "auto" picks numba when it is
+    importable. All give the same arrays as Backtester's loop.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}.")
+    if engine == "auto":
+        engine = "numba" if numba is not None else "python"
+    args = (prices, np.asarray(buys, dtype=bool), np.asarray(sells, dtype=bool),
+            np.asarray(pos0, dtype=np.int64), np.asarray(last_px0, dtype=float),
+            int(qty), float(slippage_pct), float(stop_loss_pct or 0.0), float(take_profit_pct or 0.0))
+    if engine == "python":
+        return (_stops_rows if prices.shape[1] >= ROWS_MIN_SYMBOLS else _stops_python)(*args)
+    if numba is None:
+        raise ImportError("engine='numba' needs numba (pip install numba).")
+    return _stops_numba(*args)
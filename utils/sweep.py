@@ -0,0 +1,173 @@
+# utils/sweep.py
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from engine.price_panel import PricePanel
+from utils import checkpoint
+from utils.backtester import Backtester
+from utils.performance import calculate_returns, calculate_sharpe_ratio, calculate_drawdown
+
+# Per-worker state, filled once by _init_worker so tasks only carry parameters.
+_WORKER = {}
+
+
+def parameter_grid(grid: dict) -> list:
+    """
+    Expand {"short_window": [10, 20], "long_window": [50, 100]} into the list of
+    all parameter dicts (cartesian product, in key order).
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+@contextmanager
+def _shared_panel(panel: PricePanel):
+    """
+    Yield the arguments _attach_panel needs to map the panel in another
+    process: the file of a panel from PricePanel.open, which workers map
+    themselves, otherwise a shared-memory block the closes are copied into once.
+    """
+    if panel.path is not None:
+        yield ("file", panel.path)
+        return
+    shm = shared_memory.SharedMemory(create=True, size=max(panel.nbytes, 1))
+    try:
+        np.ndarray(panel.shape, dtype=float, buffer=shm.buf)[:] = panel.array
+        yield ("shm", shm.name, panel.shape, panel.index, panel.symbols, panel.present)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _attach_panel(kind, *args):
+    if kind == "file":
+        return None, PricePanel.open(*args)
+    # Pool workers share the parent's resource tracker, so attaching doesn't
+    # take ownership; the parent unlinks the block when the sweep ends.
+    shm_name, shape, index, symbols, present = args
+    shm    = shared_memory.SharedMemory(name=shm_name)
+    values = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    return shm, PricePanel(values, index, symbols, present)
+
+
+def _init_worker(panel_args, config, task):
+    shm, panel = _attach_panel(*panel_args)
+    _WORKER.update(shm=shm, panel=panel, config=config, task=task)
+
+
+def _run_one(params):
+    return _WORKER["task"](_WORKER["panel"], params, _WORKER["config"])
+
+
+def _map_grid(task, grid, panel, config, n_jobs, checkpoint_dir=None, log_name="sweep_results.pkl") -> list:
+    """
+    [task(panel, params, config) for params in grid], in-process or on a pool of
+    n_jobs workers sharing the panel. With `checkpoint_dir`, every finished
+    result is logged there (checkpoint.ResultLog) as it comes in, and parameter
+    sets already logged for the same prices and config are not run again.
+    """
+    log, keys = None, [None] * len(grid)
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        log  = checkpoint.ResultLog(os.path.join(checkpoint_dir, log_name))
+        run  = checkpoint.run_key(panel.to_frame(), config)
+        keys = [checkpoint.run_key(run, params) for params in grid]
+    todo    = [i for i, key in enumerate(keys) if log is None or key not in log]
+    results = {}
+
+    def finished(i, result):
+        results[i] = result
+        if log is not None:
+            log.append(keys[i], result)
+
+    if n_jobs == 1 or len(todo) <= 1:
+        for i in todo:
+            finished(i, task(panel, grid[i], config))
+    elif todo:
+        chunksize = max(1, len(todo) // (n_jobs * 4))
+        with _shared_panel(panel) as panel_args, ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_init_worker,
+            initargs=(panel_args, config, task),
+        ) as pool:
+            for i, result in zip(todo, pool.map(_run_one, [grid[i] for i in todo], chunksize=chunksize)):
+                finished(i, result)
+    return [results[i] if i in results else log.get(keys[i]) for i in range(len(grid))]
+
+
+def _make_backtester(strategy, config, exec_h=None, port=None):
+    exec_h = exec_h or ExecutionHandler(**config["execution_kwargs"])
+    port   = port or Portfolio(initial_capital=config["initial_capital"])
+    return Backtester(strategy, exec_h, port, **config["backtester_kwargs"])
+
+
+def _backtest_metrics(panel, params, config):
+    strategy = config["strategy_cls"](**config["strategy_kwargs"], **params)
+    equity   = _make_backtester(strategy, config).run(panel)["total_equity"]
+    return {**params, **_equity_metrics(equity, config)}
+
+
+def _equity_metrics(equity, config) -> dict:
+    returns = calculate_returns(equity)
+    return {
+        "final_equity": float(equity.iloc[-1]),
+        "sharpe":       float(calculate_sharpe_ratio(returns, config["riskfree_rate"],
+                                                     config["periods_per_year"])),
+        "max_drawdown": float(calculate_drawdown(returns)["Drawdown"].min()) if len(returns) else 0.0,
+    }
+
+
+def run_sweep(
+    strategy_cls,
+    param_grid,
+    price_data,
+    symbol=None,
+    strategy_kwargs: dict   = None,
+    initial_capital: float  = 100000,
+    backtester_kwargs: dict = None,
+    execution_kwargs: dict  = None,
+    riskfree_rate: float    = 0.0,
+    periods_per_year: int   = 252,
+    n_jobs: int             = None,
+    checkpoint_dir: str     = None,
+) -> pd.DataFrame:
+    """
+    Backtest `strategy_cls(**strategy_kwargs, **params)` for every params in the grid.
+
+    param_grid:        dict of lists (expanded with parameter_grid) or a list of dicts
+    price_data/symbol: anything Backtester.run accepts
+    strategy_kwargs:   fixed constructor arguments, e.g. symbol_x/symbol_y for pairs
+    backtester_kwargs: qty_per_trade, stops, execution_mode (defaults to "vectorized")
+    execution_kwargs:  commission_per_trade, slippage_pct
+    n_jobs:            worker processes (None = all cores, 1 = run in-process)
+    checkpoint_dir:    log finished parameter sets there; a rerun skips them
+
+    The closes are packed once into a PricePanel and copied into a shared-memory
+    block that every worker maps read-only, so tasks only carry their parameter dict.
+    A panel from PricePanel.open is not copied at all: workers map its file.
+    Returns one row per parameter set with the parameters plus
+    'final_equity', 'sharpe' and 'max_drawdown'.
+    """
+    grid   = parameter_grid(param_grid) if isinstance(param_grid, dict) else list(param_grid)
+    config = {
+        "strategy_cls":      strategy_cls,
+        "strategy_kwargs":   strategy_kwargs or {},
+        "initial_capital":   initial_capital,
+        "backtester_kwargs": {"execution_mode": "vectorized", **(backtester_kwargs or {})},
+        "execution_kwargs":  execution_kwargs or {},
+        "riskfree_rate":     riskfree_rate,
+        "periods_per_year":  periods_per_year,
+    }
+    panel  = PricePanel.from_data(price_data, symbol)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    rows   = _map_grid(_backtest_metrics, grid, panel, config, n_jobs, checkpoint_dir)
+    return pd.DataFrame(rows)
@@ -0,0 +1,152 @@
+# utils/walk_forward.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine.execution_handler import ExecutionHandler
+from engine.portfolio import Portfolio
+from engine.price_panel import PricePanel
+from utils.backtester import Backtester
+from utils.sweep import parameter_grid, _equity_metrics, _make_backtester, _map_grid
+
+METRICS = ("final_equity", "sharpe", "max_drawdown")
+
+
+def walk_forward_folds(n_bars: int, train: int, test: int, step: int = None, anchored: bool = False) -> list:
+    """
+    Positional (train, test) slice pairs over `n_bars` bars: fit on `train`
+    bars, trade the next `test`, then roll forward by `step` (default: test).
+    anchored=True starts every train window at bar 0 (expanding window).
+    The last test window is cut short at n_bars.
+    """
+    if train < 1 or test < 1:
+        raise ValueError("train and test must be at least one bar.")
+    step = test if step is None else step
+    if step < test:
+        raise ValueError("step must be >= test, or out-of-sample windows would overlap.")
+    folds = []
+    for start in range(0, n_bars - train, step):
+        train_end = start + train
+        folds.append((slice(0 if anchored else start, train_end),
+                      slice(train_end, min(train_end + test, n_bars))))
+    return folds
+
+
+def _strategy_signals(strategy, panel, config):
+    # one signal frame over the whole panel, sliced by every fold
+    return _make_backtester(strategy, config).signals_for(panel)
+
+
+def _score_folds(panel, params, config) -> list:
+    strategy = config["strategy_cls"](**config["strategy_kwargs"], **params)
+    signals  = _strategy_signals(strategy, panel, config)
+    rows = []
+    for k, (train, _) in enumerate(config["folds"]):
+        bt     = _make_backtester(strategy, config)
+        equity = bt.replay(panel.window(train.start, train.stop), signals)["total_equity"]
+        rows.append({"fold": k, **params, **_equity_metrics(equity, config)})
+    return rows
+
+
+def run_walk_forward(
+    strategy_cls,
+    param_grid,
+    price_data,
+    train: int,
+    test: int,
+    symbol=None,
+    step: int               = None,
+    anchored: bool          = False,
+    metric: str             = "sharpe",
+    strategy_kwargs: dict   = None,
+    initial_capital: float  = 100000,
+    backtester_kwargs: dict = None,
+    execution_kwargs: dict  = None,
+    riskfree_rate: float    = 0.0,
+    periods_per_year: int   = 252,
+    n_jobs: int             = None,
+    checkpoint_dir: str     = None,
+):
+    """
+    Walk-forward optimization: for each fold (see walk_forward_folds, in bars
+    of the price panel), backtest every parameter set of the grid on the train
+    window, keep the best by `metric` (highest; max_drawdown is <= 0), and
+    trade it on the following test window.
+
+    The out-of-sample segments run on one Portfolio/ExecutionHandler and carry
+    the last signals over, so they chain into one continuous equity curve.
+    Arguments are those of run_sweep (including checkpoint_dir, which skips
+    parameter sets already scored), plus the fold layout and `metric`.
+
+    Signals are generated once per parameter set over the whole panel and
+    sliced per fold, so each segment sees its preceding bars as history (no
+    warm-up gap) and indicators are never recomputed per fold; strategies must
+    be causal, as for Backtester.run_chunked. The grid runs in parallel, one
+    task per parameter set, on the shared-memory panel run_sweep uses.
+
+    Returns (history, folds, scores): the chained out-of-sample history (same
+    columns as Backtester.run), one row per fold with its dates, chosen
+    parameters, in-sample score and out-of-sample metrics, and the in-sample
+    metrics of every (fold, parameter set).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}.")
+    grid  = parameter_grid(param_grid) if isinstance(param_grid, dict) else list(param_grid)
+    panel = PricePanel.from_data(price_data, symbol)
+    folds = walk_forward_folds(len(panel.index), train, test, step, anchored)
+    if not folds or not grid:
+        raise ValueError("Not enough bars for one fold, or an empty parameter grid.")
+    config = {
+        "strategy_cls":      strategy_cls,
+        "strategy_kwargs":   strategy_kwargs or {},
+        "initial_capital":   initial_capital,
+        "backtester_kwargs": {"execution_mode": "vectorized", **(backtester_kwargs or {})},
+        "execution_kwargs":  execution_kwargs or {},
+        "riskfree_rate":     riskfree_rate,
+        "periods_per_year":  periods_per_year,
+        "folds":             folds,
+    }
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    # 1) In-sample: every parameter set on every train window
+    per_params = _map_grid(_score_folds, grid, panel, config, n_jobs, checkpoint_dir,
+                           log_name="walk_forward_results.pkl")
+    scores = pd.DataFrame([row for rows in per_params for row in rows])
+    scores.insert(1, "param_set", np.repeat(np.arange(len(grid)), len(folds)))
+    scores = scores.sort_values(["fold", "param_set"], kind="stable").reset_index(drop=True)
+
+    # 2) Out-of-sample: chain the winners through one portfolio
+    exec_h = ExecutionHandler(**config["execution_kwargs"])
+    port   = Portfolio(initial_capital=initial_capital)
+    prev_signals, pieces, summary = None, [], []
+    cached = (None, None)   # (param_set, signals): consecutive folds often pick the same one
+    for k, (train_slc, test_slc) in enumerate(folds):
+        fold_scores = scores[scores["fold"] == k]
+        best        = fold_scores.iloc[int(np.argmax(fold_scores[metric].fillna(-np.inf).to_numpy()))]
+        param_set   = int(best["param_set"])
+        params      = grid[param_set]
+
+        strategy = strategy_cls(**config["strategy_kwargs"], **params)
+        if cached[0] != param_set:
+            cached = (param_set, _strategy_signals(strategy, panel, config))
+        bt   = _make_backtester(strategy, config, exec_h, port)
+        hist = bt.replay(panel.window(test_slc.start, test_slc.stop), cached[1], prev_signals)
+        prev_signals = Backtester.last_signals(hist)
+        pieces.append(hist)
+
+        oos = _equity_metrics(hist["total_equity"], config)
+        summary.append({
+            "fold":        k,
+            "train_start": panel.index[train_slc.start],
+            "train_end":   panel.index[train_slc.stop - 1],
+            "test_start":  panel.index[test_slc.start],
+            "test_end":    panel.index[test_slc.stop - 1],
+            "param_set":   param_set,
+            **params,
+            f"is_{metric}": float(best[metric]),
+            **{f"oos_{name}": value for name, value in oos.items()},
+        })
+
+    return pd.concat(pieces), pd.DataFrame(summary), scores